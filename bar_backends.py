@@ -0,0 +1,302 @@
+"""
+Bar Backends - Pluggable rendering of the onepager bars
+
+The onepager draws three kinds of bars per section: the START bar, the
+pot bar (used / return) and the overflow badge. A backend turns the same
+inputs into markup for the template:
+
+- svg:        inline SVG per bar (svg_bars.py, the default)
+- css:        plain <div>s with gradients and border-radius, no SVG at all
+- raster:     pre-rasterised images (PNG via cairosvg when installed,
+              otherwise the SVG as image), cached per distinct bar
+
+Widths and labels come from svg_bars.bar_layout for every backend, so the
+bars look alike; only the markup (and what the PDF engine has to lay out)
+differs. See benchmark_backends.py for HTML size and PDF time.
+"""
+
+import base64
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Optional
+
+from svg_bars import (
+    EXTENSION_WIDTH, SVG_CACHE_SIZE, bar_layout,
+    generate_bar_svg, generate_overflow_indicator_svg, generate_start_bar_svg
+)
+
+try:
+    import cairosvg
+except ImportError:  # optional, only for PNG bars
+    cairosvg = None
+
+
+DEFAULT_BACKEND = 'svg'
+RASTER_SCALE = 3  # PNG pixels per CSS pixel (sharp at print resolution)
+
+
+class BarBackend(ABC):
+    """Markup for the onepager bars; parameters are those of the svg_bars generators"""
+
+    name = ''
+
+    @abstractmethod
+    def start_bar(self, amount: float, label: str = "", width: int = 280, height: int = 30) -> str:
+        """Solid START bar"""
+
+    @abstractmethod
+    def bar(self, voorschot: float, gebruikt_or_totaal: float, is_overfilled: bool,
+            label_gebruikt: str = "", label_extra_or_terug: str = "", pot_width: int = 400, height: int = 40,
+            show_limit_line: bool = False, rounded_right: bool = True) -> str:
+        """Pot bar: used part, return part and (optionally) overflow extension"""
+
+    @abstractmethod
+    def overflow(self, amount: float, width: int = 80, height: int = 30, rounded_left: bool = True) -> str:
+        """Red overflow badge"""
+
+    def document_defs(self) -> Optional[str]:
+        """Markup needed once per document (stylesheet), or None"""
+        return None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+# ==================== SVG ====================
+
+class SvgBackend(BarBackend):
+    """Inline SVG bars (svg_bars.py)"""
+
+    name = 'svg'
+
+    def start_bar(self, amount, label="", width=280, height=30):
+        return generate_start_bar_svg(amount=amount, label=label, width=width, height=height)
+
+    def bar(self, voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt="", label_extra_or_terug="",
+            pot_width=400, height=40, show_limit_line=False, rounded_right=True):
+        return generate_bar_svg(
+            voorschot=voorschot,
+            gebruikt_or_totaal=gebruikt_or_totaal,
+            is_overfilled=is_overfilled,
+            label_gebruikt=label_gebruikt,
+            label_extra_or_terug=label_extra_or_terug,
+            pot_width=pot_width,
+            height=height,
+            show_limit_line=show_limit_line,
+            rounded_right=rounded_right
+        )
+
+    def overflow(self, amount, width=80, height=30, rounded_left=True):
+        return generate_overflow_indicator_svg(amount=amount, width=width, height=height, rounded_left=rounded_left)
+
+
+# ==================== CSS ====================
+
+# Same colours as svg_bars.STYLES; children are absolutely positioned inside .bar-css
+CSS_STYLESHEET = (
+    '<style>'
+    '.bar-css{position:relative;box-sizing:border-box;font-family:Barlow,sans-serif;font-size:11px;'
+    'font-weight:600;color:#2C3E50;text-align:center;white-space:nowrap}'
+    '.bar-css>*{position:absolute;top:0;height:100%;box-sizing:border-box}'
+    '.bar-css-pot{left:0;border:1px solid #E0E0E0}'
+    '.bar-css-over{background:repeating-linear-gradient(45deg,rgba(255,255,255,.4) 0 3px,transparent 3px 6px),#EF9A9A}'
+    '.bar-css-limit{top:-5px;height:calc(100% + 10px);border-left:2px dashed rgba(211,47,47,.6)}'
+    '.bar-css-label-over{color:#C62828}'
+    '.bar-css-start{background:#A5D6A7;border:1px solid #E0E0E0}'
+    '.bar-css-badge{background:#EF9A9A;color:#C62828;font-size:10px;font-weight:700}'
+    '</style>'
+)
+
+
+def _css_radius(r: float, round_left: bool = True, round_right: bool = True) -> str:
+    """border-radius value for a bar with the given rounded ends"""
+    left = f"{r:g}px" if round_left else "0"
+    right = f"{r:g}px" if round_right else "0"
+    return f"{left} {right} {right} {left}" if left != right else left
+
+
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
+def css_start_bar(amount: float, label: str = "", width: int = 280, height: int = 30) -> str:
+    """START bar as a <div> (see CssBackend)"""
+    return (f'<div class="bar-css bar-css-start" style="width:{width}px;height:{height}px;'
+            f'line-height:{height}px;border-radius:{_css_radius(height / 2)}">{label}</div>')
+
+
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
+def css_bar(voorschot: float, gebruikt_or_totaal: float, is_overfilled: bool,
+            label_gebruikt: str = "", label_extra_or_terug: str = "", pot_width: int = 400, height: int = 40,
+            show_limit_line: bool = False, rounded_right: bool = True) -> str:
+    """Pot bar as nested <div>s (see CssBackend)"""
+    total_width, used_width, show_marker, label_used, label_right = bar_layout(
+        voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt, label_extra_or_terug, pot_width, show_limit_line)
+    r = height / 2
+
+    # Used part (yellow) over the pot (green) as one hard-stop gradient
+    parts = [f'<div class="bar-css" style="width:{total_width}px;height:{height}px;line-height:{height}px">',
+             f'<div class="bar-css-pot" style="width:{pot_width}px;border-radius:{_css_radius(r, True, rounded_right)};'
+             f'background:linear-gradient(to right,#FFE082 {used_width}px,#81C784 {used_width}px)"></div>']
+    if is_overfilled:
+        parts.append(f'<div class="bar-css-over" style="left:{pot_width}px;width:{EXTENSION_WIDTH}px;'
+                     f'border-radius:{_css_radius(r)}"></div>')
+    if show_marker:
+        parts.append(f'<div class="bar-css-limit" style="left:{pot_width - 1}px"></div>')
+
+    if used_width > 40:
+        parts.append(f'<span style="left:0;width:{used_width}px">{label_used}</span>')
+    if is_overfilled:
+        parts.append(f'<span class="bar-css-label-over" style="left:{pot_width}px;width:{EXTENSION_WIDTH}px">{label_right}</span>')
+    elif pot_width - used_width > 40:
+        parts.append(f'<span style="left:{used_width}px;width:{pot_width - used_width}px">{label_right}</span>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
+def css_overflow(amount: float, width: int = 80, height: int = 30, rounded_left: bool = True) -> str:
+    """Overflow badge as a <div> (see CssBackend)"""
+    return (f'<div class="bar-css bar-css-badge" style="width:{width}px;height:{height}px;line-height:{height}px;'
+            f'border-radius:{_css_radius(height / 2, rounded_left, True)}">€{amount:.0f}</div>')
+
+
+class CssBackend(BarBackend):
+    """Bars as <div>s: a gradient for used/return, CSS stripes for the overflow"""
+
+    name = 'css'
+
+    def start_bar(self, amount, label="", width=280, height=30):
+        return css_start_bar(amount, label, width, height)
+
+    def bar(self, voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt="", label_extra_or_terug="",
+            pot_width=400, height=40, show_limit_line=False, rounded_right=True):
+        return css_bar(voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt, label_extra_or_terug,
+                       pot_width, height, show_limit_line, rounded_right)
+
+    def overflow(self, amount, width=80, height=30, rounded_left=True):
+        return css_overflow(amount, width, height, rounded_left)
+
+    def document_defs(self):
+        return CSS_STYLESHEET
+
+
+# ==================== RASTER ====================
+
+class RasterBackend(BarBackend):
+    """
+    Bars as pre-rasterised images
+
+    Every distinct bar is rasterised once (PNG at RASTER_SCALE) and kept in
+    memory and, with a cache_dir, on disk for later runs. The PDF engine
+    then only places images. Without cairosvg the SVG itself is embedded as
+    image: still one decoded image per distinct bar, but not rasterised
+    ahead of time.
+    """
+
+    name = 'raster'
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for rasterised PNGs shared between runs (None = memory only)
+        """
+        self.cache_dir = cache_dir
+        self._svg = SvgBackend()
+        self._images: Dict[str, str] = {}
+
+    def _rasterise(self, svg: str) -> bytes:
+        """PNG of one SVG bar (from the disk cache when present)"""
+        path = None
+        if self.cache_dir:
+            digest = hashlib.blake2b(svg.encode('utf-8'), digest_size=16).hexdigest()
+            path = os.path.join(self.cache_dir, f"{digest}.png")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+        png = cairosvg.svg2png(bytestring=svg.encode('utf-8'), scale=RASTER_SCALE)
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(png)
+        return png
+
+    def _image(self, svg: str, width: int, height: int) -> str:
+        """<img> of an SVG bar at its CSS size"""
+        src = self._images.get(svg)
+        if src is None:
+            if cairosvg is not None:
+                src = "data:image/png;base64," + base64.b64encode(self._rasterise(svg)).decode('ascii')
+            else:
+                src = "data:image/svg+xml;base64," + base64.b64encode(svg.encode('utf-8')).decode('ascii')
+            if len(self._images) >= SVG_CACHE_SIZE:
+                self._images.clear()
+            self._images[svg] = src
+        return f'<img src="{src}" width="{width}" height="{height}" alt="" style="display:block">'
+
+    def start_bar(self, amount, label="", width=280, height=30):
+        return self._image(self._svg.start_bar(amount, label, width, height), width, height)
+
+    def bar(self, voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt="", label_extra_or_terug="",
+            pot_width=400, height=40, show_limit_line=False, rounded_right=True):
+        svg = self._svg.bar(voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt, label_extra_or_terug,
+                            pot_width, height, show_limit_line, rounded_right)
+        total_width = pot_width + EXTENSION_WIDTH if is_overfilled else pot_width
+        return self._image(svg, total_width, height)
+
+    def overflow(self, amount, width=80, height=30, rounded_left=True):
+        return self._image(self._svg.overflow(amount, width, height, rounded_left), width, height)
+
+
+# ==================== REGISTRY ====================
+
+BAR_BACKENDS = {
+    'svg': SvgBackend,
+    'css': CssBackend,
+    'raster': RasterBackend,
+}
+
+# Removed backends -> their replacement (names recorded in older snapshots)
+RETIRED_BACKENDS = {'svg-sprite': 'svg'}
+
+_instances: Dict[str, BarBackend] = {}
+
+
+def get_backend(backend: Optional[object] = None, **options) -> BarBackend:
+    """
+    Bar backend by name (one shared instance per name per process)
+
+    Args:
+        backend: Name from BAR_BACKENDS, a BarBackend (returned as is) or None (default)
+        **options: Constructor arguments, e.g. cache_dir for raster; the shared
+                   instance is rebuilt with them and later lookups by name get it
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if isinstance(backend, BarBackend):
+        return backend
+    name = RETIRED_BACKENDS.get(backend, backend) or DEFAULT_BACKEND
+    if options or name not in _instances:
+        if name not in BAR_BACKENDS:
+            raise ValueError(f"Onbekende bar backend '{name}' (kies uit: {', '.join(BAR_BACKENDS)})")
+        _instances[name] = BAR_BACKENDS[name](**options)
+    return _instances[name]
+
+
+def warn_missing_cairosvg():
+    """Warn that the raster backend falls back to embedded SVG (call where raster is chosen)"""
+    if cairosvg is None:
+        print("⚠️  Waarschuwing: cairosvg niet geïnstalleerd - raster bars worden als SVG-afbeelding ingesloten")
+        print("   Installeer met: pip install cairosvg")
+
+
+if __name__ == "__main__":
+    warn_missing_cairosvg()
+    for name in BAR_BACKENDS:
+        backend = get_backend(name)
+        markup = [backend.start_bar(350, "€350", 280, 30),
+                  backend.bar(350, 350, False, "€350", "", 280, 30, True, False),
+                  backend.bar(350, 120, False, "€120", "€230", 280, 30),
+                  backend.overflow(75, 80, 30, False)]
+        defs = backend.document_defs() or ''
+        print(f"{name:<11} {sum(map(len, markup)):>6} bytes bars + {len(defs):>5} bytes defs")
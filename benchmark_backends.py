@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark Backends - HTML size and PDF time per bar backend
+
+Renders the onepager of each test scenario with every bar backend (see
+bar_backends.py) and reports:
+
+- bars:  bytes of bar markup (all bars plus the per-document defs)
+- html:  bytes of the whole onepager HTML (without logo)
+- html ms / pdf ms: best render time of the HTML / of the PDF (WeasyPrint)
+
+PDF columns show n/a when WeasyPrint is not installed. Without cairosvg the
+raster backend embeds the SVG bars as images instead of PNGs, so its row
+does not measure pre-rasterised bars; it is skipped then unless asked for
+explicitly with --backends.
+
+Usage:
+    python benchmark_backends.py
+    python benchmark_backends.py Archive/*.xlsx --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from bar_backends import BAR_BACKENDS, cairosvg
+from template_renderer import TemplateRenderer
+from viewmodels import BAR_VISUALS, SVG_MEMBERS, build_viewmodels_from_data
+
+try:
+    from weasyprint import HTML
+except ImportError:  # PDF timings are skipped
+    HTML = None
+
+
+SCENARIOS = ['input_template.xlsx', 'test_full_overuse.xlsx']
+
+
+def load_data(path: str) -> Dict[str, Any]:
+    """Entity data of a workbook, recalculated (as in generate.py)"""
+    from calculator import recalculate_all
+    from excel_reader import ExcelReader
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ExcelReader(path) as reader:
+            data = reader.read_all()
+            data['gwe_voorschot'] = reader.get_float('Voorschot_GWE', default=0.0)
+        return recalculate_all(data)
+
+
+def best_time(run: Callable[[], Any], repeat: int) -> float:
+    """Best time of run() in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def measure(data: Dict[str, Any], backend: str, renderer: TemplateRenderer, repeat: int) -> Dict[str, Optional[float]]:
+    """HTML size, bar markup size and render / PDF times of one scenario with one backend"""
+    onepager_vm, _ = build_viewmodels_from_data(data, backend=backend)
+    onepager_vm['logo_b64'] = None
+
+    bars = len(onepager_vm.get('bar_defs') or '')
+    for section in BAR_VISUALS:
+        bars += sum(len(onepager_vm['financial'][section].get(key) or '') for key in SVG_MEMBERS)
+
+    html = renderer.render_onepager(onepager_vm)
+    result = {
+        'bars': bars,
+        'html': len(html.encode('utf-8')),
+        'html_ms': best_time(lambda: renderer.render_onepager(onepager_vm), repeat),
+        'pdf_ms': None,
+        'pdf': None,
+    }
+    if HTML is not None:
+        document = HTML(string=html, base_url=renderer.template_dir)
+        result['pdf'] = len(document.write_pdf())
+        result['pdf_ms'] = best_time(lambda: HTML(string=html, base_url=renderer.template_dir).write_pdf(), repeat)
+    return result
+
+
+def run(paths: List[str], backends: List[str], repeat: int) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """
+    Measure every scenario with every backend
+
+    Returns:
+        Dictionary scenario -> backend -> measurements (see measure)
+    """
+    renderer = TemplateRenderer()
+    results = {}
+    for path in paths:
+        data = load_data(path)
+        results[path] = {backend: measure(data, backend, renderer, repeat) for backend in backends}
+    return results
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return 'n/a' if value is None else format(value, spec)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='HTML grootte en PDF tijd per bar backend')
+    parser.add_argument('inputs', nargs='*', default=SCENARIOS,
+                        help=f"Excel bestanden (default: {' '.join(SCENARIOS)})")
+    parser.add_argument('--backends', nargs='+', choices=list(BAR_BACKENDS),
+                        help='Te vergelijken backends (default: alle; raster alleen met cairosvg)')
+    parser.add_argument('--repeat', type=int, default=3, help='Aantal herhalingen, beste telt (default: 3)')
+    args = parser.parse_args()
+
+    if args.backends is None:
+        args.backends = list(BAR_BACKENDS)
+        if cairosvg is None:
+            args.backends.remove('raster')
+            print("⚠️  cairosvg niet geïnstalleerd - raster overgeslagen (zou SVG insluiten, niet voorgerasterde PNG's meten)")
+            print("   Installeer met: pip install cairosvg")
+    elif 'raster' in args.backends and cairosvg is None:
+        print("⚠️  cairosvg niet geïnstalleerd - raster rij meet als afbeelding ingesloten SVG, geen voorgerasterde PNG's")
+
+    if HTML is None:
+        print("⚠️  WeasyPrint niet geïnstalleerd - PDF tijden worden overgeslagen")
+
+    results = run(args.inputs, args.backends, args.repeat)
+    for path, per_backend in results.items():
+        print(f"\n📊 {path}")
+        print(f"   {'backend':<11} {'bars':>8} {'html':>9} {'html ms':>8} {'pdf':>9} {'pdf ms':>8}")
+        for backend, r in per_backend.items():
+            print(f"   {backend:<11} {r['bars']:>8} {r['html']:>9} {r['html_ms']:>8.2f} "
+                  f"{_fmt(r['pdf'], 'd'):>9} {_fmt(r['pdf_ms'], '.1f'):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark Bars - Time per bar SVG with and without the geometry table
+
+Draws generate_bar_svg() for every usage percentage from 0 to 100% (in
+steps of --step) at the standard bar sizes, in both the plain and the
+flattened (overflow-connected) variant. Each bar is generated three ways:
+
+- f-strings: the geometry table emptied, every rect/path formatted per call
+- table:     the precomputed GEOMETRY lookups (the default)
+- cached:    repeated bars served by the LRU cache
+
+The LRU cache is bypassed for the first two, so they measure generation.
+
+With --settlements N the bars of N random settlements (START bar, pot bar
+and overflow badge of one section each) are also drawn one call per bar,
+as the viewmodel members do, and with one generate_section_bars() call.
+
+Usage:
+    python benchmark_bars.py
+    python benchmark_bars.py --step 0.1 --repeat 20
+    python benchmark_bars.py --settlements 10000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+import svg_bars
+from svg_bars import (
+    generate_bar_svg, generate_overflow_indicator_svg, generate_section_bars, generate_start_bar_svg
+)
+
+# (pot width, height) of the bars (GEOMETRY_SIZES without the 80x30 badge)
+BAR_SIZES = ((280, 30), (400, 40))
+
+
+def bar_inputs(step: float) -> List[Tuple]:
+    """generate_bar_svg arguments for 0..100% usage at every bar size, plain and flattened"""
+    voorschot = 350.0
+    steps = int(round(100 / step))
+    inputs = []
+    for pot_width, height in BAR_SIZES:
+        for i in range(steps + 1):
+            gebruikt = voorschot * i * step / 100
+            label = f"€{gebruikt:.0f}"
+            for rounded_right in (True, False):
+                inputs.append((voorschot, gebruikt, False, label, f"€{voorschot - gebruikt:.0f}",
+                               pot_width, height, not rounded_right, rounded_right))
+    return inputs
+
+
+def time_per_bar(generate: Callable, inputs: List[Tuple], repeat: int) -> float:
+    """Best time per bar in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in inputs:
+            generate(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def run(step: float, repeat: int) -> dict:
+    """
+    Time all three ways
+
+    Returns:
+        Dictionary way -> microseconds per bar
+    """
+    inputs = bar_inputs(step)
+    uncached = generate_bar_svg.__wrapped__
+
+    table = svg_bars.GEOMETRY
+    svg_bars.GEOMETRY = {}
+    try:
+        results = {'f-strings': time_per_bar(uncached, inputs, repeat)}
+    finally:
+        svg_bars.GEOMETRY = table
+    results['table'] = time_per_bar(uncached, inputs, repeat)
+
+    generate_bar_svg.cache_clear()
+    for args in inputs:
+        generate_bar_svg(*args)
+    results['cached'] = time_per_bar(generate_bar_svg, inputs, repeat)
+
+    # Same markup either way
+    svg_bars.GEOMETRY = {}
+    try:
+        plain = [uncached(*args) for args in inputs]
+    finally:
+        svg_bars.GEOMETRY = table
+    assert plain == [uncached(*args) for args in inputs], "geometry table changes the markup"
+    return results
+
+
+def settlement_columns(n: int, seed: int = 42) -> Tuple[List[float], ...]:
+    """voorschot, gebruikt, extra and terug of n random settlements (amounts in cents)"""
+    rng = random.Random(seed)
+    voorschot = [rng.choice([250.0, 350.0, 800.0]) for _ in range(n)]
+    gebruikt = [round(rng.uniform(0, 1.3 * v), 2) for v in voorschot]
+    extra = [round(max(0.0, g - v), 2) for v, g in zip(voorschot, gebruikt)]
+    terug = [round(max(0.0, v - g), 2) for v, g in zip(voorschot, gebruikt)]
+    return voorschot, gebruikt, extra, terug
+
+
+def section_bars_one_by_one(voorschot, gebruikt, extra, terug,
+                            start_bar=generate_start_bar_svg, bar=generate_bar_svg,
+                            overflow=generate_overflow_indicator_svg) -> List[Tuple[str, str, str]]:
+    """The same bars as generate_section_bars, one generator call per bar"""
+    bars = []
+    for v, g, e, t in zip(voorschot, gebruikt, extra, terug):
+        over = e > 0
+        bars.append((start_bar(v, f"€{v:.0f}", 280, 30),
+                     bar(v, v if over else g, False, f"€{v if over else g:.0f}", f"€{t:.0f}", 280, 30, over, not over),
+                     overflow(e, 80, 30, False) if over else ""))
+    return bars
+
+
+def run_settlements(n: int, repeat: int) -> dict:
+    """
+    Time the bars of n settlements: one call per bar (uncached / cached) and one batch call
+
+    Returns:
+        Dictionary way -> microseconds per settlement
+    """
+    columns = settlement_columns(n)
+    uncached = dict(start_bar=generate_start_bar_svg.__wrapped__, bar=generate_bar_svg.__wrapped__,
+                    overflow=generate_overflow_indicator_svg.__wrapped__)
+
+    def per_settlement(run: Callable) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best / n * 1e6
+
+    results = {'per bar': per_settlement(lambda: section_bars_one_by_one(*columns, **uncached))}
+    section_bars_one_by_one(*columns)
+    results['per bar (cache)'] = per_settlement(lambda: section_bars_one_by_one(*columns))
+    results['batch'] = per_settlement(lambda: generate_section_bars(*columns))
+
+    # Same markup either way
+    batch = generate_section_bars(*columns)
+    assert list(zip(batch['svg_start_bar'], batch['svg_bar'], batch['overflow_svg'])) == \
+        section_bars_one_by_one(*columns, **uncached), "batch changes the markup"
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Tijd per SVG bar: f-strings vs geometrietabel vs cache')
+    parser.add_argument('--step', type=float, default=1.0, help='Stap in procent verbruik (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=10, help='Aantal herhalingen, beste telt (default: 10)')
+    parser.add_argument('--settlements', type=int, default=0,
+                        help='Vergelijk ook losse bars met generate_section_bars voor zoveel afrekeningen')
+    args = parser.parse_args()
+
+    n = len(bar_inputs(args.step))
+    print(f"\n📊 {n} bars: 0-100% in stappen van {args.step}%, maten "
+          f"{', '.join(f'{w}x{h}' for w, h in BAR_SIZES)}, met en zonder afgeplatte rechterkant")
+    results = run(args.step, args.repeat)
+    for way, micros in results.items():
+        print(f"   {way:<10} {micros:>7.2f} µs/bar")
+    print(f"   ✓ Geometrietabel {results['f-strings'] / results['table']:.2f}x sneller "
+          f"({len(svg_bars.GEOMETRY)} vormen voorberekend)")
+
+    if args.settlements:
+        print(f"\n📊 {args.settlements} afrekeningen: START bar, bar en overflow badge per afrekening")
+        results = run_settlements(args.settlements, args.repeat)
+        for way, micros in results.items():
+            print(f"   {way:<16} {micros:>7.2f} µs/afrekening")
+        print(f"   ✓ Batch {results['per bar'] / results['batch']:.2f}x sneller dan losse bars")
+
+
+if __name__ == "__main__":
+    main()
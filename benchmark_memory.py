@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark Memory - Bytes per settlement of the entity model
+
+Builds a synthetic portfolio (default 10.000 settlements) three times:
+
+- dict:     dict-backed copies of the entity dataclasses (the model before
+            __slots__, with GWEMeterstanden as two GWEMeterReading fields)
+- slots:    the entities from entities.py, line items as lists of
+            GWERegel / DamageRegel
+- columnar: the same, with line items as GWERegels / DamageRegels tables
+
+Allocations are measured with tracemalloc, so the floats and strings that
+all variants hold are counted in all and the difference is the object
+overhead alone.
+
+Usage:
+    python benchmark_memory.py
+    python benchmark_memory.py --settlements 50000 --gwe-regels 12 --damage-regels 20
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Callable, List
+
+import entities
+from entities import DamageRegels, GWEMeterstanden, GWERegels
+
+ENTITIES = ('Client', 'Object', 'Period', 'Deposit', 'GWEMeterReading', 'GWERegel', 'GWETotalen',
+            'Cleaning', 'DamageRegel', 'DamageTotalen', 'Settlement')
+
+
+def _regel_list(regel: type) -> Callable[[List[tuple]], list]:
+    """Line items as a list of line entities"""
+    return lambda rows: [regel(*row) for row in rows]
+
+
+def _regel_table(table: type) -> Callable[[List[tuple]], object]:
+    """Line items as one columnar table"""
+    return lambda rows: table(*([row[c] for row in rows] for c in range(4)))
+
+
+def dict_backed_model() -> SimpleNamespace:
+    """Entity classes as plain (dict-backed) dataclasses, same fields"""
+    model = {name: make_dataclass(name, [(f.name, f.type) for f in fields(getattr(entities, name))])
+             for name in ENTITIES}
+    model['GWEMeterstanden'] = make_dataclass('GWEMeterstanden', [('stroom', object), ('gas', object)])
+    model['gwe_regels'] = _regel_list(model['GWERegel'])
+    model['damage_regels'] = _regel_list(model['DamageRegel'])
+    return SimpleNamespace(**model)
+
+
+def slotted_model() -> SimpleNamespace:
+    """Entity classes from entities.py, line items as lists"""
+    model = {name: getattr(entities, name) for name in ENTITIES}
+    model['GWEMeterstanden'] = lambda stroom, gas: GWEMeterstanden.from_readings({'stroom': stroom, 'gas': gas})
+    model['gwe_regels'] = _regel_list(entities.GWERegel)
+    model['damage_regels'] = _regel_list(entities.DamageRegel)
+    return SimpleNamespace(**model)
+
+
+def columnar_model() -> SimpleNamespace:
+    """Entity classes from entities.py, line items as GWERegels / DamageRegels"""
+    model = slotted_model()
+    model.gwe_regels = _regel_table(GWERegels)
+    model.damage_regels = _regel_table(DamageRegels)
+    return model
+
+
+MODELS = {'dict': dict_backed_model, 'slots': slotted_model, 'columnar': columnar_model}
+
+
+def build_settlement(m: SimpleNamespace, i: int, rng: random.Random, gwe_regels: int, damage_regels: int) -> dict:
+    """One synthetic settlement as read_excel() + recalculate_all() would hold it"""
+    checkin = date(2024, 1, 1) + timedelta(days=i % 365)
+    days = rng.randint(30, 200)
+
+    def money() -> float:
+        return round(rng.uniform(0, 500), 2)
+
+    return {
+        'client': m.Client(f"Klant {i}", f"Contact {i}", f"klant{i}@example.nl", f"06-{i:08d}"),
+        'object': m.Object(f"Straat {i % 500}", None, f"{1000 + i % 9000} AB", "Amsterdam", f"OBJ-{i % 2000}"),
+        'period': m.Period(checkin, checkin + timedelta(days=days), days),
+        'gwe_meterstanden': m.GWEMeterstanden(
+            stroom=m.GWEMeterReading(float(i), float(i) + 250.5, 250.5),
+            gas=m.GWEMeterReading(float(i) * 2, float(i) * 2 + 80.25, 80.25),
+        ),
+        'gwe_regels': m.gwe_regels([(f"GWE regel {k}", money(), money(), money()) for k in range(gwe_regels)]),
+        'gwe_totalen': m.GWETotalen(money(), money(), money()),
+        'cleaning': m.Cleaning("5_uur", "Basis Schoonmaak", 5.0, 6.5, 1.5, 50.0, 75.0, 250.0),
+        'damage_regels': m.damage_regels([(f"Schade {k}", 1.0, money(), money()) for k in range(damage_regels)]),
+        'damage_totalen': m.DamageTotalen(money(), money(), money()),
+        'deposit': m.Deposit(money(), money(), money(), 0.0),
+    }
+
+
+def measure(build: Callable[[], List[dict]]) -> int:
+    """Bytes still allocated after build() (the portfolio is kept alive during the measurement)"""
+    gc.collect()
+    tracemalloc.start()
+    portfolio = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del portfolio
+    return current
+
+
+def run(settlements: int, gwe_regels: int, damage_regels: int, seed: int = 1) -> dict:
+    """
+    Measure every model in MODELS
+
+    Returns:
+        Dictionary model name -> bytes per settlement
+    """
+    results = {}
+    for name, build_model in MODELS.items():
+        model = build_model()
+        rng = random.Random(seed)
+        total = measure(lambda: [build_settlement(model, i, rng, gwe_regels, damage_regels)
+                                 for i in range(settlements)])
+        results[name] = total / settlements
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Geheugengebruik per afrekening: dict-backed, __slots__ en kolom-regels')
+    parser.add_argument('--settlements', type=int, default=10_000, help='Aantal afrekeningen (default: 10000)')
+    parser.add_argument('--gwe-regels', type=int, default=6, help='GWE regels per afrekening (default: 6)')
+    parser.add_argument('--damage-regels', type=int, default=4, help='Schaderegels per afrekening (default: 4)')
+    args = parser.parse_args()
+
+    print(f"\n🧮 {args.settlements} afrekeningen, {args.gwe_regels} GWE regels en "
+          f"{args.damage_regels} schaderegels per afrekening")
+    results = run(args.settlements, args.gwe_regels, args.damage_regels)
+    before = results['dict']
+    for name, label in (('dict', 'dict-backed'), ('slots', '__slots__'), ('columnar', 'kolom-regels')):
+        after = results[name]
+        saving = '' if name == 'dict' else (f"  ✓ {100 * (1 - after / before):.0f}% minder "
+                                            f"({(before - after) * args.settlements / 1024 ** 2:.1f} MiB voor de hele portfolio)")
+        print(f"   {label + ':':<13} {after:>8.0f} bytes/afrekening{saving}")
+
+
+if __name__ == "__main__":
+    main()
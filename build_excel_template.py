@@ -13,6 +13,7 @@ from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.utils import get_column_letter
 from openpyxl.workbook.defined_name import DefinedName
 from datetime import date
+from template_layout import stamp_layout, CURRENT_LAYOUT_VERSION
 
 
 def add_named_range(wb, name, reference):
@@ -36,11 +37,15 @@ def create_excel_template(output_path="input_template.xlsx"):
     create_schoonmaak_sheet(wb)
     create_schade_sheet(wb)
 
+    # Stamp layout version + checksum so readers can take the fast path
+    stamp_layout(wb)
+
     # Save workbook
     wb.save(output_path)
     print(f"✅ Excel template created: {output_path}")
     print(f"   📊 Sheets: {', '.join(wb.sheetnames)}")
     print(f"   📝 Named ranges: {len(wb.defined_names)} defined")
+    print(f"   🔖 Layout versie: v{CURRENT_LAYOUT_VERSION}")
 
     return wb
 
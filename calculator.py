@@ -10,10 +10,15 @@ Handles all calculations for:
 - Final settlement - net amount to refund or charge
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
 from entities import (
     Deposit, GWEMeterReading, GWERegel, GWETotalen, Cleaning,
-    DamageRegel, DamageTotalen, Settlement, GWEMeterstanden
+    DamageRegel, DamageTotalen, Settlement, GWEMeterstanden, GWERegels, DamageRegels
+)
+from money import (
+    CENTS_PER_EURO, to_cents, from_cents, line_cents,
+    percentage_cents, to_cents_array, percentage_cents_array
 )
 
 
@@ -22,6 +27,7 @@ class Calculator:
     
     # Constants
     BTW_PERCENTAGE = 0.21  # 21% VAT
+    BTW_PROCENT = 21       # Same, as whole percent for integer-cent BTW
     
     # ==================== DEPOSIT CALCULATIONS ====================
     
@@ -37,15 +43,52 @@ class Calculator:
         Returns:
             Deposit entity with calculated values
         """
-        gebruikt = min(voorschot, damage_total_incl)  # Amount used from deposit
-        terug = max(0, voorschot - damage_total_incl)  # Amount to refund
-        restschade = max(0, damage_total_incl - voorschot)  # Remaining damage beyond deposit
+        voorschot_c = to_cents(voorschot)
+        damage_c = to_cents(damage_total_incl)
+        gebruikt = min(voorschot_c, damage_c)  # Amount used from deposit
+        terug = max(0, voorschot_c - damage_c)  # Amount to refund
+        restschade = max(0, damage_c - voorschot_c)  # Remaining damage beyond deposit
         
         return Deposit(
-            voorschot=voorschot,
-            gebruikt=gebruikt,
-            terug=terug,
-            restschade=restschade
+            voorschot=from_cents(voorschot_c),
+            gebruikt=from_cents(gebruikt),
+            terug=from_cents(terug),
+            restschade=from_cents(restschade)
+        )
+    
+    @staticmethod
+    def calculate_deposit_from_excel(voorschot: float, gebruikt_excel: float,
+                                     damage_total_incl: float) -> Deposit:
+        """
+        Calculate deposit amounts, preserving Excel's Borg_gebruikt
+        
+        NOTE: We preserve the 'gebruikt' value from Excel because deposits can be
+        used for various purposes (damage, cleaning, other costs), not just damage.
+        The Excel 'Borg_gebruikt' field is the source of truth.
+        
+        Logic:
+        - Gebruikt (for display/calc) is the TOTAL damage amount (so client sees full cost)
+        - Restschade is the overflow (Total Damage - Voorschot)
+        - Terug is what's left (Voorschot - Total Damage, min 0)
+        
+        Args:
+            voorschot: Prepaid deposit amount
+            gebruikt_excel: Borg_gebruikt from Excel
+            damage_total_incl: Total damage cost (incl. VAT)
+            
+        Returns:
+            Deposit entity with calculated values
+        """
+        voorschot_c = to_cents(voorschot)
+        total_damage = max(to_cents(gebruikt_excel), to_cents(damage_total_incl))
+        
+        # We store the FULL damage as 'gebruikt' so it appears in the "Kosten" column of the table.
+        # For the bar chart (yellow bar), we will cap it in viewmodels.py.
+        return Deposit(
+            voorschot=from_cents(voorschot_c),
+            gebruikt=from_cents(total_damage),
+            terug=from_cents(max(0, voorschot_c - total_damage)),
+            restschade=from_cents(max(0, total_damage - voorschot_c))
         )
     
     # ==================== GWE CALCULATIONS ====================
@@ -70,6 +113,20 @@ class Calculator:
             verbruik=verbruik
         )
     
+    @staticmethod
+    def calculate_meterstanden(meters: GWEMeterstanden) -> GWEMeterstanden:
+        """
+        Calculate consumption of all meters at once (same rule as calculate_meter_reading)
+        
+        Args:
+            meters: Readings of N meters
+            
+        Returns:
+            New GWEMeterstanden with verbruik = max(0, eind - begin)
+        """
+        return GWEMeterstanden(meters.keys, meters.begin, meters.eind,
+                               np.maximum(0.0, meters.eind - meters.begin))
+    
     @staticmethod
     def calculate_gwe_regel_kosten(verbruik_of_dagen: float, tarief_excl: float) -> float:
         """
@@ -80,29 +137,44 @@ class Calculator:
             tarief_excl: Rate excluding VAT
             
         Returns:
-            Total cost excluding VAT
+            Total cost excluding VAT (rounded to cents)
+        """
+        return from_cents(line_cents(verbruik_of_dagen, tarief_excl))
+    
+    @staticmethod
+    def calculate_gwe_regels(regels: Sequence[GWERegel]) -> GWERegels:
+        """
+        Calculate the cost of all GWE lines at once (same rule as calculate_gwe_regel_kosten)
+        
+        Args:
+            regels: GWERegels table or list of GWERegel
+            
+        Returns:
+            New GWERegels with kosten_excl = verbruik_of_dagen x tarief_excl, rounded to cents
         """
-        return verbruik_of_dagen * tarief_excl
+        regels = GWERegels.as_table(regels)
+        return regels.with_bedragen(to_cents_array(regels.verbruik_of_dagen * regels.tarief_excl) / CENTS_PER_EURO)
     
     @staticmethod
-    def calculate_gwe_totalen(regels: List[GWERegel]) -> GWETotalen:
+    def calculate_gwe_totalen(regels: Sequence[GWERegel], btw_procent: Optional[int] = None) -> GWETotalen:
         """
         Calculate GWE totals from cost lines
         
         Args:
-            regels: List of GWE cost line items
+            regels: GWERegels table or list of GWE cost line items
+            btw_procent: BTW rate in whole percent (default: BTW_PROCENT)
             
         Returns:
             GWETotalen with calculated totals and VAT
         """
-        totaal_excl = sum(regel.kosten_excl for regel in regels)
-        btw = totaal_excl * Calculator.BTW_PERCENTAGE
+        totaal_excl = int(to_cents_array(GWERegels.as_table(regels).kosten_excl).sum())
+        btw = percentage_cents(totaal_excl, Calculator.BTW_PROCENT if btw_procent is None else btw_procent)
         totaal_incl = totaal_excl + btw
         
         return GWETotalen(
-            totaal_excl=totaal_excl,
-            btw=btw,
-            totaal_incl=totaal_incl
+            totaal_excl=from_cents(totaal_excl),
+            btw=from_cents(btw),
+            totaal_incl=from_cents(totaal_incl)
         )
     
     @staticmethod
@@ -117,7 +189,7 @@ class Calculator:
         Returns:
             Difference amount (voorschot - totaal_incl)
         """
-        return voorschot - totaal_incl
+        return from_cents(to_cents(voorschot) - to_cents(totaal_incl))
     
     # ==================== CLEANING CALCULATIONS ====================
     
@@ -153,7 +225,7 @@ class Calculator:
         """
         inbegrepen_uren = Calculator.calculate_inbegrepen_uren(pakket_type)
         extra_uren = max(0, totaal_uren - inbegrepen_uren)
-        extra_bedrag = extra_uren * uurtarief
+        extra_bedrag = from_cents(line_cents(extra_uren, uurtarief))
         
         return Cleaning(
             pakket_type=pakket_type,  # type: ignore
@@ -178,29 +250,44 @@ class Calculator:
             tarief_excl: Rate excluding VAT
             
         Returns:
-            Total amount excluding VAT
+            Total amount excluding VAT (rounded to cents)
         """
-        return aantal * tarief_excl
+        return from_cents(line_cents(aantal, tarief_excl))
     
     @staticmethod
-    def calculate_damage_totalen(regels: List[DamageRegel]) -> DamageTotalen:
+    def calculate_damage_regels(regels: Sequence[DamageRegel]) -> DamageRegels:
+        """
+        Calculate the amount of all damage lines at once (same rule as calculate_damage_regel_bedrag)
+        
+        Args:
+            regels: DamageRegels table or list of DamageRegel
+            
+        Returns:
+            New DamageRegels with bedrag_excl = aantal x tarief_excl, rounded to cents
+        """
+        regels = DamageRegels.as_table(regels)
+        return regels.with_bedragen(to_cents_array(regels.aantal * regels.tarief_excl) / CENTS_PER_EURO)
+    
+    @staticmethod
+    def calculate_damage_totalen(regels: Sequence[DamageRegel], btw_procent: Optional[int] = None) -> DamageTotalen:
         """
         Calculate damage totals from line items
         
         Args:
-            regels: List of damage line items
+            regels: DamageRegels table or list of damage line items
+            btw_procent: BTW rate in whole percent (default: BTW_PROCENT)
             
         Returns:
             DamageTotalen with calculated totals and VAT
         """
-        totaal_excl = sum(regel.bedrag_excl for regel in regels)
-        btw = totaal_excl * Calculator.BTW_PERCENTAGE
+        totaal_excl = int(to_cents_array(DamageRegels.as_table(regels).bedrag_excl).sum())
+        btw = percentage_cents(totaal_excl, Calculator.BTW_PROCENT if btw_procent is None else btw_procent)
         totaal_incl = totaal_excl + btw
         
         return DamageTotalen(
-            totaal_excl=totaal_excl,
-            btw=btw,
-            totaal_incl=totaal_incl
+            totaal_excl=from_cents(totaal_excl),
+            btw=from_cents(btw),
+            totaal_incl=from_cents(totaal_incl)
         )
     
     # ==================== SETTLEMENT CALCULATIONS ====================
@@ -225,27 +312,28 @@ class Calculator:
         # Positive = refund to customer
         # Negative = customer must pay
         
-        totaal_eindafrekening = 0.0
+        # All amounts in cents, so the total is an exact sum
+        totaal_eindafrekening = 0
         
         # Deposit refund (positive)
         # NOTE: Restschade (overflow) is NOT charged to the tenant in this report.
         # It is displayed visually but excluded from the settlement total.
-        totaal_eindafrekening += borg.terug
+        totaal_eindafrekening += to_cents(borg.terug)
         # totaal_eindafrekening -= borg.restschade  <-- REMOVED per user feedback
         
         # GWE: voorschot minus actual consumption
-        gwe_meer_minder = gwe_voorschot - gwe_totalen.totaal_incl
+        gwe_meer_minder = to_cents(gwe_voorschot) - to_cents(gwe_totalen.totaal_incl)
         totaal_eindafrekening += gwe_meer_minder
         
         # Cleaning extra cost (negative)
-        totaal_eindafrekening -= cleaning.extra_bedrag
+        totaal_eindafrekening -= to_cents(cleaning.extra_bedrag)
         
         return Settlement(
             borg=borg,
             gwe_totalen=gwe_totalen,
             cleaning=cleaning,
             damage_totalen=damage_totalen,
-            totaal_eindafrekening=totaal_eindafrekening
+            totaal_eindafrekening=from_cents(totaal_eindafrekening)
         )
     
     # ==================== PERCENTAGE CALCULATIONS (for bar charts) ====================
@@ -324,8 +412,319 @@ class Calculator:
             }
 
 
+# ==================== BATCH (VECTORISED) CALCULATIONS ====================
+
+class SettlementBatch:
+    """
+    Column-oriented calculator for many settlements at once
+
+    Holds the inputs of N settlements as NumPy columns and computes the same
+    derived values as recalculate_all() + Calculator.calculate_settlement(),
+    in a handful of vectorised passes. Amounts are converted to int64 cents
+    with the same rounding rules as money.py, so results match the scalar
+    calculation exactly (not just within a tolerance).
+
+    GWE / damage line items are passed as flat arrays with an owner index
+    (settlement row) per line. Settlements without lines keep the totals
+    from Excel (rounded to cents), like recalculate_all().
+    """
+
+    # Result columns that are hours, not money
+    NON_MONEY_COLUMNS = ('extra_uren',)
+
+    def __init__(self,
+                 borg_voorschot: Sequence[float],
+                 borg_gebruikt: Sequence[float],
+                 gwe_voorschot: Sequence[float],
+                 inbegrepen_uren: Sequence[float],
+                 totaal_uren: Sequence[float],
+                 uurtarief: Sequence[float],
+                 gwe_totaal_excl: Optional[Sequence[float]] = None,
+                 gwe_btw: Optional[Sequence[float]] = None,
+                 gwe_totaal_incl: Optional[Sequence[float]] = None,
+                 damage_totaal_excl: Optional[Sequence[float]] = None,
+                 damage_btw: Optional[Sequence[float]] = None,
+                 damage_totaal_incl: Optional[Sequence[float]] = None,
+                 gwe_regel_index: Optional[Sequence[int]] = None,
+                 gwe_verbruik: Optional[Sequence[float]] = None,
+                 gwe_tarief: Optional[Sequence[float]] = None,
+                 damage_regel_index: Optional[Sequence[int]] = None,
+                 damage_aantal: Optional[Sequence[float]] = None,
+                 damage_tarief: Optional[Sequence[float]] = None,
+                 btw_procent: Optional[Sequence[int]] = None):
+        """
+        Args:
+            borg_voorschot: Prepaid deposit per settlement
+            borg_gebruikt: Borg_gebruikt from Excel per settlement
+            gwe_voorschot: Prepaid GWE per settlement
+            inbegrepen_uren: Hours included in the cleaning package
+            totaal_uren: Total cleaning hours worked
+            uurtarief: Cleaning hourly rate
+            gwe_totaal_excl: GWE total excl. VAT from Excel (used when a settlement has no GWE lines)
+            gwe_btw: GWE BTW from Excel (default: 21% of gwe_totaal_excl)
+            gwe_totaal_incl: GWE total incl. VAT from Excel (default: excl + BTW)
+            damage_totaal_excl: Damage total excl. VAT from Excel (used when a settlement has no damage lines)
+            damage_btw: Damage BTW from Excel (default: 21% of damage_totaal_excl)
+            damage_totaal_incl: Damage total incl. VAT from Excel (default: excl + BTW)
+            gwe_regel_index: Owning settlement row of each GWE line
+            gwe_verbruik: Consumption/days of each GWE line
+            gwe_tarief: Rate excl. VAT of each GWE line
+            damage_regel_index: Owning settlement row of each damage line
+            damage_aantal: Quantity of each damage line
+            damage_tarief: Rate excl. VAT of each damage line
+            btw_procent: BTW rate in whole percent per settlement (default: BTW_PROCENT)
+        """
+        self.borg_voorschot = np.asarray(borg_voorschot, dtype=np.float64)
+        n = len(self.borg_voorschot)
+        self.borg_gebruikt = np.asarray(borg_gebruikt, dtype=np.float64)
+        self.gwe_voorschot = np.asarray(gwe_voorschot, dtype=np.float64)
+        self.inbegrepen_uren = np.asarray(inbegrepen_uren, dtype=np.float64)
+        self.totaal_uren = np.asarray(totaal_uren, dtype=np.float64)
+        self.uurtarief = np.asarray(uurtarief, dtype=np.float64)
+        self.gwe_totaal_excl = self._column(gwe_totaal_excl, n)
+        self.gwe_btw = self._optional_column(gwe_btw)
+        self.gwe_totaal_incl = self._optional_column(gwe_totaal_incl)
+        self.damage_totaal_excl = self._column(damage_totaal_excl, n)
+        self.damage_btw = self._optional_column(damage_btw)
+        self.damage_totaal_incl = self._optional_column(damage_totaal_incl)
+
+        self.gwe_regel_index = np.asarray(gwe_regel_index if gwe_regel_index is not None else [], dtype=np.intp)
+        self.gwe_verbruik = self._column(gwe_verbruik, len(self.gwe_regel_index))
+        self.gwe_tarief = self._column(gwe_tarief, len(self.gwe_regel_index))
+        self.damage_regel_index = np.asarray(damage_regel_index if damage_regel_index is not None else [], dtype=np.intp)
+        self.damage_aantal = self._column(damage_aantal, len(self.damage_regel_index))
+        self.damage_tarief = self._column(damage_tarief, len(self.damage_regel_index))
+        self.btw_procent = (np.full(n, Calculator.BTW_PROCENT, dtype=np.int64) if btw_procent is None
+                            else np.asarray(btw_procent, dtype=np.int64))
+
+    @staticmethod
+    def _column(values: Optional[Sequence[float]], n: int) -> np.ndarray:
+        if values is None:
+            return np.zeros(n, dtype=np.float64)
+        return np.asarray(values, dtype=np.float64)
+
+    @staticmethod
+    def _optional_column(values: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        return None if values is None else np.asarray(values, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.borg_voorschot)
+
+    @classmethod
+    def from_data(cls, records: List[Dict[str, Any]]) -> 'SettlementBatch':
+        """
+        Build a batch from excel_reader data dictionaries
+
+        Args:
+            records: Dictionaries as returned by read_excel() (plus 'gwe_voorschot')
+
+        Returns:
+            SettlementBatch with one row per record
+        """
+        columns: Dict[str, list] = {key: [] for key in (
+            'borg_voorschot', 'borg_gebruikt', 'gwe_voorschot', 'inbegrepen_uren',
+            'totaal_uren', 'uurtarief', 'gwe_totaal_excl', 'gwe_btw', 'gwe_totaal_incl',
+            'damage_totaal_excl', 'damage_btw', 'damage_totaal_incl',
+            'gwe_regel_index', 'gwe_verbruik', 'gwe_tarief',
+            'damage_regel_index', 'damage_aantal', 'damage_tarief', 'btw_procent')}
+
+        for i, data in enumerate(records):
+            cleaning = data['cleaning']
+            columns['borg_voorschot'].append(data['deposit'].voorschot)
+            columns['borg_gebruikt'].append(data['deposit'].gebruikt)
+            columns['gwe_voorschot'].append(data.get('gwe_voorschot', 0.0))
+            columns['inbegrepen_uren'].append(Calculator.calculate_inbegrepen_uren(cleaning.pakket_type))
+            columns['totaal_uren'].append(cleaning.totaal_uren)
+            columns['uurtarief'].append(cleaning.uurtarief)
+            columns['btw_procent'].append(data.get('btw_procent', Calculator.BTW_PROCENT))
+            for prefix, totalen in (('gwe', data['gwe_totalen']), ('damage', data['damage_totalen'])):
+                columns[f'{prefix}_totaal_excl'].append(totalen.totaal_excl)
+                columns[f'{prefix}_btw'].append(totalen.btw)
+                columns[f'{prefix}_totaal_incl'].append(totalen.totaal_incl)
+
+            gwe_regels = GWERegels.as_table(data.get('gwe_regels', ()))
+            columns['gwe_regel_index'].extend([i] * len(gwe_regels))
+            columns['gwe_verbruik'].extend(gwe_regels.verbruik_of_dagen.tolist())
+            columns['gwe_tarief'].extend(gwe_regels.tarief_excl.tolist())
+            damage_regels = DamageRegels.as_table(data.get('damage_regels', ()))
+            columns['damage_regel_index'].extend([i] * len(damage_regels))
+            columns['damage_aantal'].extend(damage_regels.aantal.tolist())
+            columns['damage_tarief'].extend(damage_regels.tarief_excl.tolist())
+
+        return cls(**columns)
+
+    def _line_totals(self, index: np.ndarray, line_cents: np.ndarray, fallback_excl: np.ndarray,
+                     fallback_btw: Optional[np.ndarray], fallback_incl: Optional[np.ndarray]):
+        """
+        Sum line cents per settlement and add BTW
+
+        Rows without lines keep the totals from Excel (like recalculate_all).
+
+        Returns:
+            Tuple (totaal_excl, btw, totaal_incl) int64 cent columns
+        """
+        n = len(self)
+        # Sums of whole cents are exact in float64 (far below 2**53)
+        excl = np.bincount(index, weights=line_cents, minlength=n).astype(np.int64)
+        btw = percentage_cents_array(excl, self.btw_procent)
+        incl = excl + btw
+
+        old_excl = to_cents_array(fallback_excl)
+        old_btw = (percentage_cents_array(old_excl, self.btw_procent)
+                   if fallback_btw is None else to_cents_array(fallback_btw))
+        old_incl = old_excl + old_btw if fallback_incl is None else to_cents_array(fallback_incl)
+
+        has_lines = np.bincount(index, minlength=n) > 0
+        return (np.where(has_lines, excl, old_excl),
+                np.where(has_lines, btw, old_btw),
+                np.where(has_lines, incl, old_incl))
+
+    def calculate_cents(self) -> Dict[str, np.ndarray]:
+        """
+        Compute all derived settlement values in cents
+
+        Returns:
+            Dictionary of int64 cent columns (extra_uren is float hours): gwe_kosten_excl,
+            gwe_totaal_excl, gwe_btw, gwe_totaal_incl, gwe_meer_minder, damage_bedrag_excl,
+            damage_totaal_excl, damage_btw, damage_totaal_incl, borg_gebruikt, borg_terug,
+            restschade, extra_uren, extra_bedrag, totaal_eindafrekening
+        """
+        # GWE
+        gwe_kosten = to_cents_array(self.gwe_verbruik * self.gwe_tarief)
+        gwe_excl, gwe_btw, gwe_incl = self._line_totals(
+            self.gwe_regel_index, gwe_kosten, self.gwe_totaal_excl, self.gwe_btw, self.gwe_totaal_incl)
+        gwe_meer_minder = to_cents_array(self.gwe_voorschot) - gwe_incl
+
+        # Damage
+        damage_bedrag = to_cents_array(self.damage_aantal * self.damage_tarief)
+        damage_excl, damage_btw, damage_incl = self._line_totals(
+            self.damage_regel_index, damage_bedrag, self.damage_totaal_excl,
+            self.damage_btw, self.damage_totaal_incl)
+
+        # Deposit (Excel's Borg_gebruikt is preserved, see recalculate_all)
+        voorschot = to_cents_array(self.borg_voorschot)
+        total_damage = np.maximum(to_cents_array(self.borg_gebruikt), damage_incl)
+        borg_terug = np.maximum(0, voorschot - total_damage)
+        restschade = np.maximum(0, total_damage - voorschot)
+
+        # Cleaning
+        extra_uren = np.maximum(0.0, self.totaal_uren - self.inbegrepen_uren)
+        extra_bedrag = to_cents_array(extra_uren * self.uurtarief)
+
+        # Settlement (restschade is not charged, see calculate_settlement)
+        totaal = borg_terug + gwe_meer_minder - extra_bedrag
+
+        return {
+            'gwe_kosten_excl': gwe_kosten,
+            'gwe_totaal_excl': gwe_excl,
+            'gwe_btw': gwe_btw,
+            'gwe_totaal_incl': gwe_incl,
+            'gwe_meer_minder': gwe_meer_minder,
+            'damage_bedrag_excl': damage_bedrag,
+            'damage_totaal_excl': damage_excl,
+            'damage_btw': damage_btw,
+            'damage_totaal_incl': damage_incl,
+            'borg_gebruikt': total_damage,
+            'borg_terug': borg_terug,
+            'restschade': restschade,
+            'extra_uren': extra_uren,
+            'extra_bedrag': extra_bedrag,
+            'totaal_eindafrekening': totaal,
+        }
+
+    def calculate(self) -> Dict[str, np.ndarray]:
+        """
+        Compute all derived settlement values in euro
+
+        Returns:
+            Same columns as calculate_cents(), money columns as float euros
+            (identical to the floats produced by the scalar Calculator)
+        """
+        return {key: column if key in self.NON_MONEY_COLUMNS else column / CENTS_PER_EURO
+                for key, column in self.calculate_cents().items()}
+
+
+def _batch_parity_check(n: int = 2000, seed: int = 42) -> int:
+    """
+    Compare SettlementBatch against the scalar recalculate_all + calculate_settlement path
+
+    Returns:
+        Number of mismatching values (0 = exact parity)
+    """
+    import random
+    from entities import Cleaning
+    rng = random.Random(seed)
+
+    records = []
+    for _ in range(n):
+        gwe_regels = [GWERegel("Regel", round(rng.uniform(0, 900), 2), round(rng.uniform(0, 2), 4), 0.0)
+                      for _ in range(rng.randint(0, 6))]
+        damage_regels = [DamageRegel("Schade", rng.randint(1, 4), round(rng.uniform(5, 400), 2), 0.0)
+                         for _ in range(rng.randint(0, 5))]
+        records.append({
+            'deposit': Deposit(voorschot=rng.choice([0, 500, 800, 1200]),
+                               gebruikt=rng.uniform(0, 900), terug=0.0, restschade=0.0),
+            'gwe_voorschot': rng.choice([0, 250, 350.5]),
+            'gwe_regels': gwe_regels,
+            'gwe_totalen': GWETotalen(rng.uniform(0, 500), rng.uniform(0, 100), rng.uniform(0, 600)),
+            'damage_regels': damage_regels,
+            'damage_totalen': DamageTotalen(rng.uniform(0, 500), rng.uniform(0, 100), rng.uniform(0, 600)),
+            'cleaning': Cleaning(rng.choice(['5_uur', '7_uur']), 'Schoonmaak', 0.0,
+                                 round(rng.uniform(0, 12), 2), 0.0, rng.choice([45, 50.5]), 0.0, 250),
+        })
+
+    batch = SettlementBatch.from_data(records)
+    result = batch.calculate()
+
+    mismatches = 0
+    for i, data in enumerate(records):
+        data = recalculate_all(data)
+        settlement = Calculator.calculate_settlement(
+            borg=data['deposit'], gwe_voorschot=data['gwe_voorschot'],
+            gwe_totalen=data['gwe_totalen'], cleaning=data['cleaning'],
+            damage_totalen=data['damage_totalen'])
+        expected = {
+            'gwe_btw': data['gwe_totalen'].btw,
+            'gwe_totaal_incl': data['gwe_totalen'].totaal_incl,
+            'damage_btw': data['damage_totalen'].btw,
+            'damage_totaal_incl': data['damage_totalen'].totaal_incl,
+            'borg_gebruikt': data['deposit'].gebruikt,
+            'borg_terug': data['deposit'].terug,
+            'restschade': data['deposit'].restschade,
+            'extra_bedrag': data['cleaning'].extra_bedrag,
+            'totaal_eindafrekening': settlement.totaal_eindafrekening,
+        }
+        mismatches += sum(1 for key, value in expected.items() if result[key][i] != value)
+    return mismatches
+
+
 # ==================== VALIDATION FUNCTIONS ====================
 
+def _cents_differ(expected: float, actual: float, tolerance_cents: int = 0) -> bool:
+    """
+    Compare two amounts in whole cents
+
+    Args:
+        expected: Amount calculated by Python (already exact cents)
+        actual: Amount from Excel (unrounded formula result)
+        tolerance_cents: Allowed difference in cents
+
+    Returns:
+        True if the amounts differ by more than the tolerance
+    """
+    return abs(to_cents(expected) - to_cents(actual)) > tolerance_cents
+
+
+def _total_tolerance_cents(line_count: int) -> int:
+    """
+    Allowed difference between a Python total and the Excel total
+
+    Excel sums unrounded line amounts, Python sums lines rounded to cents,
+    so each line may contribute up to half a cent (plus one cent for BTW).
+    """
+    return line_count + 1
+
+
 def validate_excel_calculations(data: Dict[str, Any]) -> List[str]:
     """
     Validate Excel-calculated values against Python business logic.
@@ -344,54 +743,47 @@ def validate_excel_calculations(data: Dict[str, Any]) -> List[str]:
     warnings = []
     calc = Calculator()
     
-    # Check GWE meter readings (stroom/electricity)
+    # Check GWE meter readings (all meters at once)
     if 'gwe_meterstanden' in data:
         meters = data['gwe_meterstanden']
-        
-        # KWh verbruik
-        expected_kwh = meters.stroom.eind - meters.stroom.begin
-        if abs(expected_kwh - meters.stroom.verbruik) > 0.01:
-            warnings.append(
-                f"KWh verbruik komt niet overeen: "
-                f"Verwacht {expected_kwh:.2f}, maar Excel heeft {meters.stroom.verbruik:.2f}"
-            )
-        
-        # Gas verbruik
-        expected_gas = meters.gas.eind - meters.gas.begin
-        if abs(expected_gas - meters.gas.verbruik) > 0.01:
+        expected = meters.eind - meters.begin
+        for i in np.nonzero(np.abs(expected - meters.verbruik) > 0.01)[0]:
+            label = meters.types[i].verbruik_name.replace('_', ' ')
             warnings.append(
-                f"Gas verbruik komt niet overeen: "
-                f"Verwacht {expected_gas:.2f}, maar Excel heeft {meters.gas.verbruik:.2f}"
+                f"{label} komt niet overeen: "
+                f"Verwacht {expected[i]:.2f}, maar Excel heeft {meters.verbruik[i]:.2f}"
             )
     
-    # Check GWE regel kosten (individual line items)
+    # Check GWE regel kosten (individual line items, all at once)
     if 'gwe_regels' in data:
-        for i, regel in enumerate(data['gwe_regels'], 1):
-            expected_kosten = regel.verbruik_of_dagen * regel.tarief_excl
-            if abs(expected_kosten - regel.kosten_excl) > 0.01:
-                warnings.append(
-                    f"GWE regel {i} '{regel.omschrijving}': "
-                    f"Kosten verwacht {expected_kosten:.2f}, maar Excel heeft {regel.kosten_excl:.2f}"
-                )
+        regels = GWERegels.as_table(data['gwe_regels'])
+        expected = calc.calculate_gwe_regels(regels)
+        for i in np.nonzero(to_cents_array(expected.kosten_excl) != to_cents_array(regels.kosten_excl))[0]:
+            warnings.append(
+                f"GWE regel {i + 1} '{regels.omschrijving[i]}': "
+                f"Kosten verwacht {expected.kosten_excl[i]:.2f}, maar Excel heeft {regels.kosten_excl[i]:.2f}"
+            )
     
     # Check GWE totals
     if 'gwe_regels' in data and 'gwe_totalen' in data:
-        expected_gwe_excl = sum(r.kosten_excl for r in data['gwe_regels'])
-        if abs(expected_gwe_excl - data['gwe_totalen'].totaal_excl) > 0.01:
+        tolerance = _total_tolerance_cents(len(data['gwe_regels']))
+        expected_gwe = calc.calculate_gwe_totalen(calc.calculate_gwe_regels(data['gwe_regels']))
+        expected_gwe_excl = expected_gwe.totaal_excl
+        if _cents_differ(expected_gwe_excl, data['gwe_totalen'].totaal_excl, tolerance):
             warnings.append(
                 f"GWE totaal excl komt niet overeen: "
                 f"Verwacht {expected_gwe_excl:.2f}, maar Excel heeft {data['gwe_totalen'].totaal_excl:.2f}"
             )
         
-        expected_gwe_btw = expected_gwe_excl * 0.21
-        if abs(expected_gwe_btw - data['gwe_totalen'].btw) > 0.01:
+        expected_gwe_btw = expected_gwe.btw
+        if _cents_differ(expected_gwe_btw, data['gwe_totalen'].btw, tolerance):
             warnings.append(
                 f"GWE BTW komt niet overeen: "
                 f"Verwacht {expected_gwe_btw:.2f}, maar Excel heeft {data['gwe_totalen'].btw:.2f}"
             )
         
-        expected_gwe_incl = expected_gwe_excl + expected_gwe_btw
-        if abs(expected_gwe_incl - data['gwe_totalen'].totaal_incl) > 0.01:
+        expected_gwe_incl = expected_gwe.totaal_incl
+        if _cents_differ(expected_gwe_incl, data['gwe_totalen'].totaal_incl, tolerance):
             warnings.append(
                 f"GWE totaal incl komt niet overeen: "
                 f"Verwacht {expected_gwe_incl:.2f}, maar Excel heeft {data['gwe_totalen'].totaal_incl:.2f}"
@@ -416,41 +808,43 @@ def validate_excel_calculations(data: Dict[str, Any]) -> List[str]:
                 f"Verwacht {expected_extra_uren:.2f}, maar Excel heeft {cleaning.extra_uren:.2f}"
             )
         
-        expected_extra_bedrag = expected_extra_uren * cleaning.uurtarief
-        if abs(expected_extra_bedrag - cleaning.extra_bedrag) > 0.01:
+        expected_extra_bedrag = from_cents(line_cents(expected_extra_uren, cleaning.uurtarief))
+        if _cents_differ(expected_extra_bedrag, cleaning.extra_bedrag):
             warnings.append(
                 f"Extra schoonmaak bedrag komt niet overeen: "
                 f"Verwacht €{expected_extra_bedrag:.2f}, maar Excel heeft €{cleaning.extra_bedrag:.2f}"
             )
     
-    # Check damage regel bedragen (individual line items)
+    # Check damage regel bedragen (individual line items, all at once)
     if 'damage_regels' in data:
-        for i, regel in enumerate(data['damage_regels'], 1):
-            expected_bedrag = regel.aantal * regel.tarief_excl
-            if abs(expected_bedrag - regel.bedrag_excl) > 0.01:
-                warnings.append(
-                    f"Schade regel {i} '{regel.beschrijving}': "
-                    f"Bedrag verwacht €{expected_bedrag:.2f}, maar Excel heeft €{regel.bedrag_excl:.2f}"
-                )
+        regels = DamageRegels.as_table(data['damage_regels'])
+        expected = calc.calculate_damage_regels(regels)
+        for i in np.nonzero(to_cents_array(expected.bedrag_excl) != to_cents_array(regels.bedrag_excl))[0]:
+            warnings.append(
+                f"Schade regel {i + 1} '{regels.beschrijving[i]}': "
+                f"Bedrag verwacht €{expected.bedrag_excl[i]:.2f}, maar Excel heeft €{regels.bedrag_excl[i]:.2f}"
+            )
     
     # Check damage totals
     if 'damage_regels' in data and 'damage_totalen' in data:
-        expected_damage_excl = sum(r.bedrag_excl for r in data['damage_regels'])
-        if abs(expected_damage_excl - data['damage_totalen'].totaal_excl) > 0.01:
+        tolerance = _total_tolerance_cents(len(data['damage_regels']))
+        expected_damage = calc.calculate_damage_totalen(calc.calculate_damage_regels(data['damage_regels']))
+        expected_damage_excl = expected_damage.totaal_excl
+        if _cents_differ(expected_damage_excl, data['damage_totalen'].totaal_excl, tolerance):
             warnings.append(
                 f"Schade totaal excl komt niet overeen: "
                 f"Verwacht €{expected_damage_excl:.2f}, maar Excel heeft €{data['damage_totalen'].totaal_excl:.2f}"
             )
         
-        expected_damage_btw = expected_damage_excl * 0.21
-        if abs(expected_damage_btw - data['damage_totalen'].btw) > 0.01:
+        expected_damage_btw = expected_damage.btw
+        if _cents_differ(expected_damage_btw, data['damage_totalen'].btw, tolerance):
             warnings.append(
                 f"Schade BTW komt niet overeen: "
                 f"Verwacht €{expected_damage_btw:.2f}, maar Excel heeft €{data['damage_totalen'].btw:.2f}"
             )
         
-        expected_damage_incl = expected_damage_excl + expected_damage_btw
-        if abs(expected_damage_incl - data['damage_totalen'].totaal_incl) > 0.01:
+        expected_damage_incl = expected_damage.totaal_incl
+        if _cents_differ(expected_damage_incl, data['damage_totalen'].totaal_incl, tolerance):
             warnings.append(
                 f"Schade totaal incl komt niet overeen: "
                 f"Verwacht €{expected_damage_incl:.2f}, maar Excel heeft €{data['damage_totalen'].totaal_incl:.2f}"
@@ -460,22 +854,23 @@ def validate_excel_calculations(data: Dict[str, Any]) -> List[str]:
     if 'deposit' in data and 'damage_totalen' in data:
         dep = data['deposit']
         
-        expected_gebruikt = min(dep.voorschot, data['damage_totalen'].totaal_incl)
-        if abs(expected_gebruikt - dep.gebruikt) > 0.01:
+        expected = calc.calculate_deposit(dep.voorschot, data['damage_totalen'].totaal_incl)
+        expected_gebruikt = expected.gebruikt
+        if _cents_differ(expected_gebruikt, dep.gebruikt):
             warnings.append(
                 f"Borg gebruikt komt niet overeen: "
                 f"Verwacht €{expected_gebruikt:.2f}, maar Excel heeft €{dep.gebruikt:.2f}"
             )
         
-        expected_terug = max(0, dep.voorschot - data['damage_totalen'].totaal_incl)
-        if abs(expected_terug - dep.terug) > 0.01:
+        expected_terug = expected.terug
+        if _cents_differ(expected_terug, dep.terug):
             warnings.append(
                 f"Borg terug komt niet overeen: "
                 f"Verwacht €{expected_terug:.2f}, maar Excel heeft €{dep.terug:.2f}"
             )
         
-        expected_restschade = max(0, data['damage_totalen'].totaal_incl - dep.voorschot)
-        if abs(expected_restschade - dep.restschade) > 0.01:
+        expected_restschade = expected.restschade
+        if _cents_differ(expected_restschade, dep.restschade):
             warnings.append(
                 f"Restschade komt niet overeen: "
                 f"Verwacht €{expected_restschade:.2f}, maar Excel heeft €{dep.restschade:.2f}"
@@ -486,6 +881,15 @@ def validate_excel_calculations(data: Dict[str, Any]) -> List[str]:
 
 # ==================== CONVENIENCE FUNCTIONS ====================
 
+def round_totalen_to_cents(totalen):
+    """Round totals taken over from Excel to whole cents (same entity type)"""
+    return type(totalen)(
+        totaal_excl=from_cents(to_cents(totalen.totaal_excl)),
+        btw=from_cents(to_cents(totalen.btw)),
+        totaal_incl=from_cents(to_cents(totalen.totaal_incl))
+    )
+
+
 def recalculate_all(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Recalculate all computed values from raw Excel data
@@ -502,43 +906,31 @@ def recalculate_all(data: Dict[str, Any]) -> Dict[str, Any]:
     
     # Recalculate GWE meter readings
     if 'gwe_meterstanden' in data:
-        meters = data['gwe_meterstanden']
-        meters.stroom = calc.calculate_meter_reading(
-            meters.stroom.begin, 
-            meters.stroom.eind
-        )
-        meters.gas = calc.calculate_meter_reading(
-            meters.gas.begin,
-            meters.gas.eind
-        )
+        data['gwe_meterstanden'] = calc.calculate_meterstanden(data['gwe_meterstanden'])
     
     # Recalculate GWE regel kosten
     if 'gwe_regels' in data:
-        for regel in data['gwe_regels']:
-            regel.kosten_excl = calc.calculate_gwe_regel_kosten(
-                regel.verbruik_of_dagen,
-                regel.tarief_excl
-            )
+        data['gwe_regels'] = calc.calculate_gwe_regels(data['gwe_regels'])
     
     # Recalculate GWE totals - only if there are detail lines with actual costs
     # If no detail lines with costs exist, preserve existing totals from Excel
     if 'gwe_regels' in data and len(data['gwe_regels']) > 0:
         # Always recalculate if rules exist, as Excel formulas might not be calculated
-        data['gwe_totalen'] = calc.calculate_gwe_totalen(data['gwe_regels'])
+        data['gwe_totalen'] = calc.calculate_gwe_totalen(data['gwe_regels'], data.get('btw_procent'))
+    elif 'gwe_totalen' in data:
+        data['gwe_totalen'] = round_totalen_to_cents(data['gwe_totalen'])
     
     # Recalculate damage regel bedragen
     if 'damage_regels' in data:
-        for regel in data['damage_regels']:
-            regel.bedrag_excl = calc.calculate_damage_regel_bedrag(
-                regel.aantal,
-                regel.tarief_excl
-            )
+        data['damage_regels'] = calc.calculate_damage_regels(data['damage_regels'])
     
     # Recalculate damage totals - only if there are detail lines with actual amounts
     # If no detail lines with amounts exist, preserve existing totals from Excel
     if 'damage_regels' in data and len(data['damage_regels']) > 0:
         # Always recalculate if rules exist, as Excel formulas might not be calculated
-        data['damage_totalen'] = calc.calculate_damage_totalen(data['damage_regels'])
+        data['damage_totalen'] = calc.calculate_damage_totalen(data['damage_regels'], data.get('btw_procent'))
+    elif 'damage_totalen' in data:
+        data['damage_totalen'] = round_totalen_to_cents(data['damage_totalen'])
     
     # Recalculate cleaning
     if 'cleaning' in data:
@@ -553,36 +945,10 @@ def recalculate_all(data: Dict[str, Any]) -> Dict[str, Any]:
     
     # Recalculate deposit - preserve gebruikt value from Excel
     if 'deposit' in data and 'damage_totalen' in data:
-        # NOTE: We preserve the 'gebruikt' value from Excel because deposits can be
-        # used for various purposes (damage, cleaning, other costs), not just damage.
-        # The Excel 'Borg_gebruikt' field is the source of truth.
-        existing_deposit = data['deposit']
-        voorschot = existing_deposit.voorschot
-        gebruikt = existing_deposit.gebruikt  # Preserve from Excel
-        terug = max(0, voorschot - gebruikt)
-
-        # Recalculate terug and restschade based on Excel's gebruikt value (which is total damage)
-        # Logic:
-        # - Gebruikt (for display/calc) is the TOTAL damage amount (so client sees full cost)
-        # - Restschade is the overflow (Total Damage - Voorschot)
-        # - Terug is what's left (Voorschot - Total Damage, min 0)
-        
-        # Use damage_totalen if available, otherwise fallback to Excel value
-        total_damage = existing_deposit.gebruikt
-        if 'damage_totalen' in data:
-             total_damage = max(total_damage, data['damage_totalen'].totaal_incl)
-        
-        # We store the FULL damage as 'gebruikt' so it appears in the "Kosten" column of the table.
-        # For the bar chart (yellow bar), we will cap it in viewmodels.py.
-        gebruikt_full = total_damage
-        terug = max(0, voorschot - total_damage)
-        restschade = max(0, total_damage - voorschot)
-
-        data['deposit'] = Deposit(
-            voorschot=voorschot,
-            gebruikt=gebruikt_full,
-            terug=terug,
-            restschade=restschade
+        data['deposit'] = calc.calculate_deposit_from_excel(
+            data['deposit'].voorschot,
+            data['deposit'].gebruikt,
+            data['damage_totalen'].totaal_incl
         )
     
     return data
@@ -642,5 +1008,21 @@ if __name__ == "__main__":
     print(f"   - Extra: {bars2['extra_pct']:.1f}%")
     print(f"   - Is overfilled: {bars2['is_overfilled']}")
     
+    # Test batch parity
+    print("\n5. SettlementBatch parity (vs. scalar recalculate_all):")
+    import time
+    mismatches = _batch_parity_check()
+    print(f"   Mismatches: {mismatches}")
+    assert mismatches == 0, "SettlementBatch results differ from scalar calculation"
+
+    batch = SettlementBatch(
+        borg_voorschot=np.full(100_000, 800.0), borg_gebruikt=np.zeros(100_000),
+        gwe_voorschot=np.full(100_000, 350.0), inbegrepen_uren=np.full(100_000, 5.0),
+        totaal_uren=np.linspace(0, 10, 100_000), uurtarief=np.full(100_000, 50.0),
+        damage_totaal_excl=np.linspace(0, 1000, 100_000))
+    start = time.perf_counter()
+    batch.calculate()
+    print(f"   100.000 settlements: {(time.perf_counter() - start) * 1000:.1f} ms")
+
     print("\n✅ Calculator tests completed!")
 
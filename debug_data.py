@@ -10,9 +10,8 @@ def debug_excel_data(filename):
         print("\n--- GWE Meterstanden Debug ---")
         if 'gwe_meterstanden' in data:
             ms = data['gwe_meterstanden']
-            print(f"Stroom: {ms.stroom}")
-            print(f"Gas: {ms.gas}")
-            print(f"Water: {ms.water}")
+            for meter_type, reading in ms.items():
+                print(f"{meter_type.label}: {reading}")
         else:
             print("KEY 'gwe_meterstanden' NOT FOUND in data!")
             
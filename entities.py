@@ -4,14 +4,20 @@ Entities - Data Models for RyanRent Eindafrekening Generator
 
 All dataclasses representing the domain model for settlement generation.
 Matches the structure defined in Mappings/entities.json.
+
+The dataclasses use __slots__ (no per-instance __dict__): portfolio runs
+hold hundreds of thousands of line items, and a slotted GWERegel takes
+72 instead of 112 bytes (see benchmark_memory.py).
 """
 
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
 
 
-@dataclass
+@dataclass(slots=True)
 class Client:
     """Client information"""
     name: str
@@ -20,7 +26,7 @@ class Client:
     phone: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Object:
     """Rental property information"""
     address: str
@@ -30,7 +36,7 @@ class Object:
     object_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Period:
     """Rental period information"""
     checkin_date: date
@@ -38,7 +44,7 @@ class Period:
     days: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Deposit:
     """Deposit (borg) information"""
     voorschot: float  # Prepaid deposit
@@ -47,15 +53,15 @@ class Deposit:
     restschade: float # Remaining damage costs
 
 
-@dataclass
+@dataclass(slots=True)
 class GWEMeterReading:
-    """Utility meter reading (electricity or gas)"""
+    """Reading of one utility meter (see METER_TYPES)"""
     begin: float      # Starting meter reading
     eind: float       # Ending meter reading
     verbruik: float   # Consumption (eind - begin)
 
 
-@dataclass
+@dataclass(slots=True)
 class GWERegel:
     """Single GWE cost line item"""
     omschrijving: str           # Description
@@ -64,7 +70,7 @@ class GWERegel:
     kosten_excl: float          # Cost excl. VAT
 
 
-@dataclass
+@dataclass(slots=True)
 class GWETotalen:
     """GWE totals with VAT calculation"""
     totaal_excl: float  # Total excl. VAT
@@ -72,7 +78,7 @@ class GWETotalen:
     totaal_incl: float  # Total incl. VAT
 
 
-@dataclass
+@dataclass(slots=True)
 class Cleaning:
     """Cleaning cost information"""
     pakket_type: Literal["5_uur", "7_uur"]  # Package type
@@ -85,7 +91,7 @@ class Cleaning:
     voorschot: float                        # Prepaid cleaning amount
 
 
-@dataclass
+@dataclass(slots=True)
 class DamageRegel:
     """Single damage line item"""
     beschrijving: str     # Description
@@ -94,7 +100,7 @@ class DamageRegel:
     bedrag_excl: float    # Amount excl. VAT
 
 
-@dataclass
+@dataclass(slots=True)
 class DamageTotalen:
     """Damage totals with VAT calculation"""
     totaal_excl: float  # Total excl. VAT
@@ -102,7 +108,7 @@ class DamageTotalen:
     totaal_incl: float  # Total incl. VAT
 
 
-@dataclass
+@dataclass(slots=True)
 class Settlement:
     """Complete settlement information"""
     borg: Deposit
@@ -112,14 +118,342 @@ class Settlement:
     totaal_eindafrekening: float  # Final settlement total (positive = refund, negative = charge)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class MeterType:
+    """Kind of utility meter, registered in METER_TYPES"""
+    key: str                # Registry key ('stroom', 'gas', ...)
+    label: str              # Display name
+    eenheid: str            # Unit (kWh, m³)
+    begin_name: str         # Named range of the begin reading
+    eind_name: str          # Named range of the end reading
+    verbruik_name: str      # Named range of the Excel-calculated consumption
+    required: bool = False  # Always read (0 if missing); optional meters only when the workbook has them
+
+
+# Meter registry, in display order. New meter types only need an entry here
+# (plus the named ranges in the workbook).
+METER_TYPES: Dict[str, MeterType] = {}
+
+
+def register_meter_type(meter_type: MeterType) -> MeterType:
+    """Add (or replace) a meter type in METER_TYPES"""
+    METER_TYPES[meter_type.key] = meter_type
+    return meter_type
+
+
+register_meter_type(MeterType('stroom', 'Elektra', 'kWh', 'KWh_begin', 'KWh_eind', 'KWh_verbruik', required=True))
+register_meter_type(MeterType('gas', 'Gas', 'm³', 'Gas_begin', 'Gas_eind', 'Gas_verbruik', required=True))
+register_meter_type(MeterType('water', 'Water', 'm³', 'Water_begin', 'Water_eind', 'Water_verbruik'))
+register_meter_type(MeterType('stroom_dal', 'Elektra dal', 'kWh', 'KWh_dal_begin', 'KWh_dal_eind', 'KWh_dal_verbruik'))
+register_meter_type(MeterType('teruglevering', 'Teruglevering', 'kWh',
+                              'Teruglevering_begin', 'Teruglevering_eind', 'Teruglevering_verbruik'))
+
+
 class GWEMeterstanden:
-    """Container for all meter readings"""
-    stroom: GWEMeterReading  # Electricity meter
-    gas: GWEMeterReading     # Gas meter
+    """
+    Readings of N typed meters, stored as one 3 x N array (begin, eind, verbruik rows)
+
+    meters['stroom'] (or meters.stroom) returns a MeterstandRij that reads and
+    writes through to the array, so meters.stroom.eind = x updates the reading
+    (verbruik is not recalculated, see Calculator.calculate_meterstanden);
+    assigning meters['water'] = reading updates or adds a meter.
+    """
+
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys: Sequence[str] = (), begin: Sequence[float] = (),
+                 eind: Sequence[float] = (), verbruik: Optional[Sequence[float]] = None):
+        """
+        Args:
+            keys: Meter type keys (see METER_TYPES)
+            begin: Begin reading per meter
+            eind: End reading per meter
+            verbruik: Consumption per meter (default: eind - begin, as read)
+        """
+        for key in keys:
+            if key not in METER_TYPES:
+                raise KeyError(f"Unknown meter type '{key}' (register it with register_meter_type)")
+        self.keys: List[str] = list(keys)
+        self.values = np.empty((3, len(self.keys)), dtype=np.float64)
+        self.values[0] = begin
+        self.values[1] = eind
+        self.values[2] = self.values[1] - self.values[0] if verbruik is None else verbruik
+
+    @classmethod
+    def from_readings(cls, readings: Dict[str, GWEMeterReading]) -> 'GWEMeterstanden':
+        """Build from meter key -> GWEMeterReading"""
+        return cls(list(readings), [r.begin for r in readings.values()],
+                   [r.eind for r in readings.values()], [r.verbruik for r in readings.values()])
+
+    @property
+    def begin(self) -> np.ndarray:
+        return self.values[0]
+
+    @property
+    def eind(self) -> np.ndarray:
+        return self.values[1]
+
+    @property
+    def verbruik(self) -> np.ndarray:
+        return self.values[2]
+
+    @property
+    def types(self) -> List[MeterType]:
+        return [METER_TYPES[key] for key in self.keys]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __getitem__(self, key: str) -> 'MeterstandRij':
+        if key not in self.keys:
+            raise KeyError(key)
+        return MeterstandRij(self, key)
+
+    def __setitem__(self, key: str, reading: GWEMeterReading):
+        if key not in self.keys:
+            if key not in METER_TYPES:
+                raise KeyError(f"Unknown meter type '{key}' (register it with register_meter_type)")
+            self.keys.append(key)
+            self.values = np.hstack([self.values, np.zeros((3, 1))])
+        self.values[:, self.keys.index(key)] = (reading.begin, reading.eind, reading.verbruik)
+
+    def __getattr__(self, name: str) -> 'MeterstandRij':
+        # meters.stroom / meters.gas / meters.water ... ('keys' may be unset while unpickling)
+        if name in METER_TYPES:
+            try:
+                keys = object.__getattribute__(self, 'keys')
+            except AttributeError:
+                keys = ()
+            if name in keys:
+                return self[name]
+        raise AttributeError(f"'{type(self).__name__}' has no meter '{name}'")
+
+    def items(self) -> Iterator[Tuple[MeterType, 'MeterstandRij']]:
+        """(MeterType, reading) per meter, in reading order"""
+        for key in self.keys:
+            yield METER_TYPES[key], self[key]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GWEMeterstanden):
+            return NotImplemented
+        return self.keys == other.keys and np.array_equal(self.values, other.values)
+
+    def __repr__(self) -> str:
+        readings = ', '.join(f"{key}={self[key]}" for key in self.keys)
+        return f"GWEMeterstanden({readings})"
+
+
+class MeterstandRij:
+    """
+    One meter of a GWEMeterstanden, read and written through to its array
+
+    Has the attributes of a GWEMeterReading (begin, eind, verbruik); use
+    as_reading() for a detached copy.
+    """
+
+    __slots__ = ('meters', 'key')
+    FIELDS = ('begin', 'eind', 'verbruik')
+
+    def __init__(self, meters: GWEMeterstanden, key: str):
+        object.__setattr__(self, 'meters', meters)
+        object.__setattr__(self, 'key', key)
+
+    def _row(self, name: str) -> int:
+        try:
+            return self.FIELDS.index(name)
+        except ValueError:
+            raise AttributeError(f"'{type(self).__name__}' has no field '{name}'") from None
+
+    def __getattr__(self, name: str) -> float:
+        return float(self.meters.values[self._row(name), self.meters.keys.index(self.key)])
+
+    def __setattr__(self, name: str, value: float):
+        self.meters.values[self._row(name), self.meters.keys.index(self.key)] = value
+
+    def as_reading(self) -> GWEMeterReading:
+        """Materialise as a (detached) GWEMeterReading"""
+        begin, eind, verbruik = self.meters.values[:, self.meters.keys.index(self.key)].tolist()
+        return GWEMeterReading(begin=begin, eind=eind, verbruik=verbruik)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MeterstandRij):
+            other = other.as_reading()
+        return self.as_reading() == other
+
+    def __repr__(self) -> str:
+        return repr(self.as_reading())
+
+
+class RegelRij:
+    """
+    One row of a RegelTabel, read and written through to the table's columns
+
+    Only exists while a caller holds it: iterating a table creates rows on the
+    fly, the table itself stores no per-row objects.
+    """
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: 'RegelTabel', index: int):
+        object.__setattr__(self, 'table', table)
+        object.__setattr__(self, 'index', index)
+
+    def __getattr__(self, name: str):
+        return self.table.value(self.index, name)
+
+    def __setattr__(self, name: str, value):
+        self.table.set_value(self.index, name, value)
+
+    def __getitem__(self, name: str):
+        # Templates and dict-style callers: regel['kosten_excl']
+        try:
+            return self.table.value(self.index, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def as_regel(self):
+        """Materialise as the table's line entity (GWERegel / DamageRegel)"""
+        return self.table.REGEL(*(self.table.value(self.index, name) for name in self.table.COLUMNS))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RegelRij):
+            other = other.as_regel()
+        return self.as_regel() == other
+
+    def __repr__(self) -> str:
+        return repr(self.as_regel())
+
+
+class RegelTabel:
+    """
+    Line items as columns: a list of description strings plus a 3 x N float
+    array (quantity, rate, amount rows)
+
+    Subclasses name the columns after their line entity (COLUMNS / REGEL), so
+    table.kosten_excl is the whole amount column and iterating yields RegelRij
+    rows with the same attributes as a GWERegel / DamageRegel.
+    """
+
+    COLUMNS: Tuple[str, str, str, str] = ('tekst', 'aantal', 'tarief', 'bedrag')
+    REGEL: type = tuple
+
+    __slots__ = ('teksten', 'values')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        text, *numeric = cls.COLUMNS
+        setattr(cls, text, property(lambda self: self.teksten))
+        for row, name in enumerate(numeric):
+            setattr(cls, name, property(lambda self, row=row: self.values[row]))
+
+    def __init__(self, teksten: Sequence[str] = (), aantal: Sequence[float] = (),
+                 tarief: Sequence[float] = (), bedrag: Sequence[float] = ()):
+        """
+        Args:
+            teksten: Description per line
+            aantal: Quantity per line (verbruik_of_dagen / aantal)
+            tarief: Rate excl. VAT per line
+            bedrag: Amount excl. VAT per line (kosten_excl / bedrag_excl)
+        """
+        self.teksten: List[str] = list(teksten)
+        self.values = np.empty((3, len(self.teksten)), dtype=np.float64)
+        self.values[0] = aantal
+        self.values[1] = tarief
+        self.values[2] = bedrag
+
+    @classmethod
+    def from_regels(cls, regels: Iterable) -> 'RegelTabel':
+        """Build from line entities (or anything with the COLUMNS attributes)"""
+        regels = list(regels)
+        return cls(*([getattr(r, name) for r in regels] for name in cls.COLUMNS))
+
+    @classmethod
+    def as_table(cls, regels: Iterable) -> 'RegelTabel':
+        """The table itself, or a new table for a list of line entities"""
+        return regels if isinstance(regels, cls) else cls.from_regels(regels)
+
+    def with_bedragen(self, bedrag: np.ndarray) -> 'RegelTabel':
+        """Copy with a new amount column (descriptions are shared, they are never modified)"""
+        table = type(self).__new__(type(self))
+        table.teksten = self.teksten
+        table.values = self.values.copy()
+        table.values[2] = bedrag
+        return table
+
+    def copy(self) -> 'RegelTabel':
+        return self.with_bedragen(self.values[2])
+
+    def regels(self) -> list:
+        """All lines as line entities (for callers that edit or reorder lines)"""
+        return [self.REGEL(tekst, *row) for tekst, row in zip(self.teksten, self.values.T.tolist())]
+
+    def to_dicts(self) -> List[Dict[str, object]]:
+        """All lines as dictionaries keyed by COLUMNS (JSON export)"""
+        return [dict(zip(self.COLUMNS, (tekst, *row))) for tekst, row in zip(self.teksten, self.values.T.tolist())]
+
+    def value(self, index: int, name: str):
+        if name == self.COLUMNS[0]:
+            return self.teksten[index]
+        try:
+            row = self.COLUMNS.index(name) - 1
+        except ValueError:
+            raise AttributeError(f"'{type(self).__name__}' has no column '{name}'") from None
+        return float(self.values[row, index])
+
+    def set_value(self, index: int, name: str, value):
+        if name == self.COLUMNS[0]:
+            self.teksten[index] = value
+        elif name in self.COLUMNS:
+            self.values[self.COLUMNS.index(name) - 1, index] = value
+        else:
+            raise AttributeError(f"'{type(self).__name__}' has no column '{name}'")
+
+    def __len__(self) -> int:
+        return len(self.teksten)
+
+    def __iter__(self) -> Iterator[RegelRij]:
+        return (RegelRij(self, i) for i in range(len(self.teksten)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            table = type(self).__new__(type(self))
+            table.teksten = self.teksten[index]
+            table.values = self.values[:, index].copy()
+            return table
+        if index < 0:
+            index += len(self.teksten)
+        if not 0 <= index < len(self.teksten):
+            raise IndexError('regel index out of range')
+        return RegelRij(self, index)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RegelTabel):
+            return NotImplemented
+        return (type(self) is type(other) and self.teksten == other.teksten
+                and np.array_equal(self.values, other.values))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} regels)"
+
+
+class GWERegels(RegelTabel):
+    """GWE cost lines as columns (see GWERegel)"""
+    COLUMNS = ('omschrijving', 'verbruik_of_dagen', 'tarief_excl', 'kosten_excl')
+    REGEL = GWERegel
+    __slots__ = ()
+
+
+class DamageRegels(RegelTabel):
+    """Damage lines as columns (see DamageRegel)"""
+    COLUMNS = ('beschrijving', 'aantal', 'tarief_excl', 'bedrag_excl')
+    REGEL = DamageRegel
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class OnePagerViewModel:
     """View model for OnePager template - single-page summary"""
     client: Client
@@ -128,16 +462,16 @@ class OnePagerViewModel:
     settlement: Settlement
 
 
-@dataclass
+@dataclass(slots=True)
 class DetailViewModel:
     """View model for Detail template - comprehensive breakdown"""
     client: Client
     object: Object
     period: Period
     gwe_meterstanden: GWEMeterstanden
-    gwe_regels: List[GWERegel]
+    gwe_regels: GWERegels
     gwe_totalen: GWETotalen
     cleaning: Cleaning
-    damage_regels: List[DamageRegel]
+    damage_regels: DamageRegels
     damage_totalen: DamageTotalen
     borg: Deposit
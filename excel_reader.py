@@ -10,8 +10,12 @@ import openpyxl
 from typing import Optional, List, Dict, Any, Union
 from datetime import date, datetime
 from entities import (
-    Client, Object, Period, Deposit, GWEMeterReading, GWERegel, 
-    GWETotalen, Cleaning, DamageRegel, DamageTotalen, GWEMeterstanden
+    Client, Object, Period, Deposit, GWERegel, 
+    GWETotalen, Cleaning, DamageRegel, DamageTotalen, GWEMeterstanden, METER_TYPES,
+    GWERegels, DamageRegels
+)
+from template_layout import (
+    CURRENT_LAYOUT, LayoutAccessor, TemplateLayout, read_layout_stamp, resolve_layout
 )
 
 
@@ -22,10 +26,21 @@ class ExcelReader:
         """Initialize reader with Excel file path"""
         self.filepath = filepath
         self.wb = None
+        self.layout: Optional[TemplateLayout] = None
+        self._accessor: Optional[LayoutAccessor] = None
         
     def __enter__(self):
-        """Context manager entry - open workbook"""
+        """Context manager entry - open workbook and check layout stamp"""
         self.wb = openpyxl.load_workbook(self.filepath, data_only=True)
+        
+        # Known stamped layouts get the precompiled accessor; unknown stamps raise
+        version, checksum = read_layout_stamp(self.wb)
+        self.layout = resolve_layout(version, checksum)
+        if self.layout is not None:
+            self._accessor = LayoutAccessor(self.wb, self.layout)
+        else:
+            print(f"⚠️  Warning: '{self.filepath}' has no template layout stamp, "
+                  f"falling back to named range lookup")
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -45,6 +60,10 @@ class ExcelReader:
         """
         if not self.wb:
             raise RuntimeError("Workbook not opened. Use context manager.")
+        
+        # Fast path: precompiled cell position for stamped layouts
+        if self._accessor is not None and name in self._accessor:
+            return self._accessor.get(name)
             
         try:
             # Get defined name
@@ -71,6 +90,14 @@ class ExcelReader:
             print(f"⚠️  Warning: Error reading named range '{name}': {e}")
             return None
     
+    def has_name(self, name: str) -> bool:
+        """Check whether the workbook defines a named range"""
+        if not self.wb:
+            raise RuntimeError("Workbook not opened. Use context manager.")
+        if self._accessor is not None and name in self._accessor:
+            return True
+        return name in self.wb.defined_names
+    
     def get_string(self, name: str, default: str = "") -> str:
         """Get string value from named range"""
         val = self.get_named_value(name)
@@ -223,25 +250,20 @@ class ExcelReader:
         )
     
     def read_gwe_meterstanden(self) -> GWEMeterstanden:
-        """Read GWE meter readings from GWE_Detail sheet"""
-        stroom = GWEMeterReading(
-            begin=self.get_float('KWh_begin'),
-            eind=self.get_float('KWh_eind'),
-            verbruik=self.get_float('KWh_verbruik')
+        """Read GWE meter readings (every registered meter type the workbook has)"""
+        meter_types = [mt for mt in METER_TYPES.values() if mt.required or self.has_name(mt.begin_name)]
+        return GWEMeterstanden(
+            keys=[mt.key for mt in meter_types],
+            begin=[self.get_float(mt.begin_name) for mt in meter_types],
+            eind=[self.get_float(mt.eind_name) for mt in meter_types],
+            verbruik=[self.get_float(mt.verbruik_name) for mt in meter_types]
         )
-        
-        gas = GWEMeterReading(
-            begin=self.get_float('Gas_begin'),
-            eind=self.get_float('Gas_eind'),
-            verbruik=self.get_float('Gas_verbruik')
-        )
-        
-        return GWEMeterstanden(stroom=stroom, gas=gas)
     
-    def read_gwe_regels(self) -> List[GWERegel]:
+    def read_gwe_regels(self) -> GWERegels:
         """Read GWE cost lines from GWE_Detail sheet table"""
-        # Read dynamic table starting at row 12 (after instructions)
-        rows = self.read_table_range('GWE_Detail', start_row=12, start_col=1, num_cols=4)
+        # Read dynamic table starting after the instructions (row 12 in unstamped workbooks)
+        start_row = (self.layout or CURRENT_LAYOUT).gwe_table_start
+        rows = self.read_table_range('GWE_Detail', start_row=start_row, start_col=1, num_cols=4)
         
         regels = []
         for row in rows:
@@ -269,7 +291,7 @@ class ExcelReader:
                 print(f"⚠️  Warning: Could not parse GWE regel '{omschrijving}': {e}")
                 continue
         
-        return regels
+        return GWERegels.from_regels(regels)
     
     def read_gwe_totalen(self) -> GWETotalen:
         """Read GWE totals from GWE_Detail sheet"""
@@ -306,10 +328,11 @@ class ExcelReader:
             voorschot=self.get_float('Voorschot_schoonmaak')
         )
     
-    def read_damage_regels(self) -> List[DamageRegel]:
+    def read_damage_regels(self) -> DamageRegels:
         """Read damage line items from Schade sheet table"""
-        # Read dynamic table starting at row 5
-        rows = self.read_table_range('Schade', start_row=5, start_col=1, num_cols=4)
+        # Read dynamic table starting at the header row (row 5 in unstamped workbooks)
+        start_row = (self.layout or CURRENT_LAYOUT).damage_table_start
+        rows = self.read_table_range('Schade', start_row=start_row, start_col=1, num_cols=4)
         
         regels = []
         for row in rows:
@@ -333,7 +356,7 @@ class ExcelReader:
                 print(f"⚠️  Warning: Could not parse damage regel '{beschrijving}': {e}")
                 continue
         
-        return regels
+        return DamageRegels.from_regels(regels)
     
     def read_damage_totalen(self) -> DamageTotalen:
         """Read damage totals from Schade sheet"""
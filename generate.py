@@ -22,7 +22,8 @@ from datetime import datetime
 from excel_reader import read_excel
 from calculator import recalculate_all
 from viewmodels import build_viewmodels_from_data, save_viewmodels_to_json
-from template_renderer import TemplateRenderer
+from bar_backends import BAR_BACKENDS, DEFAULT_BACKEND, get_backend, warn_missing_cairosvg
+from template_renderer import TemplateRenderer, load_logo_b64
 from pdf_generator import render_and_generate_pdfs
 
 
@@ -64,6 +65,9 @@ Examples:
   python generate.py --input custom.xlsx       # Use custom Excel file
   python generate.py --no-pause                # Non-interactive mode
   python generate.py --save-json               # Save intermediate JSON files
+  python generate.py --stroom-csv stroom.csv --stroom-tarief normaal=0.30 --stroom-tarief dal=0.25
+  python generate.py --tarieven tarieven.csv   # Reprice GWE with dated tariffs (split at tariff changes)
+  python rerender.py                           # Re-render all stored snapshots (after a template change)
         """
     )
     parser.add_argument('--input', default='input_template.xlsx',
@@ -76,6 +80,25 @@ Examples:
                        help='Save intermediate JSON viewmodels')
     parser.add_argument('--html-only', action='store_true',
                        help='Skip PDF generation, only create HTML')
+    parser.add_argument('--bar-backend', choices=list(BAR_BACKENDS), default=DEFAULT_BACKEND,
+                       help='Bar rendering: svg, css (plain divs) '
+                            'or raster (pre-rasterised images) (default: svg)')
+    parser.add_argument('--raster-cache',
+                       help='PNG cache of the raster backend, shared between runs (default: <output-dir>/raster_cache)')
+    parser.add_argument('--snapshots',
+                       help='Snapshot database for rerender.py (default: <output-dir>/snapshots.db)')
+    parser.add_argument('--no-snapshot', action='store_true',
+                       help='Do not store the viewmodels in the snapshot database')
+    parser.add_argument('--stroom-csv',
+                       help='Smart-meter interval export (CSV) for electricity, replaces the typed meter reading')
+    parser.add_argument('--gas-csv',
+                       help='Smart-meter interval export (CSV) for gas, replaces the typed meter reading')
+    parser.add_argument('--stroom-tarief', action='append',
+                       help='Electricity rate excl. VAT, per band: 0.28 or normaal=0.30 / dal=0.25 (repeatable)')
+    parser.add_argument('--gas-tarief', action='append',
+                       help='Gas rate excl. VAT: 1.15 (default: rate of the typed gas line)')
+    parser.add_argument('--tarieven',
+                       help='Tariff schedule (CSV: component;ingangsdatum;tarief), splits the period at tariff changes')
     
     args = parser.parse_args()
     
@@ -113,14 +136,9 @@ Examples:
         data['gwe_voorschot'] = gwe_voorschot
         
         # Add logo (base64 encoded)
-        import base64
         logo_path = os.path.join('assets', 'ryanrent_co.jpg')
-        if os.path.exists(logo_path):
-            with open(logo_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                data['logo_b64'] = f"data:image/jpeg;base64,{encoded_string}"
-        else:
-            data['logo_b64'] = None
+        data['logo_b64'] = load_logo_b64(logo_path)
+        if data['logo_b64'] is None:
             print(f"   ⚠️  Logo niet gevonden: {logo_path}")
         
         # Validate Excel calculations against Python logic
@@ -133,6 +151,27 @@ Examples:
                 print(f"      • {warning}")
             print(f"\n   Python zal alle waarden herberekenen en corrigeren...")
         
+        # Replace typed meter readings with smart-meter interval data
+        interval_series = {}
+        for meter, csv_path, tarief_specs in (('stroom', args.stroom_csv, args.stroom_tarief),
+                                             ('gas', args.gas_csv, args.gas_tarief)):
+            if not csv_path:
+                continue
+            from interval_import import read_interval_csv, parse_tarieven, apply_interval_data
+            series = read_interval_csv(csv_path)
+            interval_series[meter] = series
+            for warning in apply_interval_data(data, meter, series, parse_tarieven(tarief_specs)):
+                print(f"   ⚠️  {warning}")
+            reading = data['gwe_meterstanden'][meter]
+            print(f"   ✓ {meter.capitalize()} uit intervaldata: {reading.verbruik:.2f} ({len(series.timestamps)} intervallen)")
+        
+        # Reprice GWE lines with the dated tariff schedule
+        if args.tarieven:
+            from tariff_schedule import TariffSchedule, apply_tariff_schedule
+            schedule = TariffSchedule.from_csv(args.tarieven)
+            applied = apply_tariff_schedule(data, schedule, interval_series)
+            print(f"   ✓ Tarieven toegepast: {', '.join(applied) or 'geen'} ({args.tarieven})")
+        
         # Recalculate everything to ensure consistency
         data = recalculate_all(data)
         
@@ -158,7 +197,10 @@ Examples:
         # ==================== STEP 3: BUILD VIEWMODELS ====================
         print(f"\n🏗️  STAP 3: ViewModels genereren...")
         
-        onepager_vm, detail_vm = build_viewmodels_from_data(data)
+        if args.bar_backend == 'raster':
+            warn_missing_cairosvg()
+            get_backend('raster', cache_dir=args.raster_cache or os.path.join(args.output_dir, "raster_cache"))
+        onepager_vm, detail_vm = build_viewmodels_from_data(data, backend=args.bar_backend)
         
         print(f"   ✓ OnePager viewmodel gebouwd")
         print(f"   ✓ Detail viewmodel gebouwd")
@@ -172,6 +214,21 @@ Examples:
                 detail_path=os.path.join(args.output_dir, "detail.json")
             )
         
+        # Build output basename (also the snapshot key)
+        basename = build_output_basename(
+            data['client'].name,
+            str(data['period'].checkin_date),
+            str(data['period'].checkout_date)
+        )
+        
+        # Store the final viewmodels, so a template change can be re-rendered without Excel
+        if not args.no_snapshot:
+            from snapshot_store import SnapshotStore
+            snapshot_path = args.snapshots or os.path.join(args.output_dir, "snapshots.db")
+            with SnapshotStore(snapshot_path) as store:
+                store.save(basename, onepager_vm, detail_vm, bron=args.input)
+            print(f"   ✓ Snapshot opgeslagen: {basename} ({snapshot_path})")
+        
         # ==================== STEP 4: RENDER HTML ====================
         print(f"\n🎨 STAP 4: HTML templates renderen...")
         
@@ -187,7 +244,11 @@ Examples:
         
         try:
             detail_html = renderer.render_detail(detail_vm)
-            print(f"   ✓ Detail HTML gegenereerd")
+            detail_segments = renderer.render_detail_segments(detail_vm)
+            if detail_segments is not None:
+                print(f"   ✓ Detail HTML gegenereerd (PDF in segmenten)")
+            else:
+                print(f"   ✓ Detail HTML gegenereerd")
         except Exception as e:
             print(f"   ⚠️  Detail template fout: {e}")
             print(f"      Zorg dat 'template_detail.html' bestaat.")
@@ -196,20 +257,14 @@ Examples:
         # ==================== STEP 5: GENERATE OUTPUT ====================
         print(f"\n📄 STAP 5: Output genereren...")
         
-        # Build output basename
-        basename = build_output_basename(
-            data['client'].name,
-            str(data['period'].checkin_date),
-            str(data['period'].checkout_date)
-        )
-        
         # Generate PDFs (or HTML fallback)
         result = render_and_generate_pdfs(
             onepager_html=onepager_html,
             detail_html=detail_html,
             output_dir=args.output_dir,
             basename=basename,
-            base_url="."
+            base_url=".",
+            detail_segments=detail_segments
         )
         
         # ==================== SUMMARY ====================
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Interval Import - Smart-meter interval data (15 min / hourly) to GWE lines
+
+Reads a supplier interval export (CSV, one meter per file) into NumPy
+arrays, slices it to the rental Period and computes consumption and costs
+per tariff band (normaal / dal) vectorised. The result replaces the
+hand-typed meter reading and 'verbruik' GWE lines.
+
+Supported CSV layout (header row required, delimiter , ; or tab):
+    timestamp;verbruik
+    2024-06-01 00:00;0,125
+    2024-06-01 00:15;0,118
+
+- timestamp: start of the interval, 'YYYY-MM-DD HH:MM' (or ISO 'T') or 'DD-MM-YYYY HH:MM'
+- value: consumption in the interval (kWh or m³); decimal comma is accepted
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from entities import GWEMeterReading, GWERegel, GWERegels, Period
+from calculator import Calculator
+
+
+# Column names recognised as the consumption column (case insensitive)
+VALUE_COLUMNS = ('verbruik', 'consumption', 'kwh', 'm3', 'waarde', 'value', 'levering')
+
+# Dal (off-peak) hours: weekdays 23:00-07:00 and the whole weekend
+DAL_START_HOUR = 23
+DAL_END_HOUR = 7
+
+
+def dal_mask(timestamps: np.ndarray) -> np.ndarray:
+    """Boolean mask of intervals in the dal (off-peak) band"""
+    days = timestamps.astype('datetime64[D]')
+    hours = (timestamps - days).astype('timedelta64[h]').astype(np.int64)
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    return (weekday >= 5) | (hours >= DAL_START_HOUR) | (hours < DAL_END_HOUR)
+
+
+# Tariff band name -> mask function
+TARIEF_BANDEN: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'enkel': lambda ts: np.ones(len(ts), dtype=bool),
+    'normaal': lambda ts: ~dal_mask(ts),
+    'dal': dal_mask,
+}
+
+
+@dataclass
+class IntervalSeries:
+    """Consumption per interval for one meter"""
+    timestamps: np.ndarray  # datetime64[m], interval start, sorted
+    values: np.ndarray      # float64, consumption per interval
+
+    @property
+    def interval(self) -> np.timedelta64:
+        """Typical interval length (median step)"""
+        if len(self.timestamps) < 2:
+            return np.timedelta64(15, 'm')
+        return np.median(np.diff(self.timestamps).astype(np.int64)).astype('timedelta64[m]')
+
+    def slice(self, start: date, end: date) -> 'IntervalSeries':
+        """Intervals starting in [start 00:00, end 00:00) (binary search on the sorted timestamps)"""
+        lo, hi = np.searchsorted(self.timestamps, [np.datetime64(start, 'm'), np.datetime64(end, 'm')])
+        return IntervalSeries(self.timestamps[lo:hi], self.values[lo:hi])
+
+    def missing_intervals(self, start: date, end: date) -> int:
+        """Number of intervals absent between start and end (gaps in the export)"""
+        span = (np.datetime64(end, 'm') - np.datetime64(start, 'm')).astype(np.int64)
+        expected = span // max(1, self.interval.astype(np.int64))
+        return max(0, int(expected) - len(self.slice(start, end).timestamps))
+
+
+def _parse_timestamps(raw: List[str]) -> np.ndarray:
+    """Parse timestamp strings to datetime64[m] (ISO or Dutch DD-MM-YYYY)"""
+    if raw and len(raw[0]) >= 10 and raw[0][2] == '-' and raw[0][5] == '-':
+        # DD-MM-YYYY HH:MM -> YYYY-MM-DD HH:MM
+        raw = [f"{s[6:10]}-{s[3:5]}-{s[0:2]}{s[10:16]}" for s in raw]
+    return np.array([s.strip()[:16].replace(' ', 'T') for s in raw], dtype='datetime64[m]')
+
+
+def read_interval_csv(path: str) -> IntervalSeries:
+    """
+    Read a supplier interval export
+
+    Args:
+        path: CSV file path
+
+    Returns:
+        IntervalSeries sorted by time (duplicate timestamps keep the last value)
+
+    Raises:
+        ValueError: If no timestamp/consumption columns are found
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        text = f.read()
+
+    dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    reader = csv.reader(io.StringIO(text), dialect)
+    header = [h.strip().lower() for h in next(reader)]
+
+    value_col = next((i for i, h in enumerate(header) if any(h.startswith(v) for v in VALUE_COLUMNS)), None)
+    if value_col is None:
+        if len(header) < 2:
+            raise ValueError(f"'{path}': geen verbruikskolom gevonden (verwacht: {', '.join(VALUE_COLUMNS)})")
+        value_col = 1
+
+    stamps, values = [], []
+    for row in reader:
+        if len(row) <= value_col or not row[0].strip():
+            continue
+        stamps.append(row[0])
+        values.append(row[value_col].strip().replace(',', '.') or '0')
+
+    timestamps = _parse_timestamps(stamps)
+    amounts = np.array(values, dtype=np.float64)
+
+    order = np.argsort(timestamps, kind='stable')
+    timestamps, amounts = timestamps[order], amounts[order]
+    # Drop duplicates (keep last occurrence, e.g. corrected values in the export)
+    keep = np.append(timestamps[1:] != timestamps[:-1], True) if len(timestamps) else np.array([], dtype=bool)
+    return IntervalSeries(timestamps[keep], amounts[keep])
+
+
+def parse_tarieven(specs: Optional[List[str]]) -> Dict[str, float]:
+    """
+    Parse tariff arguments: ['0.28'] or ['normaal=0.30', 'dal=0.25']
+
+    Returns:
+        Band name -> rate excl. VAT
+    """
+    tarieven = {}
+    for spec in specs or []:
+        band, _, rate = spec.rpartition('=')
+        band = band.strip().lower() or 'enkel'
+        if band not in TARIEF_BANDEN:
+            raise ValueError(f"Onbekende tariefband '{band}' (bekend: {', '.join(TARIEF_BANDEN)})")
+        tarieven[band] = float(rate.replace(',', '.'))
+    return tarieven
+
+
+def interval_gwe(series: IntervalSeries, period: Period, tarieven: Dict[str, float],
+                 omschrijving: str = "Elektra verbruik", eenheid: str = "kWh",
+                 begin_stand: float = 0.0) -> Tuple[GWEMeterReading, List[GWERegel]]:
+    """
+    Compute meter reading and GWE cost lines for a Period from interval data
+
+    Args:
+        series: Interval data of one meter
+        period: Rental period (check-in up to check-out day)
+        tarieven: Band name -> rate excl. VAT (see TARIEF_BANDEN)
+        omschrijving: Line description prefix
+        eenheid: Unit for the description (kWh / m³)
+        begin_stand: Meter register at check-in (eind = begin + consumption)
+
+    Returns:
+        Tuple (GWEMeterReading, list of GWERegel, one per band)
+    """
+    sliced = series.slice(period.checkin_date, period.checkout_date)
+    totaal = float(sliced.values.sum())
+
+    regels = []
+    for band, tarief in tarieven.items():
+        verbruik = round(float(sliced.values[TARIEF_BANDEN[band](sliced.timestamps)].sum()), 3)
+        label = omschrijving if band == 'enkel' else f"{omschrijving} {band}"
+        regels.append(GWERegel(
+            omschrijving=f"{label} ({verbruik:.0f} {eenheid})",
+            verbruik_of_dagen=verbruik,
+            tarief_excl=tarief,
+            kosten_excl=Calculator.calculate_gwe_regel_kosten(verbruik, tarief)
+        ))
+
+    reading = Calculator.calculate_meter_reading(begin_stand, round(begin_stand + totaal, 3))
+    return reading, regels
+
+
+# Meter -> (description, unit, keywords identifying the hand-typed line it replaces)
+METERS = {
+    'stroom': ("Elektra verbruik", "kWh", ('elektra verbruik', 'stroom verbruik', 'elektriciteit')),
+    'gas': ("Gas verbruik", "m³", ('gas verbruik',)),
+}
+
+
+def apply_interval_data(data: dict, meter: str, series: IntervalSeries,
+                        tarieven: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    Replace the meter reading and hand-typed consumption line(s) with interval results
+
+    The begin reading from Excel is kept; if no tariffs are given, the rate of
+    the replaced hand-typed line is used for the whole period.
+
+    Args:
+        data: excel_reader data dictionary (modified in place)
+        meter: 'stroom' or 'gas'
+        series: Interval data for that meter
+        tarieven: Band name -> rate (optional)
+
+    Returns:
+        List of warning messages (e.g. gaps in the data)
+    """
+    omschrijving, eenheid, keywords = METERS[meter]
+    period: Period = data['period']
+    regels: List[GWERegel] = GWERegels.as_table(data['gwe_regels']).regels()
+
+    replaced = [r for r in regels if any(k in r.omschrijving.lower() for k in keywords)]
+    if not tarieven:
+        if not replaced:
+            raise ValueError(f"Geen tarief voor {meter}: geef --{meter}-tarief op of vul een '{omschrijving}' regel in")
+        tarieven = {'enkel': replaced[0].tarief_excl}
+
+    warnings = []
+    missing = series.missing_intervals(period.checkin_date, period.checkout_date)
+    if missing:
+        warnings.append(f"{meter}: {missing} intervallen ontbreken in de periode (verbruik mogelijk te laag)")
+
+    meterstanden = data['gwe_meterstanden']
+    current: GWEMeterReading = meterstanden[meter]
+    reading, new_regels = interval_gwe(series, period, tarieven, omschrijving, eenheid,
+                                       begin_stand=current.begin)
+    meterstanden[meter] = reading
+
+    # New lines take the position of the first replaced line (or go first)
+    position = regels.index(replaced[0]) if replaced else 0
+    remaining = [r for r in regels if r not in replaced]
+    data['gwe_regels'] = GWERegels.from_regels(remaining[:position] + new_regels + remaining[position:])
+    return warnings
+
+
+if __name__ == "__main__":
+    """Test interval import with a synthetic year of 15-minute data"""
+    import os
+    import tempfile
+    import time
+
+    print("⚡ Testing Interval Import")
+    print("=" * 60)
+
+    rng = np.random.default_rng(1)
+    stamps = np.arange(np.datetime64('2024-01-01T00:00'), np.datetime64('2025-01-01T00:00'),
+                       np.timedelta64(15, 'm'))
+    values = np.round(rng.gamma(2.0, 0.06, len(stamps)), 3)
+
+    path = os.path.join(tempfile.mkdtemp(), 'stroom.csv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("timestamp;verbruik\n")
+        f.writelines(f"{str(t).replace('T', ' ')};{str(v).replace('.', ',')}\n"
+                     for t, v in zip(stamps, values))
+
+    start = time.perf_counter()
+    series = read_interval_csv(path)
+    read_ms = (time.perf_counter() - start) * 1000
+
+    period = Period(checkin_date=date(2024, 6, 1), checkout_date=date(2024, 11, 30), days=182)
+    start = time.perf_counter()
+    reading, regels = interval_gwe(series, period, {'normaal': 0.30, 'dal': 0.25}, begin_stand=12000)
+    calc_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   Intervallen: {len(series.timestamps):,} (lezen {read_ms:.0f} ms, berekenen {calc_ms:.2f} ms)")
+    print(f"   Meterstand: {reading.begin} → {reading.eind} ({reading.verbruik:.3f} kWh)")
+    for regel in regels:
+        print(f"   {regel.omschrijving}: {regel.verbruik_of_dagen} x €{regel.tarief_excl} = €{regel.kosten_excl:.2f}")
+
+    mask = (stamps >= np.datetime64('2024-06-01')) & (stamps < np.datetime64('2024-11-30'))
+    assert abs(sum(r.verbruik_of_dagen for r in regels) - values[mask].sum()) < 0.01
+    assert series.missing_intervals(period.checkin_date, period.checkout_date) == 0
+
+    print("\n✅ Interval import tests completed!")
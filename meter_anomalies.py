@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Meter Anomalies - Flag implausible meter readings against the object's history
+
+Calculator.calculate_meter_reading() clamps negative consumption to 0 and
+otherwise accepts any reading, so a typo (an extra digit, swapped begin and
+eind) ends up on the invoice. This check compares the consumption per day
+of every settlement with the previous settlements of the same Object_ID:
+a rolling median and MAD (median absolute deviation) over the last
+WINDOW settlements, scored as a robust z-score.
+
+The whole portfolio is scored in one vectorised pass (sort by object and
+check-out date, then a N x WINDOW matrix of earlier values), so the check
+adds next to nothing to a batch run.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import warnings
+from typing import Any, Dict, List
+
+import numpy as np
+
+from entities import METER_TYPES
+from reconcile import Portfolio, load_portfolio
+
+
+# Meter -> (begin named range, eind named range, unit)
+METERS = {key: (mt.begin_name, mt.eind_name, mt.eenheid) for key, mt in METER_TYPES.items()}
+
+WINDOW = 8            # Previous settlements of the object that form the reference
+MIN_HISTORY = 3       # Fewer previous settlements: no statistical check
+THRESHOLD = 3.5       # |robust z| above this is flagged (Iglewicz & Hoaglin)
+MAD_FLOOR = 0.05      # MAD is at least 5% of the median (objects with constant usage)
+MAD_TO_Z = 0.6745     # MAD -> standard deviation for normally distributed data
+
+ANOMALY_COLUMNS = ['bestand', 'object_id', 'meter', 'begin', 'eind', 'verbruik', 'per_dag',
+                   'mediaan_per_dag', 'score', 'reden']
+
+
+class MeterHistory:
+    """Meter readings of many settlements as columns"""
+
+    def __init__(self, files: List[str], object_ids: List[Any], checkin: np.ndarray, checkout: np.ndarray,
+                 readings: Dict[str, tuple]):
+        """
+        Args:
+            files: Source workbook per settlement
+            object_ids: Object_ID per settlement (None/'' = unknown, no history check)
+            checkin: datetime64[D] check-in dates (NaT = unknown)
+            checkout: datetime64[D] check-out dates (NaT = unknown)
+            readings: Meter -> (begin array, eind array)
+        """
+        self.files = files
+        self.object_ids = np.array(['' if o is None else str(o) for o in object_ids], dtype=str)
+        self.checkin = np.asarray(checkin, dtype='datetime64[D]')
+        self.checkout = np.asarray(checkout, dtype='datetime64[D]')
+        known = ~(np.isnat(self.checkin) | np.isnat(self.checkout))
+        self.days = np.where(known, (self.checkout - self.checkin).astype(np.int64), np.nan)
+        self.readings = {m: (np.asarray(b, dtype=np.float64), np.asarray(e, dtype=np.float64))
+                         for m, (b, e) in readings.items()}
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Portfolio) -> 'MeterHistory':
+        return cls(
+            files=portfolio.files,
+            object_ids=portfolio.raw_column('Object_ID'),
+            checkin=portfolio.date_column('Incheck_datum'),
+            checkout=portfolio.date_column('Uitcheck_datum'),
+            readings={meter: (portfolio.column(begin), portfolio.column(eind))
+                      for meter, (begin, eind, _) in METERS.items()},
+        )
+
+
+def _history_matrix(values: np.ndarray, group_start: np.ndarray, window: int) -> np.ndarray:
+    """N x window matrix of the previous values within the same group (NaN where none)"""
+    positions = np.arange(len(values))[:, None] - np.arange(1, window + 1)[None, :]
+    valid = positions >= group_start[:, None]
+    return np.where(valid, values[np.clip(positions, 0, None)], np.nan)
+
+
+def robust_scores(history: MeterHistory, meter: str, window: int = WINDOW) -> Dict[str, np.ndarray]:
+    """
+    Robust z-score of the consumption per day against the object's earlier settlements
+
+    Returns:
+        Dictionary of arrays in input order: verbruik, per_dag, mediaan, count, score
+    """
+    begin, eind = history.readings[meter]
+    verbruik = eind - begin
+    valid_days = history.days > 0
+    per_dag = np.where(valid_days, verbruik, np.nan) / np.where(valid_days, history.days, 1)
+    per_dag[verbruik < 0] = np.nan  # negative readings are flagged separately, never a reference
+
+    # Sort by object, then check-out date; settlements without Object_ID get their own group
+    codes = np.unique(history.object_ids, return_inverse=True)[1].reshape(-1)
+    codes = np.where(history.object_ids == '', -1 - np.arange(len(history)), codes)
+    checkout = history.checkout.astype(np.int64)
+    order = np.lexsort((checkout, codes))
+    sorted_codes = codes[order]
+    group_start = np.searchsorted(sorted_codes, sorted_codes, side='left')
+
+    previous = _history_matrix(per_dag[order], group_start, window)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows (no history yet)
+        mediaan = np.nanmedian(previous, axis=1)
+        mad = np.nanmedian(np.abs(previous - mediaan[:, None]), axis=1)
+    count = np.count_nonzero(~np.isnan(previous), axis=1)
+    scale = np.maximum(mad, MAD_FLOOR * np.abs(mediaan)) / MAD_TO_Z
+    score = np.divide(per_dag[order] - mediaan, scale, out=np.zeros(len(order)), where=scale > 0)
+
+    result = {}
+    for key, column in (('mediaan', mediaan), ('count', count), ('score', score)):
+        unsorted = np.empty_like(column)
+        unsorted[order] = column
+        result[key] = unsorted
+    result['verbruik'] = verbruik
+    result['per_dag'] = per_dag
+    return result
+
+
+def detect_anomalies(history: MeterHistory, window: int = WINDOW, min_history: int = MIN_HISTORY,
+                     threshold: float = THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Flag negative consumption and outliers against the object's history
+
+    Args:
+        history: Meter readings of the portfolio
+        window: Number of previous settlements per object used as reference
+        min_history: Minimum number of previous settlements for the outlier check
+        threshold: |robust z-score| above which a reading is flagged
+
+    Returns:
+        List of anomaly rows (ANOMALY_COLUMNS), sorted by bestand
+    """
+    rows = []
+    for meter in METERS:
+        begin, eind = history.readings[meter]
+        scores = robust_scores(history, meter, window)
+        negative = scores['verbruik'] < 0
+        outlier = (scores['count'] >= min_history) & (np.abs(scores['score']) > threshold)
+
+        for i in np.nonzero(negative | outlier)[0]:
+            if negative[i]:
+                reden = 'eindstand lager dan beginstand (verbruik wordt 0)'
+            elif scores['score'][i] > 0 and scores['mediaan'][i] > 0:
+                reden = f"verbruik per dag {scores['per_dag'][i] / scores['mediaan'][i]:.1f}x het gebruikelijke"
+            elif scores['score'][i] > 0:
+                reden = 'verbruik per dag veel hoger dan gebruikelijk'
+            else:
+                reden = 'verbruik per dag veel lager dan gebruikelijk'
+            rows.append({
+                'bestand': history.files[i],
+                'object_id': str(history.object_ids[i]),
+                'meter': meter,
+                'begin': float(begin[i]),
+                'eind': float(eind[i]),
+                'verbruik': round(float(scores['verbruik'][i]), 3),
+                'per_dag': round(float(scores['per_dag'][i]), 3),
+                'mediaan_per_dag': round(float(scores['mediaan'][i]), 3),
+                'score': round(float(scores['score'][i]), 1),
+                'reden': reden,
+            })
+
+    rows.sort(key=lambda r: (r['bestand'], r['meter']))
+    return rows
+
+
+def write_anomalies(path: str, rows: List[Dict[str, Any]]):
+    """Write anomaly rows as CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=ANOMALY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# ==================== CLI ====================
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Signaleer afwijkende meterstanden t.o.v. eerdere afrekeningen van hetzelfde object',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python meter_anomalies.py Archive/
+  python meter_anomalies.py archief_2024/ --window 12 --threshold 4 --output meters.csv
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden of mappen')
+    parser.add_argument('--output', default='meterstanden_afwijkingen.csv',
+                        help='CSV met afwijkingen (default: meterstanden_afwijkingen.csv)')
+    parser.add_argument('--window', type=int, default=WINDOW,
+                        help=f'Aantal eerdere afrekeningen als referentie (default: {WINDOW})')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'Drempel voor de robuuste z-score (default: {THRESHOLD})')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    args = parser.parse_args()
+
+    from migrate import collect_inputs
+    files = collect_inputs(args.inputs)
+    print(f"\n📈 Meterstanden controleren in {len(files)} workbook(s)")
+
+    start = time.perf_counter()
+    portfolio, failed = load_portfolio(files, workers=args.workers)
+    loaded = time.perf_counter()
+    rows = detect_anomalies(MeterHistory.from_portfolio(portfolio), window=args.window,
+                            threshold=args.threshold)
+    done = time.perf_counter()
+
+    for path, error in failed:
+        print(f"   ⚠️  {path}: {error}")
+    write_anomalies(args.output, rows)
+
+    print(f"   ✓ Ingelezen: {len(portfolio)} workbooks ({loaded - start:.2f}s)")
+    print(f"   ✓ Gecontroleerd: {done - loaded:.3f}s")
+    for row in rows:
+        print(f"   ⚠️  {row['bestand']} [{row['meter']}]: {row['reden']}")
+    print(f"\n{'⚠️ ' if rows else '✅'} {len(rows)} afwijkende meterstand(en)")
+    print(f"📍 Rapport: {os.path.abspath(args.output)}")
+    sys.exit(1 if rows else 0)
+
+
+if __name__ == "__main__":
+    main()
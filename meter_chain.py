@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Meter Chain - Continuity of meter readings between consecutive tenants
+
+The KWh_eind / Gas_eind of one tenant should equal the KWh_begin / Gas_begin
+of the next tenant of the same Object_ID; a gap is consumption nobody was
+billed for (or, if negative, consumption billed twice).
+
+MeterChainIndex sorts the settlements once by object and check-out date.
+verify() then checks every link of every chain in one vectorised pass, and
+the last settlement per object is kept in a dictionary so a new workbook
+can be pre-filled with the last known end readings in constant time.
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from meter_anomalies import METERS, MeterHistory
+from reconcile import load_portfolio
+
+
+# Readings closer than this are considered equal (registers are read in whole units or 0.001)
+TOLERANCE = 0.001
+
+CHAIN_COLUMNS = ['object_id', 'meter', 'vorige_bestand', 'vorige_uitcheck', 'vorige_eind',
+                 'bestand', 'incheck', 'begin', 'verschil', 'reden']
+
+
+class MeterChainIndex:
+    """Settlements ordered per object by check-out date"""
+
+    def __init__(self, history: MeterHistory):
+        """
+        Args:
+            history: Meter readings of the portfolio (settlements without Object_ID are ignored)
+        """
+        known = np.nonzero(history.object_ids != '')[0]
+        codes, inverse = np.unique(history.object_ids[known], return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.lexsort((history.checkout[known].astype(np.int64), inverse))
+
+        self.history = history
+        self.rows = known[order]            # history row of each position in the sorted index
+        self.codes = inverse[order]         # object code of each position
+        self.object_ids = codes
+
+        # Last position of every object (check-out order) -> O(1) lookup by Object_ID
+        is_last = np.append(self.codes[1:] != self.codes[:-1], True) if len(self.codes) else np.array([], bool)
+        self._last: Dict[str, int] = {str(codes[self.codes[p]]): int(self.rows[p]) for p in np.nonzero(is_last)[0]}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def last_settlement(self, object_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Most recent settlement of an object (by check-out date)
+
+        Returns:
+            Dictionary with bestand, uitcheck and the eind reading per meter, or None
+        """
+        row = self._last.get(str(object_id))
+        if row is None:
+            return None
+        result = {'bestand': self.history.files[row], 'uitcheck': self.history.checkout[row].item()}
+        for meter, (_, eind) in self.history.readings.items():
+            value = eind[row]
+            result[meter] = None if np.isnan(value) else float(value)
+        return result
+
+    def verify(self, tolerance: float = TOLERANCE) -> List[Dict[str, Any]]:
+        """
+        Check begin == previous eind for every pair of consecutive settlements of an object
+
+        Args:
+            tolerance: Allowed absolute difference
+
+        Returns:
+            List of breaks (CHAIN_COLUMNS), in object/check-out order
+        """
+        history = self.history
+        prev_rows, rows = self.rows[:-1], self.rows[1:]
+        linked = self.codes[1:] == self.codes[:-1]
+
+        breaks = []
+        for meter, (begin, eind) in history.readings.items():
+            verschil = begin[rows] - eind[prev_rows]  # NaN where a reading is missing
+            broken = linked & (np.abs(verschil) > tolerance)
+            for k in np.nonzero(broken)[0]:
+                previous, current = prev_rows[k], rows[k]
+                breaks.append({
+                    'object_id': str(history.object_ids[current]),
+                    'meter': meter,
+                    'vorige_bestand': history.files[previous],
+                    'vorige_uitcheck': str(history.checkout[previous]),
+                    'vorige_eind': float(eind[previous]),
+                    'bestand': history.files[current],
+                    'incheck': str(history.checkin[current]),
+                    'begin': float(begin[current]),
+                    'verschil': round(float(verschil[k]), 3),
+                    'reden': ('verbruik tussen huurders niet afgerekend' if verschil[k] > 0
+                              else 'beginstand lager dan vorige eindstand (dubbel afgerekend)'),
+                })
+
+        breaks.sort(key=lambda b: (b['object_id'], b['vorige_uitcheck'], b['meter']))
+        return breaks
+
+
+def prefill_workbook(index: MeterChainIndex, object_id: Any, template_path: str, output_path: str) -> Dict[str, Any]:
+    """
+    Write a new workbook with Object_ID and the begin readings from the object's last settlement
+
+    Args:
+        index: Chain index of the portfolio
+        object_id: Object of the new tenancy
+        template_path: Empty current-layout input template
+        output_path: Destination xlsx path
+
+    Returns:
+        The last settlement used (see MeterChainIndex.last_settlement)
+
+    Raises:
+        KeyError: If the object has no earlier settlement
+    """
+    from migrate import patch_workbook
+    from template_layout import CURRENT_LAYOUT
+
+    last = index.last_settlement(object_id)
+    if last is None:
+        raise KeyError(f"Geen eerdere afrekening gevonden voor object '{object_id}'")
+
+    values = {'Object_ID': object_id}
+    for meter, (begin_name, _, _) in METERS.items():
+        if last[meter] is not None:
+            values[begin_name] = last[meter]
+
+    patches: Dict[str, Dict[str, Any]] = {}
+    for name, value in values.items():
+        sheet_name, ref = CURRENT_LAYOUT.cells[name]
+        patches.setdefault(sheet_name, {})[ref] = (value, None)
+    patch_workbook(template_path, output_path, patches)
+    return last
+
+
+# ==================== CLI ====================
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Controleer of meterstanden aansluiten tussen opeenvolgende huurders per object',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python meter_chain.py Archive/                                  # Controleer alle ketens
+  python meter_chain.py Archive/ --output meterketen.csv
+  python meter_chain.py Archive/ --prefill OBJ-12 --workbook nieuw_OBJ-12.xlsx
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden of mappen (gegenereerde afrekeningen)')
+    parser.add_argument('--output', default='meterketen.csv',
+                        help='CSV met onderbrekingen (default: meterketen.csv)')
+    parser.add_argument('--prefill', metavar='OBJECT_ID',
+                        help='Maak een nieuw workbook met de laatste eindstanden van dit object als beginstand')
+    parser.add_argument('--workbook', help='Uitvoerpad voor --prefill (default: input_<OBJECT_ID>.xlsx)')
+    parser.add_argument('--template', default=None,
+                        help='Leeg input template voor --prefill (default: vers gebouwd)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    args = parser.parse_args()
+
+    from migrate import collect_inputs
+    files = collect_inputs(args.inputs)
+    print(f"\n🔗 Meterketen van {len(files)} workbook(s)")
+
+    start = time.perf_counter()
+    portfolio, failed = load_portfolio(files, workers=args.workers)
+    index = MeterChainIndex(MeterHistory.from_portfolio(portfolio))
+    loaded = time.perf_counter()
+    for path, error in failed:
+        print(f"   ⚠️  {path}: {error}")
+    print(f"   ✓ {len(index)} afrekeningen van {len(index.object_ids)} object(en) ({loaded - start:.2f}s)")
+
+    if args.prefill:
+        output_path = args.workbook or f"input_{args.prefill}.xlsx"
+        tmp_dir = None
+        template_path = args.template
+        if template_path is None:
+            from build_excel_template import create_excel_template
+            tmp_dir = tempfile.mkdtemp(prefix='rr_prefill_')
+            template_path = os.path.join(tmp_dir, 'input_template.xlsx')
+            create_excel_template(template_path)
+        try:
+            last = prefill_workbook(index, args.prefill, template_path, output_path)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            sys.exit(1)
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        readings = ', '.join(f"{m} {last[m]}" for m in METERS if last[m] is not None)
+        print(f"   ✓ Beginstanden uit {last['bestand']} (uitcheck {last['uitcheck']:%d-%m-%Y}): {readings}")
+        print(f"📍 Nieuw workbook: {os.path.abspath(output_path)}")
+        return
+
+    breaks = index.verify()
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CHAIN_COLUMNS)
+        writer.writeheader()
+        writer.writerows(breaks)
+
+    print(f"   ✓ Gecontroleerd: {time.perf_counter() - loaded:.3f}s")
+    print(f"\n{'⚠️ ' if breaks else '✅'} {len(breaks)} onderbreking(en) in de meterketen")
+    print(f"📍 Rapport: {os.path.abspath(args.output)}")
+    sys.exit(1 if breaks else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+"""
+Migrate - Bulk conversion of old-layout workbooks to the current template
+
+Detects the template layout of each source workbook (stamped or recognised by
+its named-range positions), maps its values onto the current named ranges and
+writes either:
+- xlsx: current-layout workbooks (patched copy of a freshly built template)
+- csv:  columnar settlement format (settlements.csv, gwe_regels.csv, schade_regels.csv)
+
+Values typed over a cell that is a formula in the current template (e.g. a
+literal Borg_gebruikt in v2 workbooks) are carried over as literals. Migrated
+workbooks mirror the subfolders of the inputs, and --check recalculates every
+copy and compares its settlement totals with the original.
+
+Workbooks are read and written by patching the XML parts directly, without a
+full openpyxl load/save per file, and files are processed in parallel.
+"""
+
+import argparse
+import csv
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape as xml_escape
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from template_layout import (
+    CURRENT_LAYOUT, LAYOUT_CHECKSUM_PROPERTY, LAYOUT_VERSION_PROPERTY,
+    TemplateLayout, TemplateLayoutError, detect_layout, resolve_layout
+)
+
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+NS_CUSTOM = 'http://schemas.openxmlformats.org/officeDocument/2006/custom-properties'
+NS_VT = 'http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes'
+
+# Named ranges the user fills in; everything else is a formula in the current template
+INPUT_NAMES = [
+    'Klantnaam', 'Contactpersoon', 'Email', 'Telefoonnummer',
+    'Object_adres', 'Unit_nr', 'Postcode', 'Plaats', 'Object_ID',
+    'Incheck_datum', 'Uitcheck_datum',
+    'Voorschot_borg', 'Voorschot_GWE', 'Voorschot_schoonmaak', 'Overige_voorschotten',
+    'Schoonmaak_pakket', 'Uurtarief_schoonmaak',
+    'Meterbeheerder', 'Energie_leverancier', 'Contractnummer',
+    'RR_Klantnummer', 'RR_Folder_link', 'RR_Projectleider', 'RR_Inspecteur', 'RR_Factuurnummer',
+    'KWh_begin', 'KWh_eind', 'Gas_begin', 'Gas_eind',
+    'Totaal_uren_gew',
+]
+
+# Old dropdown values -> current dropdown values
+PAKKET_VALUE_MAP = {
+    '5_uur': 'Basis Schoonmaak',
+    '7_uur': 'Intensief Schoonmaak',
+}
+
+# Current template table geometry (instructions + header precede the GWE rows)
+GWE_FIRST_ROW = CURRENT_LAYOUT.gwe_table_start + 2
+GWE_MAX_ROWS = 20      # 5 example rows + 15 empty rows in build_excel_template.py
+GWE_EXAMPLE_ROWS = 5
+DAMAGE_FIRST_ROW = CURRENT_LAYOUT.damage_table_start + 1
+DAMAGE_MAX_ROWS = 50
+
+_CELL_REF = re.compile(r'^\$?([A-Z]+)\$?(\d+)$')
+
+
+def _column_index(letters: str) -> int:
+    """Convert column letters to a 1-based index (A=1, AA=27)"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index
+
+
+def _split_ref(ref: str) -> Tuple[str, int]:
+    """Split 'B14' into ('B', 14)"""
+    match = _CELL_REF.match(ref)
+    if not match:
+        raise ValueError(f"Invalid cell reference '{ref}'")
+    return match.group(1), int(match.group(2))
+
+
+def _excel_serial_to_iso(value: Any) -> Any:
+    """Convert an Excel date serial to ISO date string (other values unchanged)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (datetime(1899, 12, 30) + timedelta(days=float(value))).date().isoformat()
+    return value
+
+
+# ==================== XLSX PACKAGE (READ) ====================
+
+class XlsxPackage:
+    """Minimal read access to an xlsx zip: sheets, defined names, cached values"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.zf = zipfile.ZipFile(path)
+        self.sheet_paths = self._read_sheet_paths()
+        self.shared_strings = self._read_shared_strings()
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._formulas: Dict[str, set] = {}
+
+    def close(self):
+        self.zf.close()
+
+    def _read_xml(self, part: str) -> Optional[ET.Element]:
+        try:
+            return ET.fromstring(self.zf.read(part))
+        except KeyError:
+            return None
+
+    def _read_sheet_paths(self) -> Dict[str, str]:
+        """Map sheet name -> zip part path"""
+        workbook = self._read_xml('xl/workbook.xml')
+        rels = self._read_xml('xl/_rels/workbook.xml.rels')
+        targets = {}
+        for rel in rels.iter(f'{{{NS_PKG_REL}}}Relationship'):
+            target = rel.get('Target')
+            targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+
+        paths = {}
+        for sheet in workbook.iter(f'{{{NS_MAIN}}}sheet'):
+            paths[sheet.get('name')] = targets[sheet.get(f'{{{NS_REL}}}id')]
+        return paths
+
+    def _read_shared_strings(self) -> List[str]:
+        root = self._read_xml('xl/sharedStrings.xml')
+        if root is None:
+            return []
+        return [''.join(t.text or '' for t in si.iter(f'{{{NS_MAIN}}}t'))
+                for si in root.iter(f'{{{NS_MAIN}}}si')]
+
+    def defined_names(self) -> Dict[str, Tuple[str, str]]:
+        """Named range -> (sheet, cell), same shape as template_layout.cells_from_defined_names()"""
+        workbook = self._read_xml('xl/workbook.xml')
+        cells = {}
+        for defn in workbook.iter(f'{{{NS_MAIN}}}definedName'):
+            text = (defn.text or '').strip()
+            if '!' not in text or defn.get('localSheetId') is not None:
+                continue
+            sheet_name, cell_ref = text.rsplit('!', 1)
+            sheet_name = sheet_name.strip("'").replace("''", "'")
+            if _CELL_REF.match(cell_ref):
+                cells[defn.get('name')] = (sheet_name, cell_ref.replace('$', ''))
+        return cells
+
+    def layout_stamp(self) -> Tuple[Optional[str], Optional[str]]:
+        """Read (version, checksum) from docProps/custom.xml"""
+        root = self._read_xml('docProps/custom.xml')
+        stamp = {}
+        if root is not None:
+            for prop in root.iter(f'{{{NS_CUSTOM}}}property'):
+                value = prop.find(f'{{{NS_VT}}}lpwstr')
+                stamp[prop.get('name')] = value.text if value is not None else None
+        return stamp.get(LAYOUT_VERSION_PROPERTY), stamp.get(LAYOUT_CHECKSUM_PROPERTY)
+
+    def sheet_values(self, sheet_name: str) -> Dict[str, Any]:
+        """All cached cell values of a sheet (parsed once per sheet)"""
+        if sheet_name in self._values:
+            return self._values[sheet_name]
+
+        values: Dict[str, Any] = {}
+        formulas = set()
+        part = self.sheet_paths.get(sheet_name)
+        if part is not None:
+            for _, elem in ET.iterparse(self.zf.open(part)):
+                if elem.tag != f'{{{NS_MAIN}}}c':
+                    continue
+                value = self._cell_value(elem)
+                if value is not None:
+                    values[elem.get('r')] = value
+                if elem.find(f'{{{NS_MAIN}}}f') is not None:
+                    formulas.add(elem.get('r'))
+                elem.clear()
+        self._values[sheet_name] = values
+        self._formulas[sheet_name] = formulas
+        return values
+
+    def _cell_value(self, c: ET.Element) -> Any:
+        cell_type = c.get('t', 'n')
+        if cell_type == 'inlineStr':
+            return ''.join(t.text or '' for t in c.iter(f'{{{NS_MAIN}}}t'))
+
+        v = c.find(f'{{{NS_MAIN}}}v')
+        if v is None or v.text is None or v.text == '':
+            return None
+        if cell_type == 's':
+            return self.shared_strings[int(v.text)]
+        if cell_type in ('str', 'e'):
+            return v.text if cell_type == 'str' else None
+        if cell_type == 'b':
+            return v.text == '1'
+        number = float(v.text)
+        return int(number) if number.is_integer() else number
+
+    def cell(self, sheet_name: str, ref: str) -> Any:
+        return self.sheet_values(sheet_name).get(ref)
+
+    def has_formula(self, sheet_name: str, ref: str) -> bool:
+        self.sheet_values(sheet_name)
+        return ref in self._formulas[sheet_name]
+
+
+# ==================== EXTRACTION ====================
+
+def detect_source_layout(pkg: XlsxPackage) -> TemplateLayout:
+    """
+    Determine the layout of a source workbook
+
+    Raises:
+        TemplateLayoutError: If the layout is not recognised
+    """
+    version, checksum = pkg.layout_stamp()
+    if version is not None:
+        return resolve_layout(version, checksum)
+
+    layout = detect_layout(pkg.defined_names())
+    if layout is None:
+        raise TemplateLayoutError("Onbekende template layout (geen stempel, named ranges herkend niet)")
+    return layout
+
+
+def _read_table(pkg: XlsxPackage, sheet_name: str, start_row: int,
+                max_rows: int = 200) -> List[List[Any]]:
+    """Read A:D rows until the first empty row (same rules as ExcelReader)"""
+    values = pkg.sheet_values(sheet_name)
+    rows = []
+    for row_idx in range(start_row, start_row + max_rows):
+        row = [values.get(f'{col}{row_idx}') for col in 'ABCD']
+        if all(v is None or not str(v).strip() for v in row):
+            break
+
+        description = str(row[0]).strip() if row[0] is not None else ""
+        if not description or description.lower() in ('omschrijving', 'beschrijving'):
+            continue
+        if description.startswith('💡') or 'vul hier' in description.lower():
+            continue
+        try:
+            # Inputs default to 0 like ExcelReader; the amount column keeps None when
+            # Excel never calculated the formula (no cached value)
+            quantity, rate = (float(v) if v not in (None, '') else 0.0 for v in row[1:3])
+            amount = float(row[3]) if row[3] not in (None, '') else None
+            rows.append([description, quantity, rate, amount])
+        except (ValueError, TypeError):
+            continue
+    return rows
+
+
+def extract_settlement(path: str) -> Dict[str, Any]:
+    """
+    Extract all values of one workbook, mapped onto current named ranges
+
+    Args:
+        path: Source xlsx path
+
+    Returns:
+        Dictionary with 'source', 'layout', 'values', 'gwe_regels', 'damage_regels'
+    """
+    pkg = XlsxPackage(path)
+    try:
+        layout = detect_source_layout(pkg)
+
+        values, overrides = {}, {}
+        for name, (sheet_name, ref) in layout.cells.items():
+            name = layout.renamed.get(name, name)
+            values[name] = pkg.cell(sheet_name, ref)
+            # A typed value where the current template has a formula (e.g. Borg_gebruikt in v2)
+            if name not in INPUT_NAMES and values[name] is not None and not pkg.has_formula(sheet_name, ref):
+                overrides[name] = values[name]
+
+        pakket = values.get('Schoonmaak_pakket')
+        if isinstance(pakket, str):
+            values['Schoonmaak_pakket'] = PAKKET_VALUE_MAP.get(pakket.strip(), pakket)
+
+        return {
+            'source': path,
+            'layout': layout.version,
+            'values': values,
+            'overrides': overrides,
+            'gwe_regels': _read_table(pkg, 'GWE_Detail', layout.gwe_table_start),
+            'damage_regels': _read_table(pkg, 'Schade', layout.damage_table_start),
+        }
+    finally:
+        pkg.close()
+
+
+# ==================== XLSX WRITER (XML PATCH) ====================
+
+_XML_ATTR = re.compile(r'([\w:]+)="([^"]*)"')
+
+
+def _cell_xml(prefix: str, ref: str, attrs: Dict[str, str], value: Any = None,
+              formula: Optional[str] = None) -> str:
+    """
+    Markup of one <c> element with the given value or formula
+
+    attrs are the attributes of the cell being replaced (r and t are set here),
+    so the template's style attribute is kept.
+    """
+    tag = f'{prefix}c'
+    attrs = {name: val for name, val in attrs.items() if name not in ('r', 't')}
+    children = ''
+    if formula is not None:
+        children = f'<{prefix}f>{xml_escape(formula)}</{prefix}f>'
+        if value is not None:
+            children += f'<{prefix}v>{float(value)!r}</{prefix}v>'
+    elif isinstance(value, bool):
+        attrs['t'] = 'b'
+        children = f'<{prefix}v>{int(value)}</{prefix}v>'
+    elif isinstance(value, (int, float)):
+        children = f'<{prefix}v>{value!r}</{prefix}v>'
+    elif value is not None:
+        attrs['t'] = 'inlineStr'
+        children = f'<{prefix}is><{prefix}t>{xml_escape(str(value))}</{prefix}t></{prefix}is>'
+    attr_xml = ''.join(f' {name}="{val}"' for name, val in attrs.items())
+    return f'<{tag} r="{ref}"{attr_xml}>{children}</{tag}>' if children else f'<{tag} r="{ref}"{attr_xml}/>'
+
+
+def _set_cell(sheet_xml: str, ref: str, value: Any = None, formula: Optional[str] = None) -> str:
+    """
+    Set (or clear) a cell in a worksheet's XML text, creating row/cell elements in order
+
+    Only the <c> element (and, when missing, its <row>) is rewritten; the rest
+    of the part, namespace declarations included, stays byte for byte. Keeps
+    the template's style attribute so formatting is preserved.
+
+    Returns:
+        The patched sheet XML
+    """
+    col, row_idx = _split_ref(ref)
+    col_idx = _column_index(col)
+    # Element prefix of the part ('' for the default namespace, e.g. 'x:' otherwise)
+    prefix = re.search(r'<([\w.-]+:)?worksheet\b', sheet_xml).group(1) or ''
+    row_tag, cell_tag = f'{prefix}row', f'{prefix}c'
+    new_cell = _cell_xml(prefix, ref, {}, value, formula)  # for a cell that does not exist yet
+    new_row = f'<{row_tag} r="{row_idx}">{new_cell}</{row_tag}>'
+
+    data_match = re.search(rf'<{prefix}sheetData\s*/>|<{prefix}sheetData\b[^>]*>(.*?)</{prefix}sheetData>',
+                           sheet_xml, re.S)
+    if data_match.group(1) is None:
+        # Empty <sheetData/>
+        return (sheet_xml[:data_match.start()] + f'<{prefix}sheetData>{new_row}</{prefix}sheetData>'
+                + sheet_xml[data_match.end():])
+    data_start, data_end = data_match.span(1)
+
+    # Row: existing one, or a new one before the first row after it
+    row_pattern = re.compile(rf'<{row_tag}\b([^>]*?)(/>|>(.*?)</{row_tag}>)', re.S)
+    for row in row_pattern.finditer(sheet_xml, data_start, data_end):
+        r = int(dict(_XML_ATTR.findall(row.group(1)))['r'])
+        if r == row_idx:
+            break
+        if r > row_idx:
+            return sheet_xml[:row.start()] + new_row + sheet_xml[row.start():]
+    else:
+        return sheet_xml[:data_end] + new_row + sheet_xml[data_end:]
+
+    if row.group(3) is None:
+        # Self-closing <row .../>
+        return (sheet_xml[:row.start()] + f'<{row_tag}{row.group(1)}>{new_cell}</{row_tag}>'
+                + sheet_xml[row.end():])
+
+    # Cell: replace the existing one, or insert before the first cell after it
+    cells_start, cells_end = row.span(3)
+    cell_pattern = re.compile(rf'<{cell_tag}\b([^>]*?)(/>|>.*?</{cell_tag}>)', re.S)
+    for cell in cell_pattern.finditer(sheet_xml, cells_start, cells_end):
+        attrs = dict(_XML_ATTR.findall(cell.group(1)))
+        candidate_idx = _column_index(_split_ref(attrs['r'])[0])
+        if candidate_idx == col_idx:
+            return sheet_xml[:cell.start()] + _cell_xml(prefix, ref, attrs, value, formula) + sheet_xml[cell.end():]
+        if candidate_idx > col_idx:
+            return sheet_xml[:cell.start()] + new_cell + sheet_xml[cell.start():]
+    return sheet_xml[:cells_end] + new_cell + sheet_xml[cells_end:]
+
+
+def build_patches(record: Dict[str, Any]) -> Dict[str, Dict[str, Tuple[Any, Optional[str]]]]:
+    """
+    Translate an extracted settlement into per-sheet cell patches for the current template
+
+    Returns:
+        sheet name -> {cell ref -> (value, formula)}
+
+    Raises:
+        ValueError: If a table does not fit in the current template
+    """
+    patches: Dict[str, Dict[str, Tuple[Any, Optional[str]]]] = {}
+
+    for name in INPUT_NAMES:
+        value = record['values'].get(name)
+        if value is None:
+            continue
+        sheet_name, ref = CURRENT_LAYOUT.cells[name]
+        patches.setdefault(sheet_name, {})[ref] = (value, None)
+
+    # Literal values that replace a template formula are kept as literals
+    for name, value in record.get('overrides', {}).items():
+        sheet_name, ref = CURRENT_LAYOUT.cells[name]
+        patches.setdefault(sheet_name, {})[ref] = (value, None)
+
+    gwe_regels = record['gwe_regels']
+    if len(gwe_regels) > GWE_MAX_ROWS:
+        raise ValueError(f"{len(gwe_regels)} GWE regels passen niet in het template (max {GWE_MAX_ROWS})")
+    gwe = patches.setdefault('GWE_Detail', {})
+    for i in range(max(len(gwe_regels), GWE_EXAMPLE_ROWS)):
+        row = GWE_FIRST_ROW + i
+        if i < len(gwe_regels):
+            omschrijving, verbruik, tarief, kosten = gwe_regels[i]
+            gwe[f'A{row}'] = (omschrijving, None)
+            gwe[f'B{row}'] = (verbruik, None)
+            gwe[f'C{row}'] = (tarief, None)
+            gwe[f'D{row}'] = (kosten, f'B{row}*C{row}')
+        else:
+            # Clear the template's example rows so they are not read as costs
+            for col in 'ABCD':
+                gwe[f'{col}{row}'] = (None, None)
+
+    damage_regels = record['damage_regels']
+    if len(damage_regels) > DAMAGE_MAX_ROWS:
+        raise ValueError(f"{len(damage_regels)} schade regels passen niet in het template (max {DAMAGE_MAX_ROWS})")
+    schade = patches.setdefault('Schade', {})
+    for i, (beschrijving, aantal, tarief, bedrag) in enumerate(damage_regels):
+        row = DAMAGE_FIRST_ROW + i
+        schade[f'A{row}'] = (beschrijving, None)
+        schade[f'B{row}'] = (aantal, None)
+        schade[f'C{row}'] = (tarief, None)
+        schade[f'D{row}'] = (bedrag, f'IF(AND(B{row}<>"",C{row}<>""),B{row}*C{row},"")')
+
+    return patches
+
+
+def write_current_workbook(record: Dict[str, Any], template_path: str, output_path: str):
+    """
+    Write a current-layout workbook by patching the sheet XML of a template copy
+
+    Args:
+        record: Extracted settlement (see extract_settlement)
+        template_path: Freshly built (stamped) input template
+        output_path: Destination xlsx path
+    """
+    patch_workbook(template_path, output_path, build_patches(record))
+
+
+def patch_workbook(source_path: str, output_path: str,
+                   patches: Dict[str, Dict[str, Tuple[Any, Optional[str]]]]):
+    """
+    Copy a workbook, replacing cells in the sheet XML
+
+    The changed <c> elements are spliced into the original sheet XML (see
+    _set_cell); all other parts and the rest of each patched sheet, namespace
+    declarations included, are kept byte for byte.
+
+    Args:
+        source_path: Workbook to copy
+        output_path: Destination xlsx path
+        patches: sheet name -> {cell ref -> (value, formula)}
+    """
+    with zipfile.ZipFile(source_path) as src:
+        sheet_paths = XlsxPackage(source_path).sheet_paths
+        patched_parts = {sheet_paths[sheet]: cells for sheet, cells in patches.items()}
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                cells = patched_parts.get(item.filename)
+                if cells:
+                    sheet_xml = data.decode('utf-8')
+                    for ref, (value, formula) in cells.items():
+                        sheet_xml = _set_cell(sheet_xml, ref, value, formula)
+                    data = sheet_xml.encode('utf-8')
+                dst.writestr(item, data)
+
+
+NS_CONTENT_TYPES = 'http://schemas.openxmlformats.org/package/2006/content-types'
+CUSTOM_PROPS_PART = 'docProps/custom.xml'
+CUSTOM_PROPS_FMTID = '{D5CDD505-2E9C-101B-9397-08002B2CF9AE}'
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+
+def _package_part(root: ET.Element, namespace: str) -> bytes:
+    """Serialise a package part with its own namespace as the default (unprefixed) one, as Office writes it"""
+    # ElementTree's default_namespace option rejects the parts' unqualified attributes,
+    # so the default prefix is mapped for this part only and then given back to NS_MAIN
+    ET.register_namespace('', namespace)
+    try:
+        return XML_DECLARATION + ET.tostring(root, encoding='unicode').encode('utf-8')
+    finally:
+        ET.register_namespace('', NS_MAIN)
+
+
+def stamp_workbook(path: str, layout: TemplateLayout = CURRENT_LAYOUT):
+    """
+    Add the layout stamp to an unstamped workbook in place
+
+    For workbooks that already follow the current layout but were saved before
+    the builder stamped it (so ExcelReader takes the named-range fallback).
+    Only docProps/custom.xml (and, when it is missing, its content type and
+    relationship) is rewritten; values and cached formula results are kept.
+
+    Raises:
+        TemplateLayoutError: If the workbook's named ranges do not match the layout
+    """
+    pkg = XlsxPackage(path)
+    try:
+        if detect_layout(pkg.defined_names()) is not layout:
+            raise TemplateLayoutError(f"'{path}' volgt layout v{layout.version} niet, niet gestempeld")
+    finally:
+        pkg.close()
+
+    ET.register_namespace('vt', NS_VT)
+    stamp = {LAYOUT_VERSION_PROPERTY: layout.version, LAYOUT_CHECKSUM_PROPERTY: layout.checksum}
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        names = src.namelist()
+        if CUSTOM_PROPS_PART in names:
+            props = ET.fromstring(src.read(CUSTOM_PROPS_PART))
+        else:
+            props = ET.Element(f'{{{NS_CUSTOM}}}Properties')
+        for prop in list(props):
+            if prop.get('name') in stamp:
+                props.remove(prop)
+        pid = max([int(prop.get('pid', 1)) for prop in props] + [1])
+        for name, value in stamp.items():
+            pid += 1
+            prop = ET.SubElement(props, f'{{{NS_CUSTOM}}}property',
+                                 {'fmtid': CUSTOM_PROPS_FMTID, 'pid': str(pid), 'name': name})
+            ET.SubElement(prop, f'{{{NS_VT}}}lpwstr').text = value
+        custom_xml = _package_part(props, NS_CUSTOM)
+
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == CUSTOM_PROPS_PART:
+                data = custom_xml
+            elif CUSTOM_PROPS_PART not in names and item.filename == '[Content_Types].xml':
+                root = ET.fromstring(data)
+                ET.SubElement(root, f'{{{NS_CONTENT_TYPES}}}Override', {
+                    'PartName': f'/{CUSTOM_PROPS_PART}',
+                    'ContentType': 'application/vnd.openxmlformats-officedocument.custom-properties+xml'})
+                data = _package_part(root, NS_CONTENT_TYPES)
+            elif CUSTOM_PROPS_PART not in names and item.filename == '_rels/.rels':
+                root = ET.fromstring(data)
+                ET.SubElement(root, f'{{{NS_PKG_REL}}}Relationship', {
+                    'Id': 'rIdRRCustom',
+                    'Type': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/custom-properties',
+                    'Target': CUSTOM_PROPS_PART})
+                data = _package_part(root, NS_PKG_REL)
+            dst.writestr(item, data)
+        if CUSTOM_PROPS_PART not in names:
+            dst.writestr(CUSTOM_PROPS_PART, custom_xml)
+    os.replace(tmp_path, path)
+
+
+# ==================== COLUMNAR WRITER ====================
+
+SETTLEMENT_COLUMNS = ['bron', 'layout'] + list(CURRENT_LAYOUT.cells)
+REGEL_COLUMNS = ['bron', 'regel', 'omschrijving', 'aantal_of_verbruik', 'tarief_excl', 'bedrag_excl']
+
+
+def settlement_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten an extracted settlement into one settlements.csv row"""
+    row = {'bron': record['source'], 'layout': record['layout']}
+    for name in CURRENT_LAYOUT.cells:
+        value = record['values'].get(name)
+        if name in ('Incheck_datum', 'Uitcheck_datum'):
+            value = _excel_serial_to_iso(value)
+        row[name] = '' if value is None else value
+    return row
+
+
+class ColumnarWriter:
+    """Streams migrated settlements into settlements / gwe_regels / schade_regels CSVs"""
+
+    def __init__(self, output_dir: str):
+        os.makedirs(output_dir, exist_ok=True)
+        self._files = []
+        self.settlements = self._open(os.path.join(output_dir, 'settlements.csv'), SETTLEMENT_COLUMNS)
+        self.gwe = self._open(os.path.join(output_dir, 'gwe_regels.csv'), REGEL_COLUMNS)
+        self.damage = self._open(os.path.join(output_dir, 'schade_regels.csv'), REGEL_COLUMNS)
+
+    def _open(self, path: str, columns: List[str]) -> csv.DictWriter:
+        f = open(path, 'w', newline='', encoding='utf-8')
+        self._files.append(f)
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        return writer
+
+    def write(self, record: Dict[str, Any]):
+        self.settlements.writerow(settlement_row(record))
+        for writer, regels in ((self.gwe, record['gwe_regels']), (self.damage, record['damage_regels'])):
+            for i, (omschrijving, aantal, tarief, bedrag) in enumerate(regels, 1):
+                writer.writerow({
+                    'bron': record['source'], 'regel': i, 'omschrijving': omschrijving,
+                    'aantal_of_verbruik': aantal, 'tarief_excl': tarief, 'bedrag_excl': bedrag
+                })
+
+    def close(self):
+        for f in self._files:
+            f.close()
+
+
+# ==================== BATCH DRIVER ====================
+
+def collect_inputs(paths: List[str]) -> List[str]:
+    """Expand directories into the .xlsx files they contain (recursively)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names)
+                             if n.lower().endswith('.xlsx') and not n.startswith('~$'))
+        else:
+            files.append(path)
+    return files
+
+
+def output_paths(paths: List[str], output_dir: str) -> Dict[str, str]:
+    """
+    Destination of each migrated workbook: its path relative to the inputs' common folder, under output_dir
+
+    Files with the same name in different subfolders keep their subfolder, so they
+    do not overwrite each other.
+
+    Raises:
+        ValueError: If two inputs would still be written to the same file
+    """
+    if not paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    outputs, seen = {}, {}
+    for path in paths:
+        output_path = os.path.join(output_dir, os.path.relpath(os.path.abspath(path), root))
+        key = os.path.normcase(output_path)
+        if key in seen:
+            raise ValueError(f"'{path}' en '{seen[key]}' zouden allebei naar '{output_path}' geschreven worden")
+        seen[key] = path
+        outputs[path] = output_path
+    return outputs
+
+
+# ==================== ROUND-TRIP CHECK ====================
+
+def settlement_totals(path: str) -> Dict[str, float]:
+    """Read and recalculate a workbook (as generate.py does) and return its settlement totals"""
+    import contextlib
+    import io
+    from calculator import recalculate_all
+    from excel_reader import ExcelReader
+    from viewmodels import _calculate_settlement
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ExcelReader(path) as reader:
+            data = reader.read_all()
+            data['gwe_voorschot'] = reader.get_float('Voorschot_GWE', default=0.0)
+        settlement = _calculate_settlement(recalculate_all(data))
+    return {
+        'borg_gebruikt': settlement.borg.gebruikt,
+        'borg_terug': settlement.borg.terug,
+        'restschade': settlement.borg.restschade,
+        'gwe_totaal_incl': settlement.gwe_totalen.totaal_incl,
+        'extra_schoonmaak': settlement.cleaning.extra_bedrag,
+        'schade_totaal_incl': settlement.damage_totalen.totaal_incl,
+        'totaal_eindafrekening': settlement.totaal_eindafrekening,
+    }
+
+
+def roundtrip_differences(source_path: str, migrated_path: str) -> List[str]:
+    """
+    Compare the settlement totals of a workbook and its migrated copy
+
+    Returns:
+        One line per differing total (empty = the migration kept the settlement)
+    """
+    original, migrated = settlement_totals(source_path), settlement_totals(migrated_path)
+    return [f"{name}: €{original[name]:.2f} -> €{migrated[name]:.2f}"
+            for name in original if abs(original[name] - migrated[name]) >= 0.005]
+
+
+def _migrate_one(path: str, fmt: str, output_path: Optional[str], template_path: Optional[str],
+                 check: bool = False) -> Dict[str, Any]:
+    """Worker: extract one workbook and (for xlsx) write its migrated copy"""
+    record = extract_settlement(path)
+    if fmt == 'xlsx':
+        write_current_workbook(record, template_path, output_path)
+        record['output'] = output_path
+        if check:
+            differences = roundtrip_differences(path, output_path)
+            if differences:
+                raise ValueError(f"round-trip wijkt af ({'; '.join(differences)})")
+    return record
+
+
+def migrate_files(paths: List[str], output_dir: str, fmt: str = 'xlsx',
+                  workers: Optional[int] = None, template_path: Optional[str] = None,
+                  check: bool = False) -> Dict[str, Any]:
+    """
+    Migrate many workbooks in parallel
+
+    Args:
+        paths: Source workbook paths
+        output_dir: Destination directory (xlsx: the inputs' subfolders are mirrored, see output_paths)
+        fmt: 'xlsx' (current-layout workbooks) or 'csv' (columnar settlement format)
+        workers: Number of worker processes (default: CPU count)
+        template_path: Current input template to patch (built fresh if omitted)
+        check: xlsx only: recalculate every migrated copy and fail it when its
+            settlement totals differ from the original (see roundtrip_differences)
+
+    Returns:
+        Dictionary with 'migrated' (list of (source, layout)) and 'failed' (list of (source, error))
+
+    Raises:
+        ValueError: If two inputs map to the same output file
+    """
+    destinations = output_paths(paths, output_dir) if fmt == 'xlsx' else {}
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_dir = None
+    if fmt == 'xlsx' and template_path is None:
+        from build_excel_template import create_excel_template
+        tmp_dir = tempfile.mkdtemp(prefix='rr_migrate_')
+        template_path = os.path.join(tmp_dir, 'input_template.xlsx')
+        create_excel_template(template_path)
+
+    columnar = ColumnarWriter(output_dir) if fmt == 'csv' else None
+    summary = {'migrated': [], 'failed': []}
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_migrate_one, path, fmt, destinations.get(path), template_path, check): path
+                       for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    summary['failed'].append((path, str(e)))
+                    continue
+                if columnar:
+                    columnar.write(record)
+                summary['migrated'].append((path, record['layout']))
+    finally:
+        if columnar:
+            columnar.close()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return summary
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Migreer oude eindafrekening workbooks naar de huidige template layout',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python migrate.py Archive/                         # Alle .xlsx in Archive -> migrated/
+  python migrate.py oud1.xlsx oud2.xlsx --output-dir nieuw
+  python migrate.py Archive/ --format csv            # Kolom-formaat (settlements.csv + regels)
+  python migrate.py Archive/ --workers 8
+  python migrate.py Archive/ --check                 # Herbereken en vergelijk met het origineel
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden of mappen')
+    parser.add_argument('--output-dir', default='migrated',
+                        help='Output map (default: migrated)')
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx',
+                        help='xlsx = huidige template layout, csv = kolom-formaat (default: xlsx)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    parser.add_argument('--template', default=None,
+                        help='Huidig (leeg) input template om te patchen (default: vers gebouwd)')
+    parser.add_argument('--check', action='store_true',
+                        help='Round-trip controle: herbereken elke gemigreerde workbook en vergelijk '
+                             'de afrekening met het origineel (alleen xlsx)')
+    args = parser.parse_args()
+
+    files = collect_inputs(args.inputs)
+    print(f"\n🔁 Migratie van {len(files)} workbook(s) naar layout v{CURRENT_LAYOUT.version} ({args.format})")
+
+    try:
+        summary = migrate_files(files, args.output_dir, fmt=args.format, workers=args.workers,
+                                template_path=args.template, check=args.check)
+    except ValueError as e:
+        print(f"❌ FOUT: {e}")
+        sys.exit(1)
+
+    for path, layout in sorted(summary['migrated']):
+        print(f"   ✓ {path} (layout v{layout})")
+    for path, error in sorted(summary['failed']):
+        print(f"   ⚠️  {path}: {error}")
+
+    print(f"\n✅ {len(summary['migrated'])} gemigreerd, {len(summary['failed'])} overgeslagen")
+    print(f"📍 Locatie: {os.path.abspath(args.output_dir)}")
+    sys.exit(1 if summary['failed'] and not summary['migrated'] else 0)
+
+
+if __name__ == "__main__":
+    main()
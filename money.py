@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Money - Integer-cent fixed point arithmetic for settlement amounts
+
+All amounts are calculated as whole euro cents (Python int), so sums and
+differences are exact and results do not depend on the order of additions.
+
+Rounding rules (commercial rounding, half away from zero):
+- Line amounts (quantity x rate) are rounded to cents per line
+- BTW is calculated on the rounded total excl. and rounded to cents once
+- Totals are exact sums of rounded cents (no further rounding)
+
+Entities keep amounts as floats for the templates; those floats are always
+produced by from_cents(), so they are the exact cent value (e.g. 140.13).
+"""
+
+import math
+from typing import Iterable
+
+import numpy as np
+
+CENTS_PER_EURO = 100
+
+# Float products like 1.005 * 100 land just below the half cent (100.49999...).
+# A tiny bias (in cents) makes such representation noise round like the decimal value.
+_ROUNDING_BIAS = 1e-6
+
+
+def to_cents(amount: float) -> int:
+    """
+    Convert a euro amount to integer cents (half away from zero)
+
+    Args:
+        amount: Amount in euro (float, int or None)
+
+    Returns:
+        Amount in cents
+    """
+    if not amount:
+        return 0
+    cents = math.floor(abs(amount) * CENTS_PER_EURO + 0.5 + _ROUNDING_BIAS)
+    return cents if amount > 0 else -cents
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents back to a euro float (exact cent value)"""
+    return cents / CENTS_PER_EURO
+
+
+def line_cents(quantity: float, rate: float) -> int:
+    """
+    Amount of a single line (quantity x rate), rounded to cents
+
+    Args:
+        quantity: Quantity, consumption, days or hours
+        rate: Rate per unit in euro (may have more than 2 decimals)
+
+    Returns:
+        Line amount in cents
+    """
+    return to_cents(quantity * rate)
+
+
+def percentage_cents(cents: int, percentage: int) -> int:
+    """
+    Whole-number percentage of a cent amount (e.g. 21% BTW), rounded half away from zero
+
+    Pure integer arithmetic, so the result is exact.
+
+    Args:
+        cents: Base amount in cents
+        percentage: Percentage as whole number (21 for 21%)
+
+    Returns:
+        Percentage amount in cents
+    """
+    result = (abs(cents) * percentage + 50) // 100
+    return result if cents >= 0 else -result
+
+
+def sum_cents(amounts: Iterable[float]) -> int:
+    """Sum euro amounts as cents (each amount rounded to cents first)"""
+    return sum(to_cents(amount) for amount in amounts)
+
+
+def to_cents_array(amounts: np.ndarray) -> np.ndarray:
+    """Vectorised to_cents (same float operations, so identical results)"""
+    cents = np.floor(np.abs(amounts) * CENTS_PER_EURO + 0.5 + _ROUNDING_BIAS)
+    return (np.sign(amounts) * cents).astype(np.int64)
+
+
+def percentage_cents_array(cents: np.ndarray, percentage) -> np.ndarray:
+    """Vectorised percentage_cents (percentage: int or one int per element)"""
+    return np.sign(cents) * ((np.abs(cents) * percentage + 50) // 100)
+
+
+def format_euro(amount: float, decimals: int = 2) -> str:
+    """
+    Format an amount in Dutch notation: €1.234,56
+
+    Rounds via integer cents, so the output never shows float noise and
+    halves always round away from zero.
+
+    Args:
+        amount: Amount in euro
+        decimals: 2 for cents, 0 for whole euros
+
+    Returns:
+        Formatted string, e.g. '€1.234,56' or '-€12,00'
+    """
+    cents = to_cents(amount)
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+
+    if decimals == 0:
+        euros = (cents + CENTS_PER_EURO // 2) // CENTS_PER_EURO
+        return f"{sign}€{euros:,}".replace(',', '.')
+
+    euros, rest = divmod(cents, CENTS_PER_EURO)
+    return f"{sign}€{euros:,}".replace(',', '.') + f",{rest:02d}"
+
+
+if __name__ == "__main__":
+    """Test money helpers"""
+    print("💶 Testing Money")
+    print("=" * 60)
+
+    assert to_cents(1.005) == 101
+    assert to_cents(-1.005) == -101
+    assert to_cents(0.1 + 0.2) == 30
+    assert line_cents(3, 0.1) == 30
+    assert percentage_cents(1050, 21) == 221       # 2.205 -> 2.21
+    assert percentage_cents(-1050, 21) == -221
+    assert from_cents(sum_cents([0.1] * 10)) == 1.0
+    assert format_euro(1234.5) == "€1.234,50"
+    assert format_euro(-0.005) == "-€0,01"
+    assert format_euro(2.5, decimals=0) == "€3"
+    assert to_cents_array(np.array([1.005, -1.005, 0.1 + 0.2])).tolist() == [101, -101, 30]
+    assert percentage_cents_array(np.array([1050, -1050]), 21).tolist() == [221, -221]
+    print("   ✓ Rounding and formatting")
+
+    # Float drift: 0.1 added 1000x drifts in float, is exact in cents
+    print(f"   Float sum: {sum([0.1] * 1000)!r}  Cent sum: {from_cents(sum_cents([0.1] * 1000))!r}")
+
+    print("\n✅ Money tests completed!")
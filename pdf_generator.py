@@ -9,7 +9,14 @@ HTML-first strategy: Always save HTML, attempt PDF as bonus.
 """
 
 import os
-from typing import Optional
+import tempfile
+from itertools import chain
+from typing import Iterable, Optional
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # optional, segments are then merged in memory
+    PdfWriter = None
 
 
 class PDFGenerator:
@@ -77,6 +84,74 @@ class PDFGenerator:
             print(f"   HTML can be manually printed to PDF from browser.")
             return False
     
+    def html_segments_to_pdf(self, html_segments: Iterable[str], output_path: str) -> bool:
+        """
+        Convert a document rendered in segments to one PDF
+        
+        Every segment is laid out on its own, so layout time grows linearly
+        with the number of rows instead of WeasyPrint laying out one huge
+        table. With pypdf each segment is written to its own PDF as soon as it
+        is laid out and the files are merged at PDF level, so only one
+        segment's layout is in memory at a time; html_segments can be a
+        generator (TemplateRenderer.render_detail_segments). Without pypdf
+        the laid out pages of all segments are kept and written together.
+        
+        Args:
+            html_segments: HTML of the consecutive segments
+            output_path: Output PDF file path
+            
+        Returns:
+            True if PDF was created successfully, False otherwise (also when
+            there are no segments; no file is written then)
+        """
+        if not self._check_weasyprint():
+            return False
+        
+        try:
+            from weasyprint import HTML
+            
+            segments = iter(html_segments)
+            first_segment = next(segments, None)
+            if first_segment is None:
+                print(f"⚠️  PDF generation skipped: geen segmenten voor {output_path}")
+                return False
+            html_segments = chain([first_segment], segments)
+            
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            
+            if PdfWriter is None:
+                print("⚠️  pypdf niet geïnstalleerd - alle segmenten blijven in geheugen tot de PDF geschreven is")
+                print("   Installeer met: pip install pypdf")
+                first, pages, count = None, [], 0
+                for html_content in html_segments:
+                    document = HTML(string=html_content, base_url=self.base_url).render()
+                    first = first or document
+                    pages.extend(document.pages)
+                    count += 1
+                first.copy(pages).write_pdf(output_path)
+                n_pages = len(pages)
+            else:
+                with tempfile.TemporaryDirectory(dir=os.path.dirname(output_path) or '.') as tmp_dir:
+                    segment_paths = []
+                    for count, html_content in enumerate(html_segments, 1):
+                        segment_path = os.path.join(tmp_dir, f"segment_{count:04d}.pdf")
+                        HTML(string=html_content, base_url=self.base_url).write_pdf(segment_path)
+                        segment_paths.append(segment_path)
+                    writer = PdfWriter()
+                    for segment_path in segment_paths:
+                        writer.append(segment_path)
+                    with open(output_path, 'wb') as f:
+                        writer.write(f)
+                    n_pages = len(writer.pages)
+            
+            print(f"📄 Generated PDF: {output_path} ({count} segmenten, {n_pages} pagina's)")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️  PDF generation failed: {e}")
+            print(f"   HTML can be manually printed to PDF from browser.")
+            return False
+    
     def html_file_to_pdf(self, html_path: str, pdf_path: Optional[str] = None) -> Optional[str]:
         """
         Convert HTML file to PDF
@@ -168,7 +243,8 @@ def generate_pdfs_from_html_files(onepager_html_path: str, detail_html_path: str
 def render_and_generate_pdfs(onepager_html: str, detail_html: str,
                              output_dir: str = "output", 
                              basename: str = "eindafrekening",
-                             base_url: str = ".") -> dict:
+                             base_url: str = ".",
+                             detail_segments: Optional[Iterable[str]] = None) -> dict:
     """
     Render HTML and generate PDFs with complete fallback handling
     
@@ -178,6 +254,9 @@ def render_and_generate_pdfs(onepager_html: str, detail_html: str,
         output_dir: Output directory
         basename: Base filename
         base_url: Base URL for WeasyPrint
+        detail_segments: Detail HTML rendered in segments, for large documents
+            (TemplateRenderer.render_detail_segments, consumed lazily); the HTML file
+            is always detail_html
         
     Returns:
         Dictionary with paths and status:
@@ -208,7 +287,10 @@ def render_and_generate_pdfs(onepager_html: str, detail_html: str,
     
     # Attempt PDF generation
     onepager_pdf_success = generator.html_to_pdf(onepager_html, onepager_pdf_path)
-    detail_pdf_success = generator.html_to_pdf(detail_html, detail_pdf_path)
+    if detail_segments is None:
+        detail_pdf_success = generator.html_to_pdf(detail_html, detail_pdf_path)
+    else:
+        detail_pdf_success = generator.html_segments_to_pdf(detail_segments, detail_pdf_path)
     
     # Build result
     result = {
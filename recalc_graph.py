@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Recalc Graph - Incremental recalculation of a settlement
+
+Models recalculate_all() + Calculator.calculate_settlement() as a dependency
+graph of derived fields. Changing an input only recomputes the nodes that
+depend on it; a node whose new value equals the old one stops the
+propagation. recalculate() reports which derived nodes changed, and
+changed_sections() maps those to the viewmodel sections (borg, gwe,
+cleaning, damage, totals) so the viewmodel/render layers can skip the rest.
+
+Usage:
+    graph = SettlementGraph.from_data(read_excel('input.xlsx'))
+    graph.set_input('totaal_uren', 8.5)
+    changed = graph.recalculate()          # {'cleaning', 'settlement'}
+    graph.changed_sections(changed)        # {'cleaning', 'totals'}
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from entities import Cleaning, DamageRegels, GWERegels
+from calculator import Calculator, round_totalen_to_cents
+
+
+@dataclass(frozen=True)
+class Node:
+    """Derived field: value = compute(*values of deps)"""
+    name: str
+    deps: Tuple[str, ...]
+    compute: Callable[..., Any]
+
+
+# ==================== NODE FUNCTIONS ====================
+
+def _gwe_totalen(regels, excel_totalen, btw_procent):
+    # Same rule as recalculate_all: without lines the Excel totals are kept
+    if regels:
+        return Calculator.calculate_gwe_totalen(regels, btw_procent)
+    return round_totalen_to_cents(excel_totalen)
+
+
+def _damage_totalen(regels, excel_totalen, btw_procent):
+    if regels:
+        return Calculator.calculate_damage_totalen(regels, btw_procent)
+    return round_totalen_to_cents(excel_totalen)
+
+
+def _settlement(deposit, gwe_voorschot, gwe_totalen, cleaning, damage_totalen):
+    return Calculator.calculate_settlement(
+        borg=deposit, gwe_voorschot=gwe_voorschot, gwe_totalen=gwe_totalen,
+        cleaning=cleaning, damage_totalen=damage_totalen
+    )
+
+
+# ==================== GRAPH DEFINITION ====================
+
+# Inputs (values as read from Excel)
+INPUTS = (
+    'meters',
+    'gwe_regels_invoer', 'gwe_totalen_excel', 'gwe_voorschot',
+    'damage_regels_invoer', 'damage_totalen_excel',
+    'pakket_type', 'pakket_naam', 'totaal_uren', 'uurtarief', 'schoonmaak_voorschot',
+    'borg_voorschot', 'borg_gebruikt_excel', 'btw_procent',
+)
+
+# Derived nodes, in dependency (topological) order
+NODES = (
+    Node('gwe_meterstanden', ('meters',), Calculator.calculate_meterstanden),
+    Node('gwe_regels', ('gwe_regels_invoer',), Calculator.calculate_gwe_regels),
+    Node('gwe_totalen', ('gwe_regels', 'gwe_totalen_excel', 'btw_procent'), _gwe_totalen),
+    Node('gwe_meer_minder', ('gwe_voorschot', 'gwe_totalen'),
+         lambda voorschot, totalen: Calculator.calculate_gwe_meer_minder(voorschot, totalen.totaal_incl)),
+    Node('damage_regels', ('damage_regels_invoer',), Calculator.calculate_damage_regels),
+    Node('damage_totalen', ('damage_regels', 'damage_totalen_excel', 'btw_procent'), _damage_totalen),
+    Node('cleaning', ('pakket_type', 'pakket_naam', 'totaal_uren', 'uurtarief', 'schoonmaak_voorschot'),
+         Calculator.calculate_cleaning),
+    Node('deposit', ('borg_voorschot', 'borg_gebruikt_excel', 'damage_totalen'),
+         lambda voorschot, gebruikt, totalen: Calculator.calculate_deposit_from_excel(
+             voorschot, gebruikt, totalen.totaal_incl)),
+    Node('settlement', ('deposit', 'gwe_voorschot', 'gwe_totalen', 'cleaning', 'damage_totalen'),
+         _settlement),
+)
+
+# Viewmodel section -> derived nodes shown in that section
+SECTIONS = {
+    'borg': ('deposit',),
+    'gwe': ('gwe_meterstanden', 'gwe_regels', 'gwe_totalen', 'gwe_meer_minder'),
+    'cleaning': ('cleaning',),
+    'damage': ('damage_regels', 'damage_totalen'),
+    'totals': ('settlement',),
+}
+
+
+class SettlementGraph:
+    """Holds input and derived values of one settlement and recalculates incrementally"""
+
+    def __init__(self, inputs: Dict[str, Any]):
+        """
+        Args:
+            inputs: Value for every name in INPUTS
+        """
+        missing = set(INPUTS) - set(inputs)
+        if missing:
+            raise ValueError(f"Missing graph inputs: {', '.join(sorted(missing))}")
+
+        self._values: Dict[str, Any] = dict(inputs)
+        self._dirty: Set[str] = set()
+        for node in NODES:
+            self._values[node.name] = node.compute(*(self._values[d] for d in node.deps))
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'SettlementGraph':
+        """
+        Build a graph from excel_reader data (before recalculate_all)
+
+        Args:
+            data: Dictionary as returned by read_excel() (plus 'gwe_voorschot')
+        """
+        cleaning: Cleaning = data['cleaning']
+        return cls({
+            'meters': data['gwe_meterstanden'],
+            'gwe_regels_invoer': GWERegels.from_regels(data['gwe_regels']),
+            'gwe_totalen_excel': data['gwe_totalen'],
+            'gwe_voorschot': data.get('gwe_voorschot', 0.0),
+            'damage_regels_invoer': DamageRegels.from_regels(data['damage_regels']),
+            'damage_totalen_excel': data['damage_totalen'],
+            'pakket_type': cleaning.pakket_type,
+            'pakket_naam': cleaning.pakket_naam,
+            'totaal_uren': cleaning.totaal_uren,
+            'uurtarief': cleaning.uurtarief,
+            'schoonmaak_voorschot': cleaning.voorschot,
+            'borg_voorschot': data['deposit'].voorschot,
+            'borg_gebruikt_excel': data['deposit'].gebruikt,
+            'btw_procent': data.get('btw_procent', Calculator.BTW_PROCENT),
+        })
+
+    def __getitem__(self, name: str) -> Any:
+        return self._values[name]
+
+    def set_input(self, name: str, value: Any):
+        """
+        Change an input value (takes effect on the next recalculate())
+
+        Raises:
+            KeyError: If name is not an input
+        """
+        if name not in INPUTS:
+            raise KeyError(f"'{name}' is not a graph input (derived fields cannot be set)")
+        if self._values[name] != value:
+            self._values[name] = value
+            self._dirty.add(name)
+
+    def recalculate(self) -> Set[str]:
+        """
+        Recompute the nodes affected by changed inputs
+
+        Returns:
+            Names of derived nodes whose value changed
+        """
+        changed = set(self._dirty)
+        self._dirty.clear()
+        if not changed:
+            return set()
+
+        for node in NODES:
+            if not changed.intersection(node.deps):
+                continue
+            value = node.compute(*(self._values[d] for d in node.deps))
+            if value != self._values[node.name]:
+                self._values[node.name] = value
+                changed.add(node.name)
+
+        return changed.difference(INPUTS)
+
+    @staticmethod
+    def changed_sections(changed: Set[str]) -> Set[str]:
+        """Map changed node names to viewmodel section names"""
+        return {section for section, nodes in SECTIONS.items() if changed.intersection(nodes)}
+
+    def apply_to(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write the derived values into a data dictionary (same keys as recalculate_all)
+
+        Args:
+            data: excel_reader data dictionary (client/object/period are kept)
+
+        Returns:
+            Same dictionary with calculated entities
+        """
+        data['gwe_meterstanden'] = self['gwe_meterstanden']
+        data['gwe_regels'] = self['gwe_regels']
+        data['gwe_totalen'] = self['gwe_totalen']
+        data['gwe_voorschot'] = self['gwe_voorschot']
+        data['damage_regels'] = self['damage_regels']
+        data['damage_totalen'] = self['damage_totalen']
+        data['cleaning'] = self['cleaning']
+        data['deposit'] = self['deposit']
+        data['btw_procent'] = self['btw_procent']
+        return data
+
+    def nodes_depending_on(self, name: str) -> List[str]:
+        """All derived nodes downstream of an input or node (in evaluation order)"""
+        affected = {name}
+        result = []
+        for node in NODES:
+            if affected.intersection(node.deps):
+                affected.add(node.name)
+                result.append(node.name)
+        return result
+
+
+if __name__ == "__main__":
+    """Test the recalc graph against recalculate_all"""
+    import copy
+    import sys
+    import time
+    from calculator import recalculate_all
+    from excel_reader import read_excel
+
+    print("🕸️  Testing Recalc Graph")
+    print("=" * 60)
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'input_template.xlsx'
+    data = read_excel(path)
+    data.setdefault('gwe_voorschot', 0.0)
+
+    graph = SettlementGraph.from_data(copy.deepcopy(data))
+    expected = recalculate_all(copy.deepcopy(data))
+    for key in ('gwe_meterstanden', 'gwe_regels', 'gwe_totalen', 'damage_regels',
+                'damage_totalen', 'cleaning', 'deposit'):
+        assert graph[key] == expected[key], f"{key} differs from recalculate_all"
+    print("   ✓ Initial values match recalculate_all")
+
+    # Inspector changes the cleaning hours
+    start = time.perf_counter()
+    graph.set_input('totaal_uren', data['cleaning'].totaal_uren + 1.5)
+    changed = graph.recalculate()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"   totaal_uren +1.5 → changed: {sorted(changed)} ({elapsed:.3f} ms)")
+    print(f"   sections: {sorted(graph.changed_sections(changed))}")
+
+    changed_data = copy.deepcopy(data)
+    changed_data['cleaning'].totaal_uren += 1.5
+    expected = recalculate_all(changed_data)
+    assert graph['cleaning'] == expected['cleaning']
+    assert 'gwe_totalen' not in changed and 'deposit' not in changed
+
+    # Setting the same value again changes nothing
+    graph.set_input('totaal_uren', data['cleaning'].totaal_uren + 1.5)
+    assert graph.recalculate() == set()
+    print("   ✓ Unchanged input → nothing recomputed")
+
+    print("\n✅ Recalc graph tests completed!")
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Reconcile - Portfolio-wide check of Excel cached values against the Python logic
+
+Batch version of calculator.validate_excel_calculations(): loads the cached
+(Excel-calculated) values of many workbooks into NumPy columns, recomputes
+every checked field vectorised and reports a discrepancy table with
+bestand, veld, excel, python and verschil.
+
+Workbooks are read straight from the xlsx XML (see migrate.py), in parallel.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from calculator import Calculator, SettlementBatch
+from entities import METER_TYPES
+from migrate import collect_inputs, extract_settlement
+from money import percentage_cents_array, to_cents_array
+from template_layout import TemplateLayoutError
+
+
+# Same tolerance as validate_excel_calculations for non-money values (kWh, m³, hours)
+QUANTITY_TOLERANCE = 0.01
+
+REPORT_COLUMNS = ['bestand', 'veld', 'excel', 'python', 'verschil']
+
+# Day zero of Excel date serials (1900 date system)
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+
+
+def _load(path: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Worker: extract cached values of one workbook (errors are returned, not raised)"""
+    try:
+        return path, extract_settlement(path), None
+    except (TemplateLayoutError, KeyError, ValueError, OSError) as e:
+        return path, None, str(e)
+    except Exception as e:  # zipfile.BadZipFile, ParseError, ...
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+# ==================== COLUMN BUILDING ====================
+
+class Portfolio:
+    """Cached Excel values of many workbooks as NumPy columns"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.files = [r['source'] for r in records]
+        self._values = [r['values'] for r in records]
+
+        self.gwe_index, self.gwe_names, gwe = self._lines(records, 'gwe_regels')
+        self.gwe_verbruik, self.gwe_tarief, self.gwe_kosten = gwe
+        self.damage_index, self.damage_names, damage = self._lines(records, 'damage_regels')
+        self.damage_aantal, self.damage_tarief, self.damage_bedrag = damage
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def column(self, name: str) -> np.ndarray:
+        """Named range values as float column (NaN where empty or not numeric)"""
+        return np.array([_as_float(v.get(name)) for v in self._values], dtype=np.float64)
+
+    def raw_column(self, name: str) -> List[Any]:
+        """Named range values as read (None where empty)"""
+        return [v.get(name) for v in self._values]
+
+    def date_column(self, name: str) -> np.ndarray:
+        """Named range dates as datetime64[D] column (NaT where empty or not a date)"""
+        return np.array([_as_day(v.get(name)) for v in self._values], dtype='datetime64[D]')
+
+    def input_column(self, name: str) -> np.ndarray:
+        """Named range values as float column, empty treated as 0 (like ExcelReader.get_float)"""
+        return np.nan_to_num(self.column(name), nan=0.0)
+
+    def pakket_types(self) -> List[str]:
+        """Cleaning package type per workbook, same mapping as ExcelReader.read_cleaning"""
+        types = []
+        for values in self._values:
+            pakket = str(values.get('Schoonmaak_pakket') or 'Basis Schoonmaak').lower()
+            types.append('7_uur' if ('intensief' in pakket or pakket == '7_uur') else '5_uur')
+        return types
+
+    def inbegrepen_uren(self) -> np.ndarray:
+        """Included cleaning hours per package"""
+        return np.array([Calculator.calculate_inbegrepen_uren(t) for t in self.pakket_types()],
+                        dtype=np.float64)
+
+    def batch_inputs(self, inbegrepen_uren: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        SettlementBatch keyword arguments for the whole portfolio
+
+        Args:
+            inbegrepen_uren: Precomputed inbegrepen_uren() (optional)
+        """
+        return {
+            'borg_voorschot': self.input_column('Voorschot_borg'),
+            'borg_gebruikt': self.input_column('Borg_gebruikt'),
+            'gwe_voorschot': self.input_column('Voorschot_GWE'),
+            'inbegrepen_uren': self.inbegrepen_uren() if inbegrepen_uren is None else inbegrepen_uren,
+            'totaal_uren': self.input_column('Totaal_uren_gew'),
+            'uurtarief': self.input_column('Uurtarief_schoonmaak'),
+            'gwe_totaal_excl': self.input_column('GWE_totaal_excl'),
+            'gwe_btw': self.input_column('GWE_BTW'),
+            'gwe_totaal_incl': self.input_column('GWE_totaal_incl'),
+            'damage_totaal_excl': self.input_column('Schade_totaal_excl'),
+            'damage_btw': self.input_column('Schade_BTW'),
+            'damage_totaal_incl': self.input_column('Schade_totaal_incl'),
+            'gwe_regel_index': self.gwe_index,
+            'gwe_verbruik': self.gwe_verbruik,
+            'gwe_tarief': self.gwe_tarief,
+            'damage_regel_index': self.damage_index,
+            'damage_aantal': self.damage_aantal,
+            'damage_tarief': self.damage_tarief,
+        }
+
+    @staticmethod
+    def _lines(records: List[Dict[str, Any]], key: str):
+        index, names, columns = [], [], ([], [], [])
+        for i, record in enumerate(records):
+            for regel in record[key]:
+                index.append(i)
+                names.append(regel[0])
+                for column, value in zip(columns, regel[1:]):
+                    column.append(np.nan if value is None else value)
+        return (np.array(index, dtype=np.intp), names,
+                tuple(np.array(c, dtype=np.float64) for c in columns))
+
+
+def _as_float(value: Any) -> float:
+    if value is None or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _as_day(value: Any) -> np.datetime64:
+    """Cached date value (Excel serial, 'YYYY-MM-DD' or 'DD-MM-YYYY') as datetime64[D]"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return EXCEL_EPOCH + np.timedelta64(int(value), 'D')
+    text = str(value).strip()[:10] if isinstance(value, str) else ''
+    if len(text) == 10 and text[2] == '-' and text[5] == '-':
+        text = f"{text[6:10]}-{text[3:5]}-{text[0:2]}"
+    try:
+        return np.datetime64(text, 'D')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+# ==================== RECONCILIATION ====================
+
+def _money_check(field: str, excel: np.ndarray, python_cents: np.ndarray,
+                 tolerance_cents: Any = 0) -> Dict[str, Any]:
+    return {'veld': field, 'excel': excel, 'python': python_cents / 100,
+            'differs': np.abs(to_cents_array(np.nan_to_num(excel)) - python_cents) > tolerance_cents}
+
+
+def _quantity_check(field: str, excel: np.ndarray, python: np.ndarray) -> Dict[str, Any]:
+    return {'veld': field, 'excel': excel, 'python': python,
+            'differs': np.abs(np.nan_to_num(excel) - python) > QUANTITY_TOLERANCE}
+
+
+def reconcile(portfolio: Portfolio) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Compare cached Excel values with the Python calculation, vectorised
+
+    Uses the same rules as validate_excel_calculations() (line amounts exact
+    to the cent, totals allow one cent per line, quantities 0.01), plus the
+    settlement outcome (GWE_meer_minder, Totaal_eindafrekening) as calculated
+    by SettlementBatch for the documents.
+
+    Args:
+        portfolio: Loaded workbooks
+
+    Returns:
+        Tuple (discrepancy rows, number of cached values that were missing)
+    """
+    n = len(portfolio)
+    btw = Calculator.BTW_PROCENT
+    checks = []
+
+    # Meter readings
+    for meter_type in METER_TYPES.values():
+        begin = portfolio.column(meter_type.begin_name)
+        if not meter_type.required and np.isnan(begin).all():
+            continue  # optional meter not present in any workbook
+        expected = portfolio.input_column(meter_type.eind_name) - np.nan_to_num(begin, nan=0.0)
+        checks.append(_quantity_check(meter_type.verbruik_name, portfolio.column(meter_type.verbruik_name), expected))
+
+    # Cleaning
+    inbegrepen = portfolio.inbegrepen_uren()
+    extra_uren = np.maximum(0.0, portfolio.input_column('Totaal_uren_gew') - inbegrepen)
+    checks.append(_quantity_check('Inbegrepen_uren', portfolio.column('Inbegrepen_uren'), inbegrepen))
+    checks.append(_quantity_check('Extra_uren', portfolio.column('Extra_uren'), extra_uren))
+    checks.append(_money_check('Extra_schoonmaak_bedrag', portfolio.column('Extra_schoonmaak_bedrag'),
+                               to_cents_array(extra_uren * portfolio.input_column('Uurtarief_schoonmaak'))))
+
+    # GWE and damage: lines, then totals recomputed from the lines
+    line_rows = []
+    for label, index, names, quantity, rate, cached, prefix in (
+        ('GWE', portfolio.gwe_index, portfolio.gwe_names, portfolio.gwe_verbruik,
+         portfolio.gwe_tarief, portfolio.gwe_kosten, 'GWE'),
+        ('Schade', portfolio.damage_index, portfolio.damage_names, portfolio.damage_aantal,
+         portfolio.damage_tarief, portfolio.damage_bedrag, 'Schade'),
+    ):
+        line_cents = to_cents_array(quantity * rate)
+        line_check = _money_check(f'{label} regel', cached, line_cents)
+        line_check['rows'] = index
+        line_check['names'] = [f'{label} regel "{name}"' for name in names]
+        line_rows.append(line_check)
+
+        excl = np.bincount(index, weights=line_cents, minlength=n).astype(np.int64)
+        tax = percentage_cents_array(excl, btw)
+        tolerance = np.bincount(index, minlength=n) + 1
+        checks.append(_money_check(f'{prefix}_totaal_excl', portfolio.column(f'{prefix}_totaal_excl'), excl, tolerance))
+        checks.append(_money_check(f'{prefix}_BTW', portfolio.column(f'{prefix}_BTW'), tax, tolerance))
+        checks.append(_money_check(f'{prefix}_totaal_incl', portfolio.column(f'{prefix}_totaal_incl'), excl + tax, tolerance))
+
+    # Deposit (validate_excel_calculations rule: based on Excel's damage total)
+    voorschot = to_cents_array(portfolio.input_column('Voorschot_borg'))
+    schade_incl = to_cents_array(portfolio.input_column('Schade_totaal_incl'))
+    checks.append(_money_check('Borg_gebruikt', portfolio.column('Borg_gebruikt'), np.minimum(voorschot, schade_incl)))
+    checks.append(_money_check('Borg_terug', portfolio.column('Borg_terug'), np.maximum(0, voorschot - schade_incl)))
+    checks.append(_money_check('Restschade', portfolio.column('Restschade'), np.maximum(0, schade_incl - voorschot)))
+
+    # Settlement outcome as shown on the documents
+    batch = SettlementBatch(**portfolio.batch_inputs(inbegrepen))
+    result = batch.calculate_cents()
+    checks.append(_money_check('GWE_meer_minder', portfolio.column('GWE_meer_minder'), result['gwe_meer_minder']))
+    checks.append(_money_check('Totaal_eindafrekening', portfolio.column('Totaal_eindafrekening'),
+                               result['totaal_eindafrekening']))
+
+    # Collect discrepancies (cells without a cached value are counted, not reported)
+    rows = []
+    missing = 0
+    for check in checks + line_rows:
+        has_value = ~np.isnan(check['excel'])
+        missing += int((~has_value).sum())
+        file_rows = check.get('rows', np.arange(n))
+        for i in np.nonzero(check['differs'] & has_value)[0]:
+            excel, python = float(check['excel'][i]), float(check['python'][i])
+            rows.append({
+                'bestand': portfolio.files[file_rows[i]],
+                'veld': check['names'][i] if 'names' in check else check['veld'],
+                'excel': round(excel, 4),
+                'python': python,
+                'verschil': round(python - excel, 2),
+            })
+
+    rows.sort(key=lambda r: (r['bestand'], r['veld']))
+    return rows, missing
+
+
+# ==================== CLI ====================
+
+def load_portfolio(paths: List[str], workers: Optional[int] = None):
+    """
+    Load workbooks in parallel
+
+    Returns:
+        Tuple (Portfolio, list of (path, error) for unreadable workbooks)
+    """
+    records, failed = [], []
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, record, error in pool.map(_load, paths, chunksize=chunksize):
+            if record is None:
+                failed.append((path, error))
+            else:
+                records.append(record)
+    return Portfolio(records), failed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Controleer Excel-berekende waarden van veel workbooks tegen de Python berekening',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python reconcile.py Archive/                       # Alle .xlsx in Archive
+  python reconcile.py Archive/ --output afwijkingen.csv
+  python reconcile.py archief_2024/ --workers 8
+  python reconcile.py archief_2024/ --meters meterstanden_afwijkingen.csv
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden of mappen')
+    parser.add_argument('--output', default='reconciliatie.csv',
+                        help='CSV met afwijkingen (default: reconciliatie.csv)')
+    parser.add_argument('--meters', metavar='CSV',
+                        help='Controleer ook meterstanden t.o.v. de historie per object (zie meter_anomalies.py)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    args = parser.parse_args()
+
+    files = collect_inputs(args.inputs)
+    print(f"\n🔎 Reconciliatie van {len(files)} workbook(s)")
+
+    start = time.perf_counter()
+    portfolio, failed = load_portfolio(files, workers=args.workers)
+    loaded = time.perf_counter()
+    rows, missing = reconcile(portfolio)
+    done = time.perf_counter()
+
+    for path, error in failed:
+        print(f"   ⚠️  {path}: {error}")
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if args.meters:
+        from meter_anomalies import MeterHistory, detect_anomalies, write_anomalies
+        anomalies = detect_anomalies(MeterHistory.from_portfolio(portfolio))
+        write_anomalies(args.meters, anomalies)
+        print(f"   {'⚠️ ' if anomalies else '✓'} {len(anomalies)} afwijkende meterstand(en) → {args.meters}")
+
+    files_with_issues = len({r['bestand'] for r in rows})
+    print(f"   ✓ Ingelezen: {len(portfolio)} workbooks ({loaded - start:.2f}s)")
+    print(f"   ✓ Vergeleken: {done - loaded:.3f}s")
+    if missing:
+        print(f"   ℹ️  {missing} waarden zonder Excel-berekening (niet vergeleken)")
+    print(f"\n{'⚠️ ' if rows else '✅'} {len(rows)} afwijking(en) in {files_with_issues} workbook(s)")
+    print(f"📍 Rapport: {os.path.abspath(args.output)}")
+    sys.exit(1 if rows else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Rerender - Re-issue documents from viewmodel snapshots (no Excel, no calculation)
+
+After a change to template_onepager.html / template_detail.html (or to the
+bar visuals) every settlement can be rendered again from the snapshots that
+generate.py stored (see snapshot_store.py). Workbooks are not opened and
+nothing is recalculated, so the numbers are exactly those of the original
+run. Settlements are rendered in parallel worker processes; each worker
+opens the database read-only, keeps one Jinja environment and builds the
+bars of a whole batch of snapshots at once (viewmodels.resolve_visuals_batch).
+
+Usage:
+    python rerender.py                                  # All snapshots in output/snapshots.db
+    python rerender.py --key '%jansen%' --html-only
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from bar_backends import get_backend
+from snapshot_store import SnapshotStore
+from viewmodels import resolve_visuals_batch
+from template_renderer import TemplateRenderer, load_logo_b64
+
+
+BATCH_SIZE = 256  # Snapshots per worker task (their bars are built together)
+
+# Per-process state (set by _init_worker)
+_store: Optional[SnapshotStore] = None
+_renderer: Optional[TemplateRenderer] = None
+_logo_b64: Optional[str] = None
+
+
+def _init_worker(db_path: str, template_dir: str, logo_path: str, raster_cache: Optional[str] = None):
+    global _store, _renderer, _logo_b64
+    if raster_cache:
+        get_backend('raster', cache_dir=raster_cache)
+    _store = SnapshotStore(db_path, readonly=True)
+    _renderer = TemplateRenderer(template_dir=template_dir)
+    _logo_b64 = load_logo_b64(logo_path)
+
+
+def rerender_one(key: str, output_dir: str, html_only: bool = False,
+                 viewmodels: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Render the documents of one snapshot (in a worker initialised by _init_worker)
+
+    Args:
+        viewmodels: The snapshot's (onepager, detail) viewmodels when already loaded
+
+    Returns:
+        Dictionary onepager/detail -> {'html': path, 'pdf': path or None, 'is_pdf': bool}
+    """
+    onepager_vm, detail_vm = viewmodels or _store.load(key)
+    onepager_vm['logo_b64'] = _logo_b64
+    onepager_html, detail_html = _renderer.render_both(onepager_vm, detail_vm)
+
+    if html_only:
+        result = {}
+        os.makedirs(output_dir, exist_ok=True)
+        for document, html in (('onepager', onepager_html), ('detail', detail_html)):
+            path = os.path.join(output_dir, f"{key}_{document}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            result[document] = {'html': path, 'pdf': None, 'is_pdf': False}
+        return result
+
+    from pdf_generator import render_and_generate_pdfs
+    detail_segments = _renderer.render_detail_segments(detail_vm)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return render_and_generate_pdfs(onepager_html=onepager_html, detail_html=detail_html,
+                                        output_dir=output_dir, basename=key, base_url=_renderer.template_dir,
+                                        detail_segments=detail_segments)
+
+
+def _rerender_batch(keys: List[str], output_dir: str,
+                    html_only: bool) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """Worker: render a batch of snapshots, bars built in one pass (errors are returned, not raised)"""
+    results, loaded = [], {}
+    for key in keys:
+        try:
+            loaded[key] = _store.load(key)
+        except Exception as e:
+            results.append((key, None, f"{type(e).__name__}: {e}"))
+    resolve_visuals_batch([onepager_vm for onepager_vm, _ in loaded.values()])
+
+    for key, viewmodels in loaded.items():
+        try:
+            results.append((key, rerender_one(key, output_dir, html_only, viewmodels), None))
+        except Exception as e:
+            results.append((key, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def rerender_all(db_path: str, keys: List[str], output_dir: str, template_dir: str = ".",
+                 logo_path: str = os.path.join('assets', 'ryanrent_co.jpg'), html_only: bool = False,
+                 workers: Optional[int] = None,
+                 raster_cache: Optional[str] = None) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    Render many snapshots in parallel
+
+    Args:
+        raster_cache: PNG cache directory for snapshots drawn with the raster backend
+
+    Returns:
+        Tuple (key -> result of rerender_one, list of (key, error) for failed snapshots)
+    """
+    results, failed = {}, []
+    size = max(1, min(BATCH_SIZE, len(keys) // ((workers or os.cpu_count() or 1) * 4)))
+    batches = [keys[start:start + size] for start in range(0, len(keys), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db_path, template_dir, logo_path, raster_cache)) as pool:
+        n = len(batches)
+        for batch in pool.map(_rerender_batch, batches, [output_dir] * n, [html_only] * n):
+            for key, result, error in batch:
+                if result is None:
+                    failed.append((key, error))
+                else:
+                    results[key] = result
+    return results, failed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Render afrekeningen opnieuw vanuit opgeslagen viewmodels (zonder Excel of herberekening)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python rerender.py                                   # Alle snapshots in output/snapshots.db
+  python rerender.py --list                            # Toon opgeslagen afrekeningen
+  python rerender.py --key '%jansen%' --html-only      # Alleen afrekeningen van Jansen, alleen HTML
+  python rerender.py --db archief/snapshots.db --output-dir heruitgifte --workers 8
+        """
+    )
+    parser.add_argument('--db', default=os.path.join('output', 'snapshots.db'),
+                        help='Snapshot database (default: output/snapshots.db)')
+    parser.add_argument('--output-dir', default='output',
+                        help='Output directory for generated files (default: output)')
+    parser.add_argument('--key', help="Alleen snapshots waarvan de naam hierop lijkt (SQL LIKE, bijv. '%%jansen%%')")
+    parser.add_argument('--list', action='store_true', help='Toon de opgeslagen snapshots en stop')
+    parser.add_argument('--template-dir', default='.', help='Map met de templates (default: .)')
+    parser.add_argument('--html-only', action='store_true', help='Skip PDF generation, only create HTML')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    parser.add_argument('--raster-cache',
+                        help='PNG cache voor snapshots met raster bars (default: <output-dir>/raster_cache)')
+    args = parser.parse_args()
+
+    try:
+        with SnapshotStore(args.db, readonly=True) as store:
+            if args.list:
+                for key, bron, aangemaakt in store.entries():
+                    print(f"{aangemaakt}  {key}  ({bron or '-'})")
+                return
+            keys = store.keys(args.key)
+    except FileNotFoundError as e:
+        print(f"❌ FOUT: {e}")
+        sys.exit(1)
+
+    print(f"\n🔁 {len(keys)} afrekening(en) opnieuw renderen uit {args.db}")
+    start = time.perf_counter()
+    results, failed = rerender_all(args.db, keys, args.output_dir, template_dir=args.template_dir,
+                                   html_only=args.html_only, workers=args.workers,
+                                   raster_cache=args.raster_cache or os.path.join(args.output_dir, 'raster_cache'))
+    elapsed = time.perf_counter() - start
+
+    for key, error in failed:
+        print(f"   ⚠️  {key}: {error}")
+    pdfs = sum(r[doc]['is_pdf'] for r in results.values() for doc in ('onepager', 'detail'))
+    print(f"   ✓ {len(results)} afrekening(en) gerenderd in {elapsed:.2f}s "
+          f"({pdfs} PDF, {2 * len(results) - pdfs} alleen HTML)")
+    print(f"\n{'⚠️ ' if failed else '✅'} {len(failed)} snapshot(s) mislukt")
+    print(f"📍 Locatie: {os.path.abspath(args.output_dir)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
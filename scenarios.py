@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Scenarios - What-if sweep over settlement parameters for a whole portfolio
+
+Answers questions like "what if cleaning goes to €45/h and the 5-hour
+package becomes 6?" for last season's settlements without rendering any
+documents. The settlement inputs of the portfolio are loaded once (and can
+be cached as .npz), every combination of the parameter grid is applied to
+them, and all scenarios are calculated in one vectorised SettlementBatch.
+The output is an aggregate table of totaal_eindafrekening per scenario.
+
+Parameter values:
+    uurtarief=45,50          absolute values
+    gwe_voorschot=x1.0,x1.1  'x' = multiply the current values
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculator import Calculator, SettlementBatch
+from migrate import collect_inputs
+from reconcile import load_portfolio
+
+
+# Parameter -> (SettlementBatch column, cleaning package it is limited to)
+PARAMETERS = {
+    'uurtarief': ('uurtarief', None),
+    'gwe_voorschot': ('gwe_voorschot', None),
+    'borg_voorschot': ('borg_voorschot', None),
+    'gwe_tarief': ('gwe_tarief', None),
+    'schade_tarief': ('damage_tarief', None),
+    'totaal_uren': ('totaal_uren', None),
+    'uren_5_uur': ('inbegrepen_uren', '5_uur'),
+    'uren_7_uur': ('inbegrepen_uren', '7_uur'),
+    'btw': ('btw_procent', None),
+}
+
+SUMMARY_COLUMNS = ['scenario', 'aantal', 'totaal', 'gemiddeld', 'p10', 'mediaan', 'p90',
+                   'min', 'max', 'huurder_betaalt', 'verschil_totaal']
+
+BASELINE = 'huidig'
+
+
+@dataclass(frozen=True)
+class ParameterValue:
+    """One value of a grid parameter"""
+    name: str
+    value: float
+    scale: bool  # True: multiply the current values, False: replace them
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}={'x' if self.scale else ''}{self.value:g}"
+
+
+def parse_grid(specs: Sequence[str]) -> List[List[ParameterValue]]:
+    """
+    Parse '--param name=v1,v2' arguments
+
+    Returns:
+        One list of values per parameter (the grid axes)
+
+    Raises:
+        ValueError: On an unknown parameter or a malformed value
+    """
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        name = name.strip().lower()
+        if name not in PARAMETERS:
+            raise ValueError(f"Onbekende parameter '{name}' (bekend: {', '.join(PARAMETERS)})")
+        axis = []
+        for raw in values.split(','):
+            raw = raw.strip().lower()
+            scale = raw[:1] in ('x', '*')
+            axis.append(ParameterValue(name, float(raw.lstrip('x*').replace('€', '')), scale))
+        if not axis:
+            raise ValueError(f"Parameter '{name}' heeft geen waarden")
+        axes.append(axis)
+    return axes
+
+
+# ==================== PORTFOLIO INPUTS ====================
+
+def portfolio_inputs(paths: List[str], workers: Optional[int] = None):
+    """
+    Load the SettlementBatch inputs of many workbooks
+
+    Returns:
+        Tuple (inputs dict of columns incl. 'bestand' and 'pakket_type', list of (path, error))
+    """
+    portfolio, failed = load_portfolio(paths, workers=workers)
+    inputs = portfolio.batch_inputs()
+    inputs['btw_procent'] = np.full(len(portfolio), Calculator.BTW_PROCENT, dtype=np.int64)
+    inputs['bestand'] = np.array(portfolio.files, dtype=str)
+    inputs['pakket_type'] = np.array(portfolio.pakket_types(), dtype=str)
+    return inputs, failed
+
+
+def save_inputs(path: str, inputs: Dict[str, np.ndarray]):
+    """Cache portfolio inputs (.npz)"""
+    np.savez_compressed(path, **inputs)
+
+
+def load_inputs(path: str) -> Dict[str, np.ndarray]:
+    """Load cached portfolio inputs (.npz)"""
+    with np.load(path) as cached:
+        return {key: cached[key] for key in cached.files}
+
+
+# ==================== SWEEP ====================
+
+def _apply(inputs: Dict[str, np.ndarray], values: Tuple[ParameterValue, ...]) -> Dict[str, np.ndarray]:
+    """Copy of the batch columns with one scenario applied"""
+    columns = dict(inputs)
+    for value in values:
+        column, pakket = PARAMETERS[value.name]
+        current = columns[column]
+        new = current * value.value if value.scale else np.full_like(current, value.value)
+        if pakket is not None:
+            new = np.where(inputs['pakket_type'] == pakket, new, current)
+        columns[column] = new.astype(current.dtype) if column == 'btw_procent' else new
+    return columns
+
+
+def _stack(scenarios: List[Dict[str, np.ndarray]], n: int) -> SettlementBatch:
+    """One SettlementBatch with the rows of all scenarios after each other"""
+    kwargs = {}
+    for column in scenarios[0]:
+        if column in ('bestand', 'pakket_type'):
+            continue
+        parts = [s[column] for s in scenarios]
+        if column.endswith('_regel_index'):
+            # Lines of scenario k belong to settlement rows k*n .. k*n+n-1
+            parts = [p + k * n for k, p in enumerate(parts)]
+        kwargs[column] = np.concatenate(parts)
+    return SettlementBatch(**kwargs)
+
+
+def sweep(inputs: Dict[str, np.ndarray], axes: List[List[ParameterValue]]) -> Tuple[List[str], np.ndarray]:
+    """
+    Calculate totaal_eindafrekening for every scenario in the grid
+
+    Args:
+        inputs: Portfolio inputs (see portfolio_inputs / load_inputs)
+        axes: Parsed grid (see parse_grid)
+
+    Returns:
+        Tuple (scenario labels, cents array S x N); the first scenario is the baseline
+    """
+    n = len(inputs['borg_voorschot'])
+    combinations = [()] + list(itertools.product(*axes)) if axes else [()]
+    labels = [BASELINE] + [' '.join(v.label for v in combo) for combo in combinations[1:]]
+
+    batch = _stack([_apply(inputs, combo) for combo in combinations], n)
+    totaal = batch.calculate_cents()['totaal_eindafrekening']
+    return labels, totaal.reshape(len(combinations), n)
+
+
+def summarize(labels: List[str], totaal_cents: np.ndarray) -> List[Dict[str, float]]:
+    """
+    Aggregate table per scenario (amounts in euro)
+
+    'huurder_betaalt' counts settlements where the tenant pays (negative total),
+    'verschil_totaal' is the portfolio total minus the baseline total.
+    """
+    totaal = totaal_cents / 100
+    p10, mediaan, p90 = (np.percentile(totaal, [10, 50, 90], axis=1) if totaal.shape[1]
+                         else np.zeros((3, len(labels))))
+    sums = totaal_cents.sum(axis=1)
+    rows = []
+    for i, label in enumerate(labels):
+        count = totaal.shape[1]
+        rows.append({
+            'scenario': label,
+            'aantal': count,
+            'totaal': sums[i] / 100,
+            'gemiddeld': round(float(totaal[i].mean()), 2) if count else 0.0,
+            'p10': round(float(p10[i]), 2),
+            'mediaan': round(float(mediaan[i]), 2),
+            'p90': round(float(p90[i]), 2),
+            'min': float(totaal[i].min()) if count else 0.0,
+            'max': float(totaal[i].max()) if count else 0.0,
+            'huurder_betaalt': int((totaal_cents[i] < 0).sum()),
+            'verschil_totaal': (sums[i] - sums[0]) / 100,
+        })
+    return rows
+
+
+# ==================== CLI ====================
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Wat-als scenario\'s doorrekenen over een portfolio van eindafrekeningen',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scenarios.py Archive/ --param uurtarief=45,50 --param uren_5_uur=5,6
+  python scenarios.py Archive/ --cache seizoen_2024.npz --param gwe_voorschot=x1.0,x1.1
+  python scenarios.py seizoen_2024.npz --param btw=21,9 --output btw.csv
+
+Parameters: """ + ', '.join(PARAMETERS)
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden, mappen of een .npz cache')
+    parser.add_argument('--param', action='append', default=[],
+                        help='Parameter met waarden: naam=v1,v2 (x1.1 = huidige waarde maal 1.1)')
+    parser.add_argument('--cache', help='Sla de ingelezen portfolio op als .npz (voor volgende runs)')
+    parser.add_argument('--output', default='scenarios.csv',
+                        help='CSV met scenario samenvatting (default: scenarios.csv)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen bij inlezen (default: aantal CPU cores)')
+    args = parser.parse_args()
+
+    try:
+        axes = parse_grid(args.param)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    if len(args.inputs) == 1 and args.inputs[0].endswith('.npz'):
+        inputs = load_inputs(args.inputs[0])
+        print(f"\n📦 Portfolio uit cache: {args.inputs[0]}")
+    else:
+        files = collect_inputs(args.inputs)
+        print(f"\n📊 Portfolio inlezen: {len(files)} workbook(s)")
+        inputs, failed = portfolio_inputs(files, workers=args.workers)
+        for path, error in failed:
+            print(f"   ⚠️  {path}: {error}")
+        if args.cache:
+            save_inputs(args.cache, inputs)
+            print(f"   ✓ Cache opgeslagen: {args.cache}")
+    loaded = time.perf_counter()
+
+    labels, totaal = sweep(inputs, axes)
+    rows = summarize(labels, totaal)
+    done = time.perf_counter()
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"   ✓ {len(inputs['borg_voorschot'])} afrekeningen ({loaded - start:.2f}s)")
+    print(f"   ✓ {len(labels)} scenario's berekend ({done - loaded:.3f}s)\n")
+    width = max(len(label) for label in labels)
+    print(f"   {'scenario':<{width}}  {'totaal':>12}  {'mediaan':>9}  {'verschil':>11}  betaalt")
+    for row in rows:
+        print(f"   {row['scenario']:<{width}}  {row['totaal']:>12.2f}  {row['mediaan']:>9.2f}  "
+              f"{row['verschil_totaal']:>+11.2f}  {row['huurder_betaalt']:>7}")
+    print(f"\n📍 Rapport: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
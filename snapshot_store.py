@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store - Final viewmodels per settlement in SQLite
+
+generate.py stores the onepager and detail viewmodel of every run, keyed by
+the output basename (client + period, so a re-run replaces the earlier
+snapshot). rerender.py renders documents straight from these snapshots when
+only the templates changed: no workbook is read and nothing is recalculated.
+
+Viewmodels are stored as zlib-compressed compact JSON. SVG bars, captions
+and detail pages are not stored; load() attaches them again as lazy members
+(see viewmodels.attach_visuals / attach_pages), so re-rendered documents also
+pick up changes to svg_bars.py. The logo is not stored either (it is the same
+for every settlement).
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from viewmodels import SectionView, _json_default, attach_pages, attach_visuals
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key         TEXT PRIMARY KEY,
+    bron        TEXT,
+    aangemaakt  TEXT NOT NULL,
+    onepager    BLOB NOT NULL,
+    detail      BLOB NOT NULL
+)
+"""
+
+COMPRESS_LEVEL = 6
+
+
+def _snapshot_default(value: Any) -> Any:
+    """JSON fallback: section views without their lazy members"""
+    if isinstance(value, SectionView):
+        return {key: value[key] for key in value if key not in value.members}
+    return _json_default(value)
+
+
+def encode_viewmodel(viewmodel: Dict[str, Any]) -> bytes:
+    """Viewmodel -> compressed compact JSON"""
+    text = json.dumps(viewmodel, separators=(',', ':'), ensure_ascii=False, default=_snapshot_default)
+    return zlib.compress(text.encode('utf-8'), COMPRESS_LEVEL)
+
+
+def decode_viewmodel(blob: bytes) -> Dict[str, Any]:
+    """Compressed JSON -> viewmodel (plain dicts and lists)"""
+    return json.loads(zlib.decompress(blob))
+
+
+class SnapshotStore:
+    """SQLite file of viewmodel snapshots, one row per settlement"""
+
+    def __init__(self, path: str, readonly: bool = False):
+        """
+        Args:
+            path: SQLite database file (created if missing, unless readonly)
+            readonly: Open without write access (rerender workers)
+        """
+        self.path = path
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Snapshot database '{path}' niet gevonden.")
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            self.conn.execute(SCHEMA)
+
+    def save(self, key: str, onepager_vm: Dict[str, Any], detail_vm: Dict[str, Any],
+             bron: Optional[str] = None):
+        """
+        Store (or replace) the viewmodels of one settlement
+
+        Args:
+            key: Settlement key (output basename)
+            onepager_vm: OnePager viewmodel (logo and lazy SVG members are left out)
+            detail_vm: Detail viewmodel
+            bron: Source workbook
+        """
+        onepager = {k: v for k, v in onepager_vm.items() if k != 'logo_b64'}
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, bron, aangemaakt, onepager, detail) VALUES (?, ?, ?, ?, ?)",
+                (key, bron, datetime.now().isoformat(timespec='seconds'),
+                 encode_viewmodel(onepager), encode_viewmodel(detail_vm)),
+            )
+
+    def load(self, key: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Viewmodels of one settlement, ready to render
+
+        Returns:
+            Tuple of (onepager_viewmodel, detail_viewmodel)
+
+        Raises:
+            KeyError: If there is no snapshot for the key
+        """
+        row = self.conn.execute("SELECT onepager, detail FROM snapshots WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return attach_visuals(decode_viewmodel(row[0])), attach_pages(decode_viewmodel(row[1]))
+
+    def keys(self, pattern: Optional[str] = None) -> List[str]:
+        """Settlement keys, sorted (pattern: SQL LIKE filter, e.g. '%jansen%')"""
+        if pattern is None:
+            rows = self.conn.execute("SELECT key FROM snapshots ORDER BY key")
+        else:
+            rows = self.conn.execute("SELECT key FROM snapshots WHERE key LIKE ? ORDER BY key", (pattern,))
+        return [key for (key,) in rows]
+
+    def entries(self) -> Iterator[Tuple[str, Optional[str], str]]:
+        """(key, bron, aangemaakt) of every snapshot"""
+        yield from self.conn.execute("SELECT key, bron, aangemaakt FROM snapshots ORDER BY key")
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM snapshots WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -4,11 +4,71 @@ SVG Bar Generator - POT-BASED VISUALIZATION
 Creates pot-based bars where voorschot (pot) = fixed 400px baseline.
 - Underuse: solid portion shows usage, stripe shows return (within 400px)
 - Overflow: pot fills 400px + small fixed extension indicator (50px)
+
+Output is deterministic: the stripe pattern ID is derived from the inputs,
+so the same bar always produces the same markup. The generators are
+memoized with an LRU cache; a portfolio repeats the same voorschot / usage
+combinations a lot, and a repeated bar costs a dictionary lookup.
+
+Bars only come in a few sizes (GEOMETRY_SIZES) and used widths are
+snapped to whole pixels, so the rect and path of every possible shape are
+precomputed at import (GEOMETRY); drawing a bar is table lookups plus the
+labels. See benchmark_bars.py.
+
+For a whole portfolio, generate_section_bars() draws the bars of N
+settlements in one call from arrays of voorschot / gebruikt / extra, with
+the geometry and label formatting shared across the batch.
 """
 
-from typing import Tuple
+import hashlib
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+SVG_CACHE_SIZE = 4096  # Bars kept per generator (a few hundred bytes each); typed, as 280 and 280.0 render differently
+
+
+# Style name -> presentation attributes
+STYLES = {
+    'pot': 'fill="#81C784" stroke="#E0E0E0" stroke-width="1"',
+    'start': 'fill="#A5D6A7" stroke="#E0E0E0" stroke-width="1"',
+    'used': 'fill="#FFE082"',
+    'over': 'fill="#EF9A9A"',
+    'limit': 'stroke="#D32F2F" stroke-width="2" stroke-dasharray="4,4" opacity="0.6"',
+    'label': 'text-anchor="middle" fill="#2C3E50" font-size="11" font-weight="600" font-family="Barlow, sans-serif"',
+    'label-over': 'text-anchor="middle" fill="#C62828" font-size="11" font-weight="600" font-family="Barlow, sans-serif"',
+    'label-badge': 'text-anchor="middle" fill="#C62828" font-size="10" font-weight="700" font-family="Barlow, sans-serif"',
+}
+
+
+def _shape(w: float, h: float, r: float, style: str,
+           round_left: bool = True, round_right: bool = True) -> str:
+    """Bar shape at x=0: rect (both ends round) or path"""
+    # Precomputed for whole-pixel widths at the standard sizes (an int key: 72.0 would print differently)
+    element = GEOMETRY.get((w, h, round_left, round_right)) if type(w) is int and r == h / 2 else None
+    if element is None:
+        element = _shape_element(w, h, r, round_left, round_right)
+    return element + STYLES[style] + '/>'
+
+
+def _shape_element(w: float, h: float, r: float, round_left: bool, round_right: bool) -> str:
+    """Opening of a shape element without its style: rect (both ends round) or path"""
+    if round_left and round_right:
+        return f'<rect x="0" y="0" width="{w}" height="{h}" rx="{r}" '
+    path_d = generate_rounded_rect_path.__wrapped__(0, 0, w, h, r, round_left=round_left, round_right=round_right)
+    return f'<path d="{path_d}" '
+
+
+def _pattern_id(*inputs) -> str:
+    """Stripe pattern ID derived from the bar's inputs (same bar, same ID)"""
+    digest = hashlib.blake2b(repr(inputs).encode('utf-8'), digest_size=4).hexdigest()
+    return f"stripes_{digest}"
 
 
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
 def generate_rounded_rect_path(x: float, y: float, w: float, h: float, r: float, round_left: bool = True, round_right: bool = True) -> str:
     """
     Generate SVG path for a rectangle with selectively rounded corners.
@@ -60,117 +120,144 @@ def generate_rounded_rect_path(x: float, y: float, w: float, h: float, r: float,
     return " ".join(path)
 
 
-def generate_bar_svg(
-    voorschot: float,
-    gebruikt_or_totaal: float,
-    is_overfilled: bool,
-    label_gebruikt: str = "",
-    label_extra_or_terug: str = "",
-    pot_width: int = 400,
-    height: int = 40,
-    show_limit_line: bool = False,
-    rounded_right: bool = True
-) -> str:
+EXTENSION_WIDTH = 50  # Fixed extension for overflow
+
+
+def bar_layout(voorschot: float, gebruikt_or_totaal: float, is_overfilled: bool,
+               label_gebruikt: str = "", label_extra_or_terug: str = "", pot_width: int = 400,
+               show_limit_line: bool = False) -> Tuple[int, int, bool, str, str]:
     """
-    Generate pot-based SVG bar.
-    
-    Args:
-        ...
-        rounded_right: If False, right corners will be sharp (for connecting to overflow bar)
+    Widths and labels of a pot bar (shared by every bar backend, see bar_backends.py)
+
+    Returns:
+        Tuple (total width, used width in whole pixels, show pot limit line,
+        label of the used part, label of the return / overflow part)
     """
-    
-    border_radius = height / 2
-    extension_width = 50  # Fixed extension for overflow
-    
     # Prevent division by zero
     if voorschot <= 0:
         voorschot = 1
     
     if is_overfilled:
         # OVERFLOW: Pot fills pot_width + small fixed extension
-        total_width = pot_width + extension_width
+        total_width = pot_width + EXTENSION_WIDTH
         used_width = pot_width  # Usage fills entire base
-        show_extension = True
         show_marker = True
         
         # Labels
         label_used = label_gebruikt if label_gebruikt else f"€{voorschot:.0f}"
-        label_overflow_text = label_extra_or_terug if label_extra_or_terug else f"+€{gebruikt_or_totaal - voorschot:.0f}"
+        label_right = label_extra_or_terug if label_extra_or_terug else f"+€{gebruikt_or_totaal - voorschot:.0f}"
     else:
         # UNDERUSE or PERFECT FIT: Usage within pot
         total_width = pot_width
         used_width = (gebruikt_or_totaal / voorschot) * pot_width
-        show_extension = False
         show_marker = show_limit_line  # Use the parameter
         
         # Labels
         label_used = label_gebruikt if label_gebruikt else f"€{gebruikt_or_totaal:.0f}"
-        label_return = label_extra_or_terug if label_extra_or_terug else f"€{voorschot - gebruikt_or_totaal:.0f}"
+        label_right = label_extra_or_terug if label_extra_or_terug else f"€{voorschot - gebruikt_or_totaal:.0f}"
     
-    # Ensure minimum visibility
+    # Ensure minimum visibility, then snap to whole pixels (see GEOMETRY)
     if used_width > 0 and used_width < 5:
         used_width = 5
+    return total_width, round(used_width), show_marker, label_used, label_right
+
+
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
+def generate_bar_svg(
+    voorschot: float,
+    gebruikt_or_totaal: float,
+    is_overfilled: bool,
+    label_gebruikt: str = "",
+    label_extra_or_terug: str = "",
+    pot_width: int = 400,
+    height: int = 40,
+    show_limit_line: bool = False,
+    rounded_right: bool = True
+) -> str:
+    """
+    Generate pot-based SVG bar.
     
-    # Build SVG with unique pattern ID
-    import random
-    pattern_id = f"stripes_{random.randint(1000, 9999)}"
+    Args:
+        ...
+        rounded_right: If False, right corners will be sharp (for connecting to overflow bar)
+    """
+    
+    total_width, used_width, show_marker, label_used, label_right = bar_layout(
+        voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt, label_extra_or_terug, pot_width, show_limit_line)
+    
+    svg_parts = [_svg_open(total_width, height)]
     
-    svg_parts = [f'<svg width="{total_width}" height="{height}" viewBox="0 0 {total_width} {height}" xmlns="http://www.w3.org/2000/svg">']
+    # Defs for stripe pattern, with a pattern ID derived from the inputs
+    pattern_id = _pattern_id(voorschot, gebruikt_or_totaal, is_overfilled, label_gebruikt, label_extra_or_terug,
+                             pot_width, height, show_limit_line, rounded_right)
+    svg_parts.append(_stripe_defs(pattern_id))
     
-    # Defs for stripe pattern
-    svg_parts.append(f'''    <defs>
+    svg_parts.extend(_bar_layers(used_width, show_marker, label_used, label_right, is_overfilled,
+                                 pot_width, height, rounded_right, pattern_id))
+    svg_parts.append('</svg>')
+    
+    return '\n'.join(svg_parts)
+
+
+def _svg_open(width: int, height: int) -> str:
+    return f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">'
+
+
+def _stripe_defs(pattern_id: str) -> str:
+    return f'''    <defs>
         <pattern id="{pattern_id}" patternUnits="userSpaceOnUse" width="8" height="8" patternTransform="rotate(45)">
             <rect width="4" height="8" fill="white" opacity="0.4"/>
         </pattern>
-    </defs>''')
+    </defs>'''
+
+
+def _bar_layers(used_width: int, show_marker: bool, label_used: str, label_right: str, is_overfilled: bool,
+                pot_width: int, height: int, rounded_right: bool, pattern_id: str) -> List[str]:
+    """Element lines of a pot bar (everything between the <svg> header / stripe defs and </svg>)"""
+    border_radius = height / 2
+    extension_width = EXTENSION_WIDTH
+    svg_parts = []
     
     # LAYER 1: Base bar - green background (represents full pot/return)
-    # Use path if rounded_right is False, otherwise rect
-    if not rounded_right:
-        path_d = generate_rounded_rect_path(0, 0, pot_width, height, border_radius, round_left=True, round_right=False)
-        svg_parts.append(f'    <path d="{path_d}" fill="#81C784" stroke="#E0E0E0" stroke-width="1"/>')
-    else:
-        svg_parts.append(f'    <rect x="0" y="0" width="{pot_width}" height="{height}" rx="{border_radius}" fill="#81C784" stroke="#E0E0E0" stroke-width="1"/>')
+    # Sharp right edge if rounded_right is False
+    svg_parts.append('    ' + _shape(pot_width, height, border_radius, 'pot', round_right=rounded_right))
     
     # LAYER 2: Yellow overlay (used portion)
-    if not rounded_right and used_width >= pot_width: # Only flatten if it reaches the end
-        path_d = generate_rounded_rect_path(0, 0, used_width, height, border_radius, round_left=True, round_right=False)
-        svg_parts.append(f'    <path d="{path_d}" fill="#FFE082"/>')
-    else:
-        svg_parts.append(f'    <rect x="0" y="0" width="{used_width}" height="{height}" rx="{border_radius}" fill="#FFE082"/>')
+    flatten = not rounded_right and used_width >= pot_width  # Only flatten if it reaches the end
+    svg_parts.append('    ' + _shape(used_width, height, border_radius, 'used', round_right=not flatten))
     
+    limit_line = f'    <line x1="{pot_width}" y1="-5" x2="{pot_width}" y2="{height + 5}" {STYLES["limit"]}/>'
     if is_overfilled:
         # LAYER 3: Overflow extension (red striped)
-        svg_parts.append(f'    <rect x="{pot_width}" y="0" width="{extension_width}" height="{height}" rx="{border_radius}" fill="#EF9A9A"/>')
+        svg_parts.append(f'    <rect x="{pot_width}" y="0" width="{extension_width}" height="{height}" rx="{border_radius}" {STYLES["over"]}/>')
         svg_parts.append(f'    <rect x="{pot_width}" y="0" width="{extension_width}" height="{height}" rx="{border_radius}" fill="url(#{pattern_id})"/>')
         
         # Pot boundary marker
         if show_marker:
-            svg_parts.append(f'    <line x1="{pot_width}" y1="-5" x2="{pot_width}" y2="{height + 5}" stroke="#D32F2F" stroke-width="2" stroke-dasharray="4,4" opacity="0.6"/>')
+            svg_parts.append(limit_line)
         
         # Labels
         if used_width > 40:
-            svg_parts.append(f'    <text x="{used_width/2}" y="{height/2 + 5}" text-anchor="middle" fill="#2C3E50" font-size="11" font-weight="600" font-family="Barlow, sans-serif">{label_used}</text>')
+            svg_parts.append(f'    <text x="{used_width/2}" y="{height/2 + 5}" {STYLES["label"]}>{label_used}</text>')
         if extension_width > 30:
-            svg_parts.append(f'    <text x="{pot_width + extension_width/2}" y="{height/2 + 5}" text-anchor="middle" fill="#C62828" font-size="11" font-weight="600" font-family="Barlow, sans-serif">{label_overflow_text}</text>')
+            svg_parts.append(f'    <text x="{pot_width + extension_width/2}" y="{height/2 + 5}" {STYLES["label-over"]}>{label_right}</text>')
     else:
         # Pot boundary marker (for split design where overflow is separate)
         if show_marker:
             # Draw line at the end of the pot (which is also the end of the bar in this case)
-            svg_parts.append(f'    <line x1="{pot_width}" y1="-5" x2="{pot_width}" y2="{height + 5}" stroke="#D32F2F" stroke-width="2" stroke-dasharray="4,4" opacity="0.6"/>')
+            svg_parts.append(limit_line)
 
         # Labels for underuse/perfect fit
         return_width = pot_width - used_width
         if used_width > 40:
-            svg_parts.append(f'    <text x="{used_width/2}" y="{height/2 + 5}" text-anchor="middle" fill="#2C3E50" font-size="11" font-weight="600" font-family="Barlow, sans-serif">{label_used}</text>')
+            svg_parts.append(f'    <text x="{used_width/2}" y="{height/2 + 5}" {STYLES["label"]}>{label_used}</text>')
         if return_width > 40:
-            svg_parts.append(f'    <text x="{used_width + return_width/2}" y="{height/2 + 5}" text-anchor="middle" fill="#2C3E50" font-size="11" font-weight="600" font-family="Barlow, sans-serif">{label_return}</text>')
-    
-    svg_parts.append('</svg>')
+            svg_parts.append(f'    <text x="{used_width + return_width/2}" y="{height/2 + 5}" {STYLES["label"]}>{label_right}</text>')
     
-    return '\n'.join(svg_parts)
+    return svg_parts
 
 
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
 def generate_start_bar_svg(
     amount: float,
     label: str = "",
@@ -193,13 +280,14 @@ def generate_start_bar_svg(
     border_radius = height / 2.0
 
     svg = f'''<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">
-    <rect x="0" y="0" width="{width}" height="{height}" rx="{border_radius}" fill="#A5D6A7" stroke="#E0E0E0" stroke-width="1"/>
-    <text x="{width/2}" y="{height/2 + 4}" text-anchor="middle" fill="#2C3E50" font-size="11" font-weight="600" font-family="Barlow, sans-serif">{label}</text>
+    {_shape(width, height, border_radius, 'start')}
+    <text x="{width/2}" y="{height/2 + 4}" {STYLES['label']}>{label}</text>
 </svg>'''
 
     return svg
 
 
+@lru_cache(maxsize=SVG_CACHE_SIZE, typed=True)
 def generate_overflow_indicator_svg(
     amount: float,
     width: int = 80,
@@ -223,18 +311,139 @@ def generate_overflow_indicator_svg(
 
     svg_parts = [f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">']
     
-    if not rounded_left:
-        path_d = generate_rounded_rect_path(0, 0, width, height, border_radius, round_left=False, round_right=True)
-        svg_parts.append(f'    <path d="{path_d}" fill="#EF9A9A"/>')
-    else:
-        svg_parts.append(f'    <rect x="0" y="0" width="{width}" height="{height}" rx="{border_radius}" fill="#EF9A9A"/>')
-        
-    svg_parts.append(f'    <text x="{width/2}" y="{height/2 + 4}" text-anchor="middle" fill="#C62828" font-size="10" font-weight="700" font-family="Barlow, sans-serif">€{amount:.0f}</text>')
+    svg_parts.append('    ' + _shape(width, height, border_radius, 'over', round_left=rounded_left))
+    svg_parts.append(f'    <text x="{width/2}" y="{height/2 + 4}" {STYLES["label-badge"]}>€{amount:.0f}</text>')
     svg_parts.append('</svg>')
 
     return '\n'.join(svg_parts)
 
 
+# ==================== GEOMETRY TABLE ====================
+
+# (width, height) of the bars and badges the templates draw, plus the 400x40 default bar
+GEOMETRY_SIZES = ((280, 30), (400, 40), (80, 30))
+
+
+def build_geometry_table(sizes: Tuple[Tuple[int, int], ...] = GEOMETRY_SIZES) -> Dict[Tuple, str]:
+    """
+    Shape elements for every whole-pixel width up to each standard size
+
+    Args:
+        sizes: (full width, height) pairs; the corner radius is height / 2
+
+    Returns:
+        Dictionary (width, height, round_left, round_right) -> interned element opening (see _shape_element)
+    """
+    table = {}
+    for size, h in sizes:
+        r = h / 2
+        for w in range(size + 1):
+            for ends in ((True, True), (True, False), (False, True)):
+                table[(w, h) + ends] = sys.intern(_shape_element(w, h, r, *ends))
+    return table
+
+
+GEOMETRY = build_geometry_table()
+
+
+# ==================== BATCH ====================
+
+def generate_section_bars(
+    voorschot: Sequence[float],
+    gebruikt: Sequence[float],
+    extra: Sequence[float],
+    terug: Optional[Sequence[Optional[float]]] = None,
+    pot_width: int = 280,
+    height: int = 30,
+    badge_width: int = 80
+) -> Dict[str, List[str]]:
+    """
+    Bars of N settlements at once: START bar, pot bar and overflow badge of one section each
+
+    The bars are the ones the onepager sections draw (see viewmodels.BATCH_BAR_INPUTS):
+    with extra > 0 the pot is shown full, with limit line and flat right end,
+    next to an overflow badge of extra; otherwise the used part is gebruikt
+    and the return part is labelled with terug. The markup is identical to
+    the single-bar generators; the work is shared across the batch:
+
+    - used widths of all settlements in one NumPy pass
+    - every distinct amount formatted to a label once
+    - every distinct bar layout (width, labels) drawn once; settlements with the
+      same layout only differ in their stripe pattern ID
+    - every distinct START bar and badge drawn once
+
+    Args:
+        voorschot: Prepaid amounts (pot), N values
+        gebruikt: Used amounts, N values
+        extra: Overflow amounts, N values (> 0 = overfilled)
+        terug: Return amounts for the return labels (None, or None entries: no return label)
+        pot_width: Bar width (the START bar has the same width)
+        height: Bar and badge height
+        badge_width: Overflow badge width
+
+    Returns:
+        Dictionary svg_start_bar / svg_bar / overflow_svg -> N markup strings ('' = no overflow)
+    """
+    n = len(voorschot)
+    if terug is None:
+        terug = [None] * n
+    over = (np.asarray(extra, dtype=float) > 0).tolist()
+
+    # Used widths as in bar_layout (the section bars never overfill themselves)
+    pot = np.asarray(voorschot, dtype=float)
+    shown = np.where(over, pot, np.asarray(gebruikt, dtype=float))
+    widths = shown / np.where(pot <= 0, 1.0, pot) * pot_width
+    widths = np.where((widths > 0) & (widths < 5), 5, widths)
+    used_widths = np.rint(widths).astype(int).tolist()
+
+    # Every distinct amount formatted once
+    amounts = {*voorschot, *gebruikt, *extra, *terug}
+    amounts.discard(None)
+    labels = {amount: f"€{amount:.0f}" for amount in amounts}
+    starts: Dict[str, str] = {}
+    badges: Dict[str, str] = {}
+    bodies: Dict[Tuple, str] = {}
+    svg_open = _svg_open(pot_width, height) + '\n'
+    defs_open, defs_close = _stripe_defs('\0').split('\0')
+    defs_open = svg_open + defs_open
+    defs_close += '\n'
+
+    start_bars, bars, overflows = [], [], []
+    for v, g, e, t, is_over, used_width in zip(voorschot, gebruikt, extra, terug, over, used_widths):
+        label_pot = labels[v]
+        start = starts.get(label_pot)
+        if start is None:
+            start = starts[label_pot] = generate_start_bar_svg(v, label_pot, pot_width, height)
+        start_bars.append(start)
+
+        # Pot bar: full with limit line when overfilled, otherwise usage and return
+        if is_over:
+            g = v
+        label_used = labels[g]
+        label_return = "" if t is None else labels[t]
+        label_right = label_return or f"€{(v if v > 0 else 1) - g:.0f}"  # bar_layout's default
+        key = (used_width, is_over, label_used, label_right)
+        body = bodies.get(key)
+        if body is None:
+            # is_overfilled is False, so the stripe pattern is never referenced
+            layers = _bar_layers(used_width, is_over, label_used, label_right, False,
+                                 pot_width, height, not is_over, '')
+            body = bodies[key] = '\n'.join(layers + ['</svg>'])
+        pattern_id = _pattern_id(v, g, False, label_used, label_return, pot_width, height, is_over, not is_over)
+        bars.append(defs_open + pattern_id + defs_close + body)
+
+        if is_over:
+            label_extra = labels[e]
+            badge = badges.get(label_extra)
+            if badge is None:
+                badge = badges[label_extra] = generate_overflow_indicator_svg(e, badge_width, height, False)
+            overflows.append(badge)
+        else:
+            overflows.append("")
+
+    return {'svg_start_bar': start_bars, 'svg_bar': bars, 'overflow_svg': overflows}
+
+
 def generate_caption(
     pot: float,
     used: float,
@@ -275,6 +484,35 @@ def generate_caption(
     return f"Verbruik: €{used:.2f} van €{pot:.2f} voorschot."
 
 
+def _batch_parity_check(n: int = 2000, seed: int = 7) -> int:
+    """
+    Compare generate_section_bars against the single-bar generators, called as the sections do
+
+    Returns:
+        Number of mismatching bars (0 = identical markup)
+    """
+    import random
+    rng = random.Random(seed)
+    voorschot = [rng.choice([0, 0.0, 250, 350.5, 800.0]) for _ in range(n)]
+    gebruikt = [rng.choice([0.0, rng.uniform(0, 1200), round(rng.uniform(0, 900), 2)]) for _ in range(n)]
+    extra = [max(0.0, g - v) for v, g in zip(voorschot, gebruikt)]
+    terug = [max(0.0, v - g) if rng.random() < 0.8 else None for v, g in zip(voorschot, gebruikt)]
+
+    mismatches = 0
+    bars = generate_section_bars(voorschot, gebruikt, extra, terug)
+    for i, (v, g, e, t) in enumerate(zip(voorschot, gebruikt, extra, terug)):
+        over = e > 0
+        expected = (
+            generate_start_bar_svg(v, f"€{v:.0f}", 280, 30),
+            generate_bar_svg(v, v if over else g, False, f"€{v if over else g:.0f}",
+                             "" if t is None else f"€{t:.0f}", 280, 30, over, not over),
+            generate_overflow_indicator_svg(e, 80, 30, False) if over else "",
+        )
+        actual = (bars['svg_start_bar'][i], bars['svg_bar'][i], bars['overflow_svg'][i])
+        mismatches += sum(a != b for a, b in zip(actual, expected))
+    return mismatches
+
+
 if __name__ == "__main__":
     print("=== All bars same width test ===")
     print("\n1. Underuse:")
@@ -283,3 +521,18 @@ if __name__ == "__main__":
     print(generate_bar_svg(350, 90, False, "€90", "€260", 400, 40))
     print("\n3. Overuse:")
     print(generate_bar_svg(250, 325, True, "€250", "+€75", 400, 40))
+
+    print("\n=== Deterministic and cached ===")
+    generate_bar_svg.cache_clear()
+    first = generate_bar_svg(250, 325, True, "€250", "+€75", 400, 40)
+    generate_bar_svg.cache_clear()
+    assert generate_bar_svg(250, 325, True, "€250", "+€75", 400, 40) == first
+    generate_bar_svg(250, 325, True, "€250", "+€75", 400, 40)
+    assert generate_bar_svg.cache_info().hits == 1
+    assert _pattern_id(250, 325) != _pattern_id(250, 326)
+    print(f"   ✓ {generate_bar_svg.cache_info()}")
+
+    print("\n=== Batch = single bars ===")
+    mismatches = _batch_parity_check()
+    print(f"   Mismatches: {mismatches}")
+    assert mismatches == 0, "generate_section_bars differs from the single-bar generators"
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Template Layout - Version fingerprint for the Excel input template
+
+The template builder stamps a layout version and checksum into the workbook's
+custom document properties. The reader checks that stamp and uses a
+precompiled accessor (named range -> sheet/cell) for known layouts instead of
+resolving every defined name at read time.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+
+# Custom document property names written by build_excel_template.py
+LAYOUT_VERSION_PROPERTY = "RR_Template_Layout"
+LAYOUT_CHECKSUM_PROPERTY = "RR_Template_Checksum"
+
+# Bump this whenever build_excel_template.py moves, adds or removes a named range
+CURRENT_LAYOUT_VERSION = "3"
+
+
+class TemplateLayoutError(ValueError):
+    """Raised when a workbook carries a layout stamp this reader does not know"""
+
+
+@dataclass
+class TemplateLayout:
+    """Cell positions of all named ranges and tables for one template version"""
+    version: str
+    cells: Dict[str, Tuple[str, str]]  # Named range -> (sheet, cell)
+    gwe_table_start: int               # First row scanned for GWE kostenregels
+    damage_table_start: int            # First row scanned for damage regels
+    renamed: Dict[str, str] = field(default_factory=dict)  # Legacy name -> current name
+    checksum: str = field(init=False)
+
+    def __post_init__(self):
+        self.checksum = layout_checksum(self.cells, self.gwe_table_start, self.damage_table_start)
+
+
+def layout_checksum(cells: Dict[str, Tuple[str, str]], gwe_table_start: int,
+                    damage_table_start: int) -> str:
+    """
+    Compute a stable checksum over a template layout
+
+    Args:
+        cells: Named range -> (sheet, cell) mapping
+        gwe_table_start: First GWE table row
+        damage_table_start: First damage table row
+
+    Returns:
+        16-character hex digest
+    """
+    lines = [f"{name}={sheet}!{cell}" for name, (sheet, cell) in sorted(cells.items())]
+    lines.append(f"GWE_table={gwe_table_start}")
+    lines.append(f"Schade_table={damage_table_start}")
+    return hashlib.sha256("\n".join(lines).encode('utf-8')).hexdigest()[:16]
+
+
+def cells_from_defined_names(wb) -> Dict[str, Tuple[str, str]]:
+    """
+    Extract the named range -> (sheet, cell) mapping from a workbook
+
+    Args:
+        wb: openpyxl Workbook
+
+    Returns:
+        Mapping with '$' signs stripped from the cell references
+    """
+    cells = {}
+    for name, defn in wb.defined_names.items():
+        destinations = list(defn.destinations)
+        if destinations:
+            sheet_name, cell_ref = destinations[0]
+            cells[name] = (sheet_name, cell_ref.replace('$', ''))
+    return cells
+
+
+# ==================== KNOWN LAYOUTS ====================
+
+LAYOUT_V3 = TemplateLayout(
+    version="3",
+    cells={
+        'Klantnaam': ('Algemeen', 'B4'),
+        'Contactpersoon': ('Algemeen', 'B5'),
+        'Email': ('Algemeen', 'B6'),
+        'Telefoonnummer': ('Algemeen', 'B7'),
+        'Object_adres': ('Algemeen', 'B10'),
+        'Unit_nr': ('Algemeen', 'B11'),
+        'Postcode': ('Algemeen', 'B12'),
+        'Plaats': ('Algemeen', 'B13'),
+        'Object_ID': ('Algemeen', 'B14'),
+        'Incheck_datum': ('Algemeen', 'B17'),
+        'Uitcheck_datum': ('Algemeen', 'B18'),
+        'Aantal_dagen': ('Algemeen', 'B19'),
+        'Voorschot_borg': ('Algemeen', 'B22'),
+        'Voorschot_GWE': ('Algemeen', 'B23'),
+        'Voorschot_schoonmaak': ('Algemeen', 'B24'),
+        'Overige_voorschotten': ('Algemeen', 'B25'),
+        'Schoonmaak_pakket': ('Algemeen', 'B28'),
+        'Inbegrepen_uren': ('Algemeen', 'B29'),
+        'Uurtarief_schoonmaak': ('Algemeen', 'B30'),
+        'Meterbeheerder': ('Algemeen', 'B31'),
+        'Energie_leverancier': ('Algemeen', 'B32'),
+        'Contractnummer': ('Algemeen', 'B33'),
+        'RR_Klantnummer': ('Algemeen', 'B36'),
+        'RR_Folder_link': ('Algemeen', 'B37'),
+        'RR_Projectleider': ('Algemeen', 'B38'),
+        'RR_Inspecteur': ('Algemeen', 'B39'),
+        'RR_Factuurnummer': ('Algemeen', 'B40'),
+        'Borg_gebruikt': ('Algemeen', 'B43'),
+        'Borg_terug': ('Algemeen', 'B44'),
+        'Restschade': ('Algemeen', 'B45'),
+        'GWE_meer_minder': ('Algemeen', 'B46'),
+        'Totaal_eindafrekening': ('Algemeen', 'B47'),
+        'KWh_begin': ('GWE_Detail', 'B4'),
+        'KWh_eind': ('GWE_Detail', 'B5'),
+        'KWh_verbruik': ('GWE_Detail', 'B6'),
+        'Gas_begin': ('GWE_Detail', 'B7'),
+        'Gas_eind': ('GWE_Detail', 'B8'),
+        'Gas_verbruik': ('GWE_Detail', 'B9'),
+        'GWE_totaal_excl': ('GWE_Detail', 'B36'),
+        'GWE_BTW': ('GWE_Detail', 'B37'),
+        'GWE_totaal_incl': ('GWE_Detail', 'B38'),
+        'Totaal_uren_gew': ('Schoonmaak', 'B6'),
+        'Extra_uren': ('Schoonmaak', 'B7'),
+        'Extra_schoonmaak_bedrag': ('Schoonmaak', 'B9'),
+        'Schade_totaal_excl': ('Schade', 'B58'),
+        'Schade_BTW': ('Schade', 'B59'),
+        'Schade_totaal_incl': ('Schade', 'B60'),
+    },
+    gwe_table_start=12,
+    damage_table_start=5
+)
+
+KNOWN_LAYOUTS: Dict[str, TemplateLayout] = {
+    LAYOUT_V3.version: LAYOUT_V3,
+}
+
+CURRENT_LAYOUT = KNOWN_LAYOUTS[CURRENT_LAYOUT_VERSION]
+
+
+# ==================== LEGACY LAYOUTS (unstamped, migration only) ====================
+
+# v1: compact GWE table without instruction row, '5_uur'/'7_uur' pakket values
+LAYOUT_V1 = TemplateLayout(
+    version="1",
+    cells={
+        **LAYOUT_V3.cells,
+        'GWE_totaal_excl': ('GWE_Detail', 'B25'),
+        'GWE_BTW': ('GWE_Detail', 'B26'),
+        'GWE_totaal_incl': ('GWE_Detail', 'B27'),
+    },
+    gwe_table_start=11,
+    damage_table_start=5
+)
+
+# v2: 'Schoonmaak_pakket_type' name, computed Voorschot_schoonmaak below the pakket
+LAYOUT_V2 = TemplateLayout(
+    version="2",
+    cells={
+        **{name: cell for name, cell in LAYOUT_V3.cells.items() if name != 'Schoonmaak_pakket'},
+        'Schoonmaak_pakket_type': ('Algemeen', 'B28'),
+        'Voorschot_schoonmaak': ('Algemeen', 'B29'),
+        'Inbegrepen_uren': ('Algemeen', 'B30'),
+        'Uurtarief_schoonmaak': ('Algemeen', 'B31'),
+        'Meterbeheerder': ('Algemeen', 'B32'),
+        'Energie_leverancier': ('Algemeen', 'B33'),
+        'Contractnummer': ('Algemeen', 'B34'),
+        'RR_Klantnummer': ('Algemeen', 'B37'),
+        'RR_Folder_link': ('Algemeen', 'B38'),
+        'RR_Projectleider': ('Algemeen', 'B39'),
+        'RR_Inspecteur': ('Algemeen', 'B40'),
+        'RR_Factuurnummer': ('Algemeen', 'B41'),
+        'Borg_gebruikt': ('Algemeen', 'B44'),
+        'Borg_terug': ('Algemeen', 'B45'),
+        'Restschade': ('Algemeen', 'B46'),
+        'GWE_meer_minder': ('Algemeen', 'B47'),
+        'Totaal_eindafrekening': ('Algemeen', 'B48'),
+    },
+    gwe_table_start=12,
+    damage_table_start=5,
+    renamed={'Schoonmaak_pakket_type': 'Schoonmaak_pakket'}
+)
+
+LEGACY_LAYOUTS: Dict[str, TemplateLayout] = {
+    LAYOUT_V1.version: LAYOUT_V1,
+    LAYOUT_V2.version: LAYOUT_V2,
+}
+
+# Unstamped workbooks are recognised by their exact named-range positions
+_LAYOUTS_BY_CELLS = {
+    frozenset(layout.cells.items()): layout
+    for layout in (*LEGACY_LAYOUTS.values(), *KNOWN_LAYOUTS.values())
+}
+
+
+def detect_layout(cells: Dict[str, Tuple[str, str]]) -> Optional[TemplateLayout]:
+    """
+    Identify the layout of an (unstamped) workbook from its named ranges
+
+    Args:
+        cells: Named range -> (sheet, cell) mapping, see cells_from_defined_names()
+
+    Returns:
+        Matching current or legacy TemplateLayout, or None if unrecognised
+    """
+    return _LAYOUTS_BY_CELLS.get(frozenset(cells.items()))
+
+
+# ==================== STAMP / DETECT ====================
+
+def stamp_layout(wb, layout: TemplateLayout = CURRENT_LAYOUT) -> None:
+    """
+    Write layout version and checksum into the workbook's custom properties
+
+    The checksum is computed from the workbook's actual defined names, so a
+    builder change that moves a named range without bumping the version fails
+    here instead of producing a workbook readers would misread.
+
+    Args:
+        wb: openpyxl Workbook (freshly built)
+        layout: Layout the workbook is expected to follow
+    """
+    from openpyxl.packaging.custom import StringProperty
+
+    actual = layout_checksum(cells_from_defined_names(wb), layout.gwe_table_start,
+                             layout.damage_table_start)
+    if actual != layout.checksum:
+        raise TemplateLayoutError(
+            f"Template layout does not match registered version {layout.version} "
+            f"(checksum {actual} != {layout.checksum}). "
+            f"Bump CURRENT_LAYOUT_VERSION in template_layout.py."
+        )
+
+    for prop_name in (LAYOUT_VERSION_PROPERTY, LAYOUT_CHECKSUM_PROPERTY):
+        if prop_name in wb.custom_doc_props.names:
+            del wb.custom_doc_props[prop_name]
+    wb.custom_doc_props.append(StringProperty(name=LAYOUT_VERSION_PROPERTY, value=layout.version))
+    wb.custom_doc_props.append(StringProperty(name=LAYOUT_CHECKSUM_PROPERTY, value=layout.checksum))
+
+
+def read_layout_stamp(wb) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read (version, checksum) from the custom document properties
+
+    Returns:
+        Tuple of (version, checksum); (None, None) for unstamped workbooks
+    """
+    props = wb.custom_doc_props
+    names = props.names
+    version = props[LAYOUT_VERSION_PROPERTY].value if LAYOUT_VERSION_PROPERTY in names else None
+    checksum = props[LAYOUT_CHECKSUM_PROPERTY].value if LAYOUT_CHECKSUM_PROPERTY in names else None
+    return version, checksum
+
+
+def resolve_layout(version: Optional[str], checksum: Optional[str]) -> Optional[TemplateLayout]:
+    """
+    Look up a known layout for a stamp
+
+    Args:
+        version: Stamped layout version (None if unstamped)
+        checksum: Stamped layout checksum
+
+    Returns:
+        TemplateLayout, or None for unstamped workbooks
+
+    Raises:
+        TemplateLayoutError: If the stamp names an unknown version or the
+            checksum does not match the registered layout
+    """
+    if version is None:
+        return None
+
+    layout = KNOWN_LAYOUTS.get(version)
+    if layout is None:
+        known = ', '.join(sorted(KNOWN_LAYOUTS))
+        raise TemplateLayoutError(
+            f"Unknown template layout version '{version}' (known: {known}). "
+            f"Update the generator or rebuild the workbook with build_excel_template.py."
+        )
+    if checksum != layout.checksum:
+        raise TemplateLayoutError(
+            f"Template layout checksum mismatch for version '{version}': "
+            f"workbook has '{checksum}', expected '{layout.checksum}'."
+        )
+    return layout
+
+
+class LayoutAccessor:
+    """Precompiled named-range accessor for a known template layout"""
+
+    def __init__(self, wb, layout: TemplateLayout):
+        """
+        Bind every named cell of the layout to its worksheet once
+
+        Args:
+            wb: Opened openpyxl Workbook
+            layout: Verified layout for this workbook
+        """
+        self.layout = layout
+        sheets = {sheet_name: wb[sheet_name] for sheet_name, _ in layout.cells.values()}
+        self._cells = {
+            name: (sheets[sheet_name], cell_ref)
+            for name, (sheet_name, cell_ref) in layout.cells.items()
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cells
+
+    def get(self, name: str) -> Any:
+        """Get cell value for a named range (KeyError if not in layout)"""
+        ws, cell_ref = self._cells[name]
+        return ws[cell_ref].value
+
+
+if __name__ == "__main__":
+    """Print the known layouts"""
+    print("📐 Known template layouts")
+    print("=" * 60)
+    for version, layout in {**LEGACY_LAYOUTS, **KNOWN_LAYOUTS}.items():
+        if version == CURRENT_LAYOUT_VERSION:
+            marker = " (current)"
+        elif version in LEGACY_LAYOUTS:
+            marker = " (legacy, migrate only)"
+        else:
+            marker = ""
+        print(f"   v{version}{marker}: {len(layout.cells)} named ranges, checksum {layout.checksum}")
@@ -7,9 +7,12 @@ Supports dual template architecture (onepager + detail).
 """
 
 from jinja2 import Environment, FileSystemLoader, Template
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
+import base64
 import os
 
+from money import format_euro
+
 
 class TemplateRenderer:
     """Renders HTML from viewmodels using Jinja2 templates"""
@@ -34,9 +37,9 @@ class TemplateRenderer:
         self.env.filters['percentage'] = self._filter_percentage
         self.env.filters['abs'] = abs
     
-    def _filter_euro(self, value: float) -> str:
-        """Format number as Euro currency"""
-        return f"€{value:,.2f}".replace(',', '.')
+    def _filter_euro(self, value: float, decimals: int = 2) -> str:
+        """Format number as Euro currency (rounded via integer cents)"""
+        return format_euro(value, decimals)
     
     def _filter_percentage(self, value: float, decimals: int = 1) -> str:
         """Format number as percentage"""
@@ -72,6 +75,30 @@ class TemplateRenderer:
         template = self.env.get_template(template_name)
         return template.render(**viewmodel)
     
+    def render_detail_segments(self, viewmodel: Dict[str, Any],
+                               template_name: str = "template_detail.html") -> Optional[Iterator[str]]:
+        """
+        Render a large Detail viewmodel as separate segments for PDF output
+        
+        Segments are rendered lazily, one per step of the returned generator,
+        so only the segment being laid out is held as HTML.
+        
+        Args:
+            viewmodel: Detail viewmodel dictionary
+            template_name: Template filename
+            
+        Returns:
+            Generator of the HTML per segment (see viewmodels.split_detail_viewmodel),
+            or None if the document fits in one segment
+        """
+        from viewmodels import split_detail_viewmodel
+        
+        segments = split_detail_viewmodel(viewmodel)
+        if len(segments) == 1:
+            return None
+        template = self.env.get_template(template_name)
+        return (template.render(**segment) for segment in segments)
+    
     def render_both(self, onepager_vm: Dict[str, Any], detail_vm: Dict[str, Any]) -> tuple[str, str]:
         """
         Render both OnePager and Detail templates
@@ -88,6 +115,23 @@ class TemplateRenderer:
         return onepager_html, detail_html
 
 
+def load_logo_b64(logo_path: str = os.path.join('assets', 'ryanrent_co.jpg')) -> Optional[str]:
+    """
+    Read the logo as a base64 data URI for the templates
+    
+    Args:
+        logo_path: JPEG logo file
+        
+    Returns:
+        Data URI string, or None if the file does not exist
+    """
+    if not os.path.exists(logo_path):
+        return None
+    with open(logo_path, "rb") as image_file:
+        encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+    return f"data:image/jpeg;base64,{encoded_string}"
+
+
 def save_html(html: str, filepath: str):
     """
     Save HTML string to file
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Tenancy Split - Divide shared-meter costs over overlapping tenancies
+
+Some units have back-to-back or overlapping tenants on one shared meter.
+A TenancyIndex keeps the tenancy periods of every Object_ID as sorted NumPy
+arrays (start, end and a running maximum of the end dates), so the tenancies
+overlapping a billing period are found with two binary searches instead of
+a scan over the whole history.
+
+split() divides the consumption and amount of a bill over the tenants by
+days of occupancy: every day of the bill is shared equally by the tenants
+present that day; days without a tenant are reported as leegstand.
+
+Tenancies CSV (or read from the workbooks: Object_ID, Klantnaam, Incheck/Uitcheck_datum):
+    object_id;huurder;incheck;uitcheck
+    OBJ-12;Jansen;2024-01-01;2024-03-15
+
+Costs CSV (hoeveelheid is optional):
+    object_id;omschrijving;begin;eind;hoeveelheid;bedrag
+    OBJ-12;Elektra verbruik;2024-01-01;2024-04-01;1250;362,50
+
+Periods are half-open: incheck up to (not including) the uitcheck day, like Aantal_dagen.
+"""
+
+import argparse
+import csv
+import io
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from money import to_cents, from_cents
+
+
+LEEGSTAND = 'leegstand'
+
+SPLIT_COLUMNS = ['object_id', 'omschrijving', 'begin', 'eind', 'huurder', 'dagen', 'hoeveelheid', 'bedrag']
+
+
+@dataclass
+class Tenancy:
+    """One tenant's occupancy of an object"""
+    object_id: str
+    huurder: str
+    incheck: date
+    uitcheck: date  # exclusive
+
+    @property
+    def dagen(self) -> int:
+        return (self.uitcheck - self.incheck).days
+
+
+@dataclass
+class Bill:
+    """Cost of a shared meter (or fixed cost) over a billing period"""
+    object_id: str
+    omschrijving: str
+    begin: date
+    eind: date  # exclusive
+    bedrag: float
+    hoeveelheid: Optional[float] = None
+
+
+@dataclass
+class Share:
+    """Part of a bill assigned to one tenancy (or to leegstand)"""
+    huurder: str
+    dagen: int
+    hoeveelheid: Optional[float]
+    bedrag: float
+
+
+def _as_date(value: Any) -> date:
+    """Date from a date, ISO / DD-MM-YYYY string or Excel serial number"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        return date(1899, 12, 30) + timedelta(days=int(value))
+    text = str(value).strip()[:10]
+    fmt = '%d-%m-%Y' if len(text) == 10 and text[2] == '-' else '%Y-%m-%d'
+    return datetime.strptime(text, fmt).date()
+
+
+def _day(value: date) -> int:
+    """Day number (days since 1970-01-01)"""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+# ==================== INDEX ====================
+
+class _ObjectIntervals:
+    """Tenancies of one object, sorted by start"""
+
+    def __init__(self, tenancies: List[Tenancy]):
+        tenancies = sorted(tenancies, key=lambda t: (t.incheck, t.uitcheck))
+        self.tenancies = tenancies
+        self.starts = np.array([_day(t.incheck) for t in tenancies], dtype=np.int64)
+        self.ends = np.array([_day(t.uitcheck) for t in tenancies], dtype=np.int64)
+        # Running maximum of the end dates: monotonic, so it can be binary searched
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def overlapping(self, start: int, end: int) -> np.ndarray:
+        """Positions of tenancies with incheck < end and uitcheck > start"""
+        hi = int(np.searchsorted(self.starts, end, side='left'))
+        lo = int(np.searchsorted(self.max_ends[:hi], start, side='right'))
+        candidates = np.arange(lo, hi)
+        return candidates[self.ends[lo:hi] > start]
+
+
+class TenancyIndex:
+    """Interval index of tenancy periods per Object_ID"""
+
+    def __init__(self, tenancies: Iterable[Tenancy]):
+        by_object: Dict[str, List[Tenancy]] = {}
+        for tenancy in tenancies:
+            if tenancy.uitcheck <= tenancy.incheck:
+                raise ValueError(f"Huurperiode '{tenancy.huurder}' ({tenancy.object_id}): "
+                                 f"uitcheck ligt niet na incheck")
+            by_object.setdefault(tenancy.object_id, []).append(tenancy)
+        self._objects = {object_id: _ObjectIntervals(items) for object_id, items in by_object.items()}
+
+    def __len__(self) -> int:
+        return sum(len(o.tenancies) for o in self._objects.values())
+
+    @property
+    def object_ids(self) -> List[str]:
+        return list(self._objects)
+
+    def overlapping(self, object_id: str, begin: date, eind: date) -> List[Tenancy]:
+        """Tenancies of an object that overlap [begin, eind)"""
+        intervals = self._objects.get(object_id)
+        if intervals is None:
+            return []
+        return [intervals.tenancies[i] for i in intervals.overlapping(_day(begin), _day(eind))]
+
+    def split(self, bill: Bill) -> List[Share]:
+        """
+        Divide a bill over the tenancies by days of occupancy
+
+        Each day carries 1/days of the bill; that day's part is shared equally
+        by the tenants present. Amounts are divided in whole cents (largest
+        remainder), so the shares add up exactly to the bill.
+
+        Returns:
+            One Share per overlapping tenancy (in incheck order), plus a
+            LEEGSTAND share if some days had no tenant
+        """
+        start, end = _day(bill.begin), _day(bill.eind)
+        days = end - start
+        if days <= 0:
+            raise ValueError(f"Kosten '{bill.omschrijving}' ({bill.object_id}): eind ligt niet na begin")
+
+        intervals = self._objects.get(bill.object_id)
+        if intervals is not None:
+            positions = intervals.overlapping(start, end)
+            starts = np.clip(intervals.starts[positions], start, end) - start
+            ends = np.clip(intervals.ends[positions], start, end) - start
+            names = [intervals.tenancies[i].huurder for i in positions]
+        else:
+            starts = ends = np.array([], dtype=np.int64)
+            names = []
+
+        # Occupants per day (difference array), then each tenant's weight as a prefix-sum range
+        occupancy = np.zeros(days + 1, dtype=np.int64)
+        np.add.at(occupancy, starts, 1)
+        np.add.at(occupancy, ends, -1)
+        occupancy = np.cumsum(occupancy[:-1])
+        per_occupant = np.divide(1.0, occupancy, out=np.zeros(days), where=occupancy > 0)
+        prefix = np.concatenate(([0.0], np.cumsum(per_occupant)))
+        weights = np.append(prefix[ends] - prefix[starts], np.count_nonzero(occupancy == 0)) / days
+
+        dagen = list((ends - starts).astype(int)) + [int(np.count_nonzero(occupancy == 0))]
+        cents = _allocate_cents(to_cents(bill.bedrag), weights)
+
+        shares = []
+        for k, (weight, n_days, amount) in enumerate(zip(weights, dagen, cents)):
+            is_leegstand = k == len(names)
+            if is_leegstand and n_days == 0:
+                continue
+            shares.append(Share(
+                huurder=LEEGSTAND if is_leegstand else names[k],
+                dagen=n_days,
+                hoeveelheid=None if bill.hoeveelheid is None else round(bill.hoeveelheid * weight, 3),
+                bedrag=from_cents(int(amount)),
+            ))
+        return shares
+
+
+def _allocate_cents(total: int, weights: np.ndarray) -> np.ndarray:
+    """Divide whole cents proportionally; leftover cents go to the largest remainders"""
+    exact = total * weights
+    cents = np.floor(exact).astype(np.int64)
+    leftover = total - int(cents.sum())
+    if leftover:
+        order = np.argsort(-(exact - cents), kind='stable')
+        cents[order[:leftover]] += 1
+    return cents
+
+
+# ==================== INPUT ====================
+
+def _read_rows(path: str) -> List[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        text = f.read()
+    dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    return [{k.strip().lower(): (v or '').strip() for k, v in row.items() if k} for row in reader]
+
+
+def _number(text: str) -> float:
+    return float(text.replace('€', '').replace('.', '').replace(',', '.')) if ',' in text else float(text)
+
+
+def read_tenancies_csv(path: str) -> List[Tenancy]:
+    """Read tenancies (object_id, huurder, incheck, uitcheck)"""
+    return [Tenancy(row['object_id'], row['huurder'], _as_date(row['incheck']), _as_date(row['uitcheck']))
+            for row in _read_rows(path) if row.get('object_id')]
+
+
+def read_bills_csv(path: str) -> List[Bill]:
+    """Read shared costs (object_id, omschrijving, begin, eind, [hoeveelheid], bedrag)"""
+    bills = []
+    for row in _read_rows(path):
+        if not row.get('object_id'):
+            continue
+        hoeveelheid = row.get('hoeveelheid')
+        bills.append(Bill(
+            object_id=row['object_id'],
+            omschrijving=row.get('omschrijving', ''),
+            begin=_as_date(row['begin']),
+            eind=_as_date(row['eind']),
+            bedrag=_number(row['bedrag']),
+            hoeveelheid=_number(hoeveelheid) if hoeveelheid else None,
+        ))
+    return bills
+
+
+def tenancies_from_workbooks(paths: List[str]) -> Tuple[List[Tenancy], List[Tuple[str, str]]]:
+    """
+    Tenancies from eindafrekening workbooks (Object_ID, Klantnaam, Incheck/Uitcheck_datum)
+
+    Returns:
+        Tuple (tenancies, list of (path, reason) for skipped workbooks)
+    """
+    from reconcile import load_portfolio
+
+    portfolio, skipped = load_portfolio(paths)
+    tenancies = []
+    columns = zip(portfolio.files, *(portfolio.raw_column(name) for name in
+                                     ('Object_ID', 'Klantnaam', 'Incheck_datum', 'Uitcheck_datum')))
+    for path, object_id, klant, checkin, checkout in columns:
+        if object_id in (None, '') or not checkin or not checkout:
+            skipped.append((path, 'geen Object_ID of huurperiode'))
+            continue
+        tenancies.append(Tenancy(str(object_id), str(klant or os.path.basename(path)),
+                                 _as_date(checkin), _as_date(checkout)))
+    return tenancies, skipped
+
+
+# ==================== CLI ====================
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Verdeel kosten van gedeelde meters over (overlappende) huurperiodes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python tenancy_split.py kosten.csv --huurperiodes huurperiodes.csv
+  python tenancy_split.py kosten.csv --workbooks Archive/ --output verdeling.csv
+        """
+    )
+    parser.add_argument('kosten', help='CSV met kosten per object (object_id;omschrijving;begin;eind;hoeveelheid;bedrag)')
+    parser.add_argument('--huurperiodes', help='CSV met huurperiodes (object_id;huurder;incheck;uitcheck)')
+    parser.add_argument('--workbooks', nargs='+', help='Lees huurperiodes uit eindafrekening workbooks')
+    parser.add_argument('--output', default='verdeling.csv', help='CSV met verdeling (default: verdeling.csv)')
+    args = parser.parse_args()
+
+    if not args.huurperiodes and not args.workbooks:
+        parser.error('geef --huurperiodes of --workbooks op')
+
+    start = time.perf_counter()
+    tenancies = []
+    if args.huurperiodes:
+        tenancies += read_tenancies_csv(args.huurperiodes)
+    if args.workbooks:
+        from migrate import collect_inputs
+        found, skipped = tenancies_from_workbooks(collect_inputs(args.workbooks))
+        tenancies += found
+        for path, reason in skipped:
+            print(f"   ⚠️  {path}: {reason}")
+
+    index = TenancyIndex(tenancies)
+    bills = read_bills_csv(args.kosten)
+
+    rows = []
+    leegstand = 0.0
+    for bill in bills:
+        for share in index.split(bill):
+            if share.huurder == LEEGSTAND:
+                leegstand += share.bedrag
+            rows.append({
+                'object_id': bill.object_id, 'omschrijving': bill.omschrijving,
+                'begin': bill.begin.isoformat(), 'eind': bill.eind.isoformat(),
+                'huurder': share.huurder, 'dagen': share.dagen,
+                'hoeveelheid': '' if share.hoeveelheid is None else share.hoeveelheid,
+                'bedrag': share.bedrag,
+            })
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SPLIT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n🏢 {len(index)} huurperiodes in {len(index.object_ids)} object(en)")
+    print(f"   ✓ {len(bills)} kostenregels verdeeld ({elapsed:.2f}s)")
+    if leegstand:
+        print(f"   ℹ️  Leegstand (niet doorbelast): €{leegstand:.2f}")
+    print(f"📍 Verdeling: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
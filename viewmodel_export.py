@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Viewmodel Export - Stream the viewmodels of many settlements as JSON lines
+
+save_viewmodels_to_json() writes two indented files per settlement. For a
+whole archive that is too slow and too large, so this export writes one
+compact line per settlement ({"bron", "onepager", "detail",
+"waarschuwingen"}) to a single JSON-lines file, gzip-compressed when the
+path ends in .gz.
+
+Workbooks are read, recalculated and encoded in parallel worker processes;
+the parent only writes the encoded lines through a large buffer. Paths are
+submitted in windows of a few batches per worker, so memory stays flat no
+matter how many settlements the archive holds. orjson is used when it is
+installed, otherwise the standard json module.
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from viewmodels import _json_default, build_viewmodels_from_data, resolve_visuals
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+BUFFER_SIZE = 1 << 20   # Bytes buffered before a write to disk / the gzip stream
+GZIP_LEVEL = 6          # zlib default: most of the size reduction at a fraction of level 9's cost
+WINDOW_PER_WORKER = 64  # Paths in flight per worker process
+
+
+def _orjson_default(value: Any) -> Any:
+    """orjson fallback: same as the json one, plus NumPy scalars (orjson does not take float subclasses)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return _json_default(value)
+
+
+def get_encoder(backend: str = 'auto') -> Callable[[Dict[str, Any]], bytes]:
+    """
+    Compact record encoder (one line of UTF-8, no trailing newline)
+
+    Args:
+        backend: 'json', 'orjson' or 'auto' (orjson when installed)
+
+    Returns:
+        Function record -> bytes
+
+    Raises:
+        ValueError: If orjson is requested but not installed
+    """
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson':
+        if orjson is None:
+            raise ValueError("orjson is niet geïnstalleerd (pip install orjson) - gebruik --backend json")
+        return lambda record: orjson.dumps(record, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    if backend == 'json':
+        encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_json_default)
+        return lambda record: encoder.encode(record).encode('utf-8')
+    raise ValueError(f"Onbekende backend '{backend}' (json, orjson of auto)")
+
+
+class JsonLinesWriter:
+    """Buffered JSON-lines file, gzip-compressed when the path ends in .gz"""
+
+    def __init__(self, path: str, backend: str = 'auto'):
+        self.path = path
+        self.encode = get_encoder(backend)
+        self.count = 0
+        if path.endswith('.gz'):
+            raw = gzip.GzipFile(path, 'wb', compresslevel=GZIP_LEVEL)
+            self._file = io.BufferedWriter(raw, buffer_size=BUFFER_SIZE)
+        else:
+            self._file = open(path, 'wb', buffering=BUFFER_SIZE)
+
+    def write(self, record: Dict[str, Any]):
+        """Encode and write one record"""
+        self.write_line(self.encode(record))
+
+    def write_line(self, line: bytes):
+        """Write one already encoded record (see get_encoder)"""
+        self._file.write(line)
+        self._file.write(b'\n')
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over the records of a (gzipped) JSON-lines export"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ==================== SETTLEMENT RECORDS ====================
+
+def settlement_viewmodels(path: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+    """
+    Read, validate and recalculate one workbook and build its viewmodels
+
+    Same steps as generate.py (without logo, interval data and tariff schedule).
+    Reader warnings are captured instead of printed.
+
+    Args:
+        path: Excel workbook
+
+    Returns:
+        Tuple of (onepager_viewmodel, detail_viewmodel, warnings)
+    """
+    from calculator import recalculate_all, validate_excel_calculations
+    from excel_reader import ExcelReader
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        with ExcelReader(path) as reader:
+            data = reader.read_all()
+            data['gwe_voorschot'] = reader.get_float('Voorschot_GWE', default=0.0)
+        warnings = validate_excel_calculations(data)
+        data = recalculate_all(data)
+        onepager_vm, detail_vm = build_viewmodels_from_data(data)
+
+    reader_warnings = [line.strip() for line in output.getvalue().splitlines() if line.strip()]
+    return onepager_vm, detail_vm, reader_warnings + warnings
+
+
+def settlement_record(path: str, include_visuals: bool = False) -> Dict[str, Any]:
+    """
+    Export record of one workbook
+
+    Args:
+        path: Excel workbook
+        include_visuals: Also build the SVG bars and captions (numbers only by default)
+
+    Returns:
+        Dictionary with bron, onepager, detail and waarschuwingen
+    """
+    onepager_vm, detail_vm, warnings = settlement_viewmodels(path)
+    onepager_vm.pop('logo_b64', None)
+    if include_visuals:
+        resolve_visuals(onepager_vm)
+    return {'bron': path, 'onepager': onepager_vm, 'detail': detail_vm, 'waarschuwingen': warnings}
+
+
+def _export_one(path: str, include_visuals: bool, backend: str) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """Worker: encoded record of one workbook (errors are returned, not raised)"""
+    try:
+        return path, get_encoder(backend)(settlement_record(path, include_visuals)), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def _windows(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def export_jsonl(paths: List[str], output_path: str, workers: Optional[int] = None,
+                 backend: str = 'auto', include_visuals: bool = False) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Export the viewmodels of many workbooks to one JSON-lines file
+
+    Lines are written in input order.
+
+    Args:
+        paths: Excel workbooks
+        output_path: Destination .jsonl (or .jsonl.gz)
+        workers: Number of worker processes (default: CPU count)
+        backend: Encoder backend (see get_encoder)
+        include_visuals: Also export the SVG bars and captions
+
+    Returns:
+        Tuple (records written, list of (path, error) for failed workbooks)
+    """
+    get_encoder(backend)  # fail before starting the pool
+    workers = workers or os.cpu_count() or 1
+    window = workers * WINDOW_PER_WORKER
+    chunksize = max(1, min(WINDOW_PER_WORKER // 4, len(paths) // (workers * 4)))
+
+    failed = []
+    with JsonLinesWriter(output_path, backend) as writer, ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in _windows(paths, window):
+            n = len(batch)
+            for path, line, error in pool.map(_export_one, batch, [include_visuals] * n, [backend] * n,
+                                              chunksize=chunksize):
+                if line is None:
+                    failed.append((path, error))
+                else:
+                    writer.write_line(line)
+        return writer.count, failed
+
+
+# ==================== CLI ====================
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Exporteer de viewmodels van veel afrekeningen als JSON lines (één regel per afrekening)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python viewmodel_export.py Archive/                              # → afrekeningen.jsonl
+  python viewmodel_export.py Archive/ --output afrekeningen.jsonl.gz
+  python viewmodel_export.py archief_2024/ --workers 8 --backend json
+  python viewmodel_export.py Archive/ --svg                        # Inclusief SVG bars en captions
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Excel bestanden of mappen')
+    parser.add_argument('--output', default='afrekeningen.jsonl',
+                        help='JSON-lines bestand, .gz = gecomprimeerd (default: afrekeningen.jsonl)')
+    parser.add_argument('--backend', choices=['auto', 'json', 'orjson'], default='auto',
+                        help='JSON encoder (default: auto = orjson indien geïnstalleerd)')
+    parser.add_argument('--svg', action='store_true',
+                        help='Exporteer ook de SVG bars en captions van de onepager')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Aantal parallelle processen (default: aantal CPU cores)')
+    args = parser.parse_args()
+
+    from migrate import collect_inputs
+    files = collect_inputs(args.inputs)
+    print(f"\n📤 Viewmodels exporteren van {len(files)} workbook(s)")
+
+    start = time.perf_counter()
+    try:
+        written, failed = export_jsonl(files, args.output, workers=args.workers,
+                                       backend=args.backend, include_visuals=args.svg)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for path, error in failed:
+        print(f"   ⚠️  {path}: {error}")
+    size = os.path.getsize(args.output)
+    print(f"   ✓ {written} afrekening(en) in {elapsed:.2f}s ({size / 1024:.0f} KiB)")
+    print(f"\n{'⚠️ ' if failed else '✅'} {len(failed)} workbook(s) overgeslagen")
+    print(f"📍 Export: {os.path.abspath(args.output)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
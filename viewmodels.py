@@ -9,15 +9,19 @@ Transforms raw entity data into the specific JSON structures needed for:
 Output matches onepager.json and detail.json schemas.
 """
 
-from typing import Dict, Any, List
+from collections.abc import Mapping
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
 from datetime import date, datetime
 from entities import (
     Client, Object, Period, Deposit, GWEMeterReading, GWERegel,
     GWETotalen, Cleaning, DamageRegel, DamageTotalen, Settlement,
-    GWEMeterstanden
+    GWEMeterstanden, GWERegels, DamageRegels, RegelTabel
 )
 from calculator import Calculator
-from svg_bars import generate_bar_svg, generate_start_bar_svg, generate_caption, generate_overflow_indicator_svg
+from money import to_cents, from_cents
+from svg_bars import generate_caption, generate_section_bars
+from bar_backends import DEFAULT_BACKEND, BarBackend, get_backend
 
 
 def date_to_str(d: date) -> str:
@@ -25,16 +29,86 @@ def date_to_str(d: date) -> str:
     return d.strftime('%d-%m-%Y') if d else ""
 
 
-def build_onepager_viewmodel(data: Dict[str, Any], settlement: Settlement) -> Dict[str, Any]:
+def _meterstanden_dict(meters: GWEMeterstanden) -> Dict[str, Dict[str, Any]]:
+    """Meter readings keyed by meter type, in registry order"""
+    return {
+        meter_type.key: {
+            "label": meter_type.label,
+            "eenheid": meter_type.eenheid,
+            "begin": reading.begin,
+            "eind": reading.eind,
+            "verbruik": reading.verbruik
+        }
+        for meter_type, reading in meters.items()
+    }
+
+
+class SectionView(Mapping):
     """
-    Build OnePager view model for simplified one-page template
+    Read-through view on a section of the settlement viewmodel
+
+    Exposes `keys` of the shared base section (all keys if None) without
+    copying them, plus values of its own: fields set on the view (bar
+    percentages) and lazy members. A member is built on first access and then
+    stored; Jinja's financial.gwe.svg_bar ends up in __getitem__, so a
+    template pays for exactly the members it shows and numbers-only
+    consumers never build an SVG. A member builder that returns None does not
+    apply (e.g. no overflow bar) and the key stays missing.
+    """
+
+    def __init__(self, base: Mapping, keys: Optional[Sequence[str]] = None,
+                 members: Optional[Dict[str, Callable[[Mapping], Optional[str]]]] = None):
+        self.base = base
+        self.fields = tuple(base) if keys is None else tuple(keys)
+        self.members = dict(members or {})
+        self.own: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.own:
+            return self.own[key]
+        if key in self.fields:
+            return self.base[key]
+        build = self.members.get(key)
+        value = build(self) if build else None
+        if value is None:
+            raise KeyError(key)
+        self.own[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.own[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.fields
+        yield from (key for key in self.own if key not in self.fields)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def resolve(self) -> 'SectionView':
+        """Build all members that are not built yet"""
+        for key in self.members:
+            self.get(key)
+        return self
+
+    def __repr__(self) -> str:
+        return f"SectionView({dict(self)!r})"
+
+
+def build_settlement_viewmodel(data: Dict[str, Any], settlement: Settlement) -> Dict[str, Any]:
+    """
+    Build the canonical settlement viewmodel that both documents read from
+    
+    Every section is built once; build_onepager_viewmodel and
+    build_detail_viewmodel select their fields through SectionView, so the
+    two documents show the same values by construction.
     
     Args:
-        data: Raw entity data from excel_reader
+        data: Raw entity data from excel_reader (with calculations applied)
         settlement: Calculated settlement entity
         
     Returns:
-        Dictionary matching onepager.json schema
+        Dictionary with client, object, period, borg, gwe, cleaning, damage and totals sections
     """
     client: Client = data['client']
     obj: Object = data['object']
@@ -43,7 +117,7 @@ def build_onepager_viewmodel(data: Dict[str, Any], settlement: Settlement) -> Di
     gwe_meterstanden: GWEMeterstanden = data['gwe_meterstanden']
     cleaning: Cleaning = data['cleaning']
     damage_totalen: DamageTotalen = data['damage_totalen']
-    damage_regels: List[DamageRegel] = data.get('damage_regels', [])
+    btw_procent = data.get('btw_procent', Calculator.BTW_PROCENT)
     
     # Get voorschotten from various sources
     gwe_voorschot = data.get('gwe_voorschot', 0.0)  # Should be passed in
@@ -56,14 +130,22 @@ def build_onepager_viewmodel(data: Dict[str, Any], settlement: Settlement) -> Di
     
     # Calculate cleaning derived values
     clean_is_overfilled = cleaning.extra_bedrag > 0
-    clean_terug = 0 if clean_is_overfilled else (cleaning.voorschot - cleaning.extra_bedrag)
+    clean_terug = 0 if clean_is_overfilled else from_cents(to_cents(cleaning.voorschot) - to_cents(cleaning.extra_bedrag))
+    
+    # Build full object address for detail view
+    object_address = obj.address
+    if obj.unit:
+        object_address += f", {obj.unit}"
+    if obj.postal_code and obj.city:
+        object_address += f", {obj.postal_code} {obj.city}"
     
     return {
         "client": {
             "name": client.name,
             "contact_person": client.contact_person,
             "email": client.email,
-            "phone": client.phone or ""
+            "phone": client.phone or "",
+            "object_address": object_address
         },
         "object": {
             "address": obj.address,
@@ -77,204 +159,238 @@ def build_onepager_viewmodel(data: Dict[str, Any], settlement: Settlement) -> Di
             "checkout_date": date_to_str(period.checkout_date),
             "days": period.days
         },
-        "financial": {
-            "borg": {
-                "voorschot": settlement.borg.voorschot,
-                "gebruikt": settlement.borg.gebruikt,
-                "terug": settlement.borg.terug,
-                "restschade": settlement.borg.restschade
-            },
-            "gwe": {
-                "voorschot": gwe_voorschot,
-                "totaal_incl": gwe_totalen.totaal_incl,
-                "meer_minder": gwe_meer_minder,
-                "is_overfilled": gwe_is_overfilled,
-                "extra": gwe_extra,
-                "extra": gwe_extra,
-                "terug": gwe_terug,
-                "meterstanden": {
-                    "stroom": {
-                        "begin": gwe_meterstanden.stroom.begin,
-                        "eind": gwe_meterstanden.stroom.eind,
-                        "verbruik": gwe_meterstanden.stroom.verbruik
-                    },
-                    "gas": {
-                        "begin": gwe_meterstanden.gas.begin,
-                        "eind": gwe_meterstanden.gas.eind,
-                        "verbruik": gwe_meterstanden.gas.verbruik
-                    }
-                }
-            },
-            "cleaning": {
-                "pakket_type": cleaning.pakket_type,
-                "pakket_naam": cleaning.pakket_naam,
-                "inbegrepen_uren": cleaning.inbegrepen_uren,
-                "totaal_uren": cleaning.totaal_uren,
-                "voorschot": cleaning.voorschot,
-                "extra_uren": cleaning.extra_uren,
-                "extra_bedrag": cleaning.extra_bedrag,
-                "is_overfilled": clean_is_overfilled,
-                "terug": clean_terug
-            },
-            "damage": {
-                "totaal_incl": damage_totalen.totaal_incl
-            },
-            "totals": {
-                "totaal_eindafrekening": settlement.totaal_eindafrekening,
-                "totaal_eindafrekening_is_positive": settlement.totaal_eindafrekening >= 0
-            }
-        },
-        "damage_details": [
-            {"omschrijving": regel.beschrijving, "bedrag": regel.bedrag_excl}
-            for regel in damage_regels
-        ],
-        "generated_date": datetime.now().strftime('%d-%m-%Y %H:%M'),
-        "logo_b64": data.get('logo_b64', None)
-    }
-
-
-def build_detail_viewmodel(data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Build Detail view model for comprehensive detail template
-    
-    Args:
-        data: Raw entity data from excel_reader
-        
-    Returns:
-        Dictionary matching detail.json schema
-    """
-    client: Client = data['client']
-    obj: Object = data['object']
-    period: Period = data['period']
-    gwe_meterstanden: GWEMeterstanden = data['gwe_meterstanden']
-    gwe_regels: List[GWERegel] = data['gwe_regels']
-    gwe_totalen: GWETotalen = data['gwe_totalen']
-    cleaning: Cleaning = data['cleaning']
-    damage_regels: List[DamageRegel] = data['damage_regels']
-    damage_totalen: DamageTotalen = data['damage_totalen']
-    deposit: Deposit = data['deposit']
-    
-    # Build full object address for detail view
-    object_address = obj.address
-    if obj.unit:
-        object_address += f", {obj.unit}"
-    if obj.postal_code and obj.city:
-        object_address += f", {obj.postal_code} {obj.city}"
-    
-    return {
-        "client": {
-            "name": client.name,
-            "object_address": object_address,
-            "period": {
-                "checkin_date": date_to_str(period.checkin_date),
-                "checkout_date": date_to_str(period.checkout_date)
-            }
+        "borg": {
+            "voorschot": settlement.borg.voorschot,
+            "gebruikt": settlement.borg.gebruikt,
+            "terug": settlement.borg.terug,
+            "restschade": settlement.borg.restschade
         },
         "gwe": {
-            "meterstanden": {
-                "stroom": {
-                    "begin": gwe_meterstanden.stroom.begin,
-                    "eind": gwe_meterstanden.stroom.eind,
-                    "verbruik": gwe_meterstanden.stroom.verbruik
-                },
-                "gas": {
-                    "begin": gwe_meterstanden.gas.begin,
-                    "eind": gwe_meterstanden.gas.eind,
-                    "verbruik": gwe_meterstanden.gas.verbruik
-                }
-            },
-            "kostenregels": [
-                {
-                    "omschrijving": regel.omschrijving,
-                    "verbruik_of_dagen": regel.verbruik_of_dagen,
-                    "tarief_excl": regel.tarief_excl,
-                    "kosten_excl": regel.kosten_excl
-                }
-                for regel in gwe_regels
-            ],
+            "voorschot": gwe_voorschot,
+            "totaal_incl": gwe_totalen.totaal_incl,
+            "meer_minder": gwe_meer_minder,
+            "is_overfilled": gwe_is_overfilled,
+            "extra": gwe_extra,
+            "terug": gwe_terug,
+            "meterstanden": _meterstanden_dict(gwe_meterstanden),
+            "kostenregels": GWERegels.as_table(data['gwe_regels']),  # iterated row by row, serialised by to_dicts()
             "totalen": {
                 "totaal_excl": gwe_totalen.totaal_excl,
                 "btw": gwe_totalen.btw,
+                "btw_procent": btw_procent,
                 "totaal_incl": gwe_totalen.totaal_incl
             }
         },
         "cleaning": {
             "pakket_type": cleaning.pakket_type,
-            "pakket_naam": "Basis Schoonmaak" if cleaning.pakket_type == "5_uur" else "Intensief Schoonmaak",
+            "pakket_naam": cleaning.pakket_naam,
             "inbegrepen_uren": cleaning.inbegrepen_uren,
             "totaal_uren": cleaning.totaal_uren,
             "extra_uren": cleaning.extra_uren,
             "uurtarief": cleaning.uurtarief,
             "extra_bedrag": cleaning.extra_bedrag,
-            "voorschot": cleaning.voorschot
+            "voorschot": cleaning.voorschot,
+            "is_overfilled": clean_is_overfilled,
+            "terug": clean_terug
         },
         "damage": {
-            "regels": [
-                {
-                    "beschrijving": regel.beschrijving,
-                    "aantal": regel.aantal,
-                    "tarief_excl": regel.tarief_excl,
-                    "bedrag_excl": regel.bedrag_excl
-                }
-                for regel in damage_regels
-            ],
+            "regels": DamageRegels.as_table(data.get('damage_regels', ())),
+            "totaal_incl": damage_totalen.totaal_incl,
             "totalen": {
                 "totaal_excl": damage_totalen.totaal_excl,
                 "btw": damage_totalen.btw,
+                "btw_procent": btw_procent,
                 "totaal_incl": damage_totalen.totaal_incl
             }
         },
-        "borg": {
-            "voorschot": deposit.voorschot,
-            "gebruikt": deposit.gebruikt,
-            "terug": deposit.terug,
-            "restschade": deposit.restschade
+        "totals": {
+            "totaal_eindafrekening": settlement.totaal_eindafrekening,
+            "totaal_eindafrekening_is_positive": settlement.totaal_eindafrekening >= 0
         }
     }
 
 
-def add_bar_chart_data(onepager_vm: Dict[str, Any]) -> Dict[str, Any]:
+def _calculate_settlement(data: Dict[str, Any]) -> Settlement:
+    return Calculator.calculate_settlement(
+        borg=data['deposit'],
+        gwe_voorschot=data.get('gwe_voorschot', 0.0),
+        gwe_totalen=data['gwe_totalen'],
+        cleaning=data['cleaning'],
+        damage_totalen=data['damage_totalen']
+    )
+
+
+# Fields each document shows per section
+ONEPAGER_FIELDS = {
+    'client': ('name', 'contact_person', 'email', 'phone'),
+    'gwe': ('voorschot', 'totaal_incl', 'meer_minder', 'is_overfilled', 'extra', 'terug', 'meterstanden'),
+    'cleaning': ('pakket_type', 'pakket_naam', 'inbegrepen_uren', 'totaal_uren', 'voorschot',
+                 'extra_uren', 'extra_bedrag', 'is_overfilled', 'terug'),
+    'damage': ('totaal_incl',),
+}
+DETAIL_FIELDS = {
+    'period': ('checkin_date', 'checkout_date'),
+    'gwe': ('meterstanden', 'kostenregels', 'totalen'),
+    'cleaning': ('pakket_type', 'pakket_naam', 'inbegrepen_uren', 'totaal_uren', 'extra_uren',
+                 'uurtarief', 'extra_bedrag', 'voorschot'),
+    'damage': ('regels', 'totalen'),
+}
+
+
+def build_onepager_viewmodel(data: Dict[str, Any], settlement: Settlement,
+                             base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Add bar chart percentage data and SVG markup for visual rendering
+    Build OnePager view model for simplified one-page template
     
-    Adds calculated percentages and SVG bars for:
-    - Borg bars (used/return)
-    - GWE bars (used/extra)
-    - Cleaning bars
+    Args:
+        data: Raw entity data from excel_reader
+        settlement: Calculated settlement entity
+        base: Settlement viewmodel to read from (default: built from data)
+        
+    Returns:
+        Dictionary matching onepager.json schema
+    """
+    base = base or build_settlement_viewmodel(data, settlement)
+    
+    return {
+        "client": SectionView(base['client'], ONEPAGER_FIELDS['client']),
+        "object": base['object'],
+        "period": base['period'],
+        "financial": {
+            "borg": SectionView(base['borg']),
+            "gwe": SectionView(base['gwe'], ONEPAGER_FIELDS['gwe']),
+            "cleaning": SectionView(base['cleaning'], ONEPAGER_FIELDS['cleaning']),
+            "damage": SectionView(base['damage'], ONEPAGER_FIELDS['damage']),
+            "totals": base['totals']
+        },
+        "damage_details": [
+            {"omschrijving": regel.beschrijving, "bedrag": regel.bedrag_excl}
+            for regel in base['damage']['regels']
+        ],
+        "generated_date": datetime.now().strftime('%d-%m-%Y %H:%M'),
+        "logo_b64": data.get('logo_b64', None)
+    }
+
+
+def build_detail_viewmodel(data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build Detail view model for comprehensive detail template
     
     Args:
-        onepager_vm: OnePager viewmodel dictionary
+        data: Raw entity data from excel_reader
+        base: Settlement viewmodel to read from (default: built from data)
         
     Returns:
-        Enhanced viewmodel with bar chart data and SVG markup
+        Dictionary matching detail.json schema
     """
-    financial = onepager_vm['financial']
+    base = base or build_settlement_viewmodel(data, _calculate_settlement(data))
     
-    # BORG - Bar percentages and SVG
-    borg = financial['borg']
-    borg_bars = Calculator.calculate_bar_percentages(
-        gebruikt=borg['gebruikt'],
-        voorschot=borg['voorschot']
-    )
-    financial['borg']['bars'] = borg_bars
-    financial['borg']['is_overfilled'] = False  # Borg never overfills (restschade handled separately)
+    return {
+        "client": {
+            "name": base['client']['name'],
+            "object_address": base['client']['object_address'],
+            "period": SectionView(base['period'], DETAIL_FIELDS['period'])
+        },
+        "gwe": SectionView(base['gwe'], DETAIL_FIELDS['gwe'], members=DETAIL_PAGES['gwe']),
+        "cleaning": SectionView(base['cleaning'], DETAIL_FIELDS['cleaning']),
+        "damage": SectionView(base['damage'], DETAIL_FIELDS['damage'], members=DETAIL_PAGES['damage']),
+        "borg": base['borg']
+    }
+
+
+# ==================== DETAIL PAGINATION ====================
+
+ROWS_PER_PAGE = 40    # Line items per chunk of a detail table
+SEGMENT_ROWS = 400    # Detail documents with more line items are rendered (and laid out) in segments
+
+# Section -> (line items key, pages key)
+PAGED_TABLES = {
+    'gwe': ('kostenregels', 'kostenregels_paginas'),
+    'damage': ('regels', 'regels_paginas'),
+}
+
+def paginate(regels: Sequence, rows_per_page: int = ROWS_PER_PAGE) -> list:
+    """Line items (RegelTabel or list) as consecutive slices of at most rows_per_page rows"""
+    return [regels[start:start + rows_per_page] for start in range(0, len(regels), rows_per_page)]
+
+
+# Section -> lazy pages member of the detail viewmodel
+DETAIL_PAGES = {
+    section: {pages_key: (lambda view, key=regels_key: paginate(view[key]))}
+    for section, (regels_key, pages_key) in PAGED_TABLES.items()
+}
 
-    # Generate START bar SVG (solid prepaid amount)
-    borg_start_svg = generate_start_bar_svg(
-        amount=borg['voorschot'],
-        label=f"€{borg['voorschot']:.0f}",
+
+def attach_pages(detail_vm: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the lazy line-item pages to a detail viewmodel loaded from JSON (see snapshot_store.py)"""
+    for section, members in DETAIL_PAGES.items():
+        detail_vm[section] = SectionView(detail_vm[section], members=members)
+    return detail_vm
+
+
+def split_detail_viewmodel(detail_vm: Dict[str, Any], segment_rows: int = SEGMENT_ROWS) -> List[Dict[str, Any]]:
+    """
+    Split a detail viewmodel with many line items into segments
+    
+    Each segment is a detail viewmodel with a run of GWE and damage pages
+    (together at most segment_rows rows, whole pages) and a `segment` dict
+    telling the template which fixed blocks it carries: kop (header and
+    meterstanden), midden (GWE totals, cleaning, damage title) and slot
+    (damage totals, borg, footer). Rendered one after another they form
+    the complete document, so each segment can be laid out on its own and
+    the PDFs concatenated (see pdf_generator.html_segments_to_pdf).
+    
+    Args:
+        detail_vm: Detail viewmodel
+        segment_rows: Maximum number of line items per segment
+        
+    Returns:
+        List of segment viewmodels ([detail_vm] itself if it fits in one segment)
+    """
+    pages = [(section, page) for section, (_, pages_key) in PAGED_TABLES.items()
+             for page in detail_vm[section][pages_key]]
+    if sum(len(page) for _, page in pages) <= segment_rows:
+        return [detail_vm]
+    
+    # Whole pages per segment
+    groups, current, rows = [], [], 0
+    for section, page in pages:
+        if current and rows + len(page) > segment_rows:
+            groups.append(current)
+            current, rows = [], 0
+        current.append((section, page))
+        rows += len(page)
+    groups.append(current)
+    
+    last_gwe = max((i for i, group in enumerate(groups) for section, _ in group if section == 'gwe'), default=0)
+    segments = []
+    for i, group in enumerate(groups):
+        segment = dict(detail_vm)
+        for section, (_, pages_key) in PAGED_TABLES.items():
+            view = SectionView(detail_vm[section])
+            view[pages_key] = [page for page_section, page in group if page_section == section]
+            segment[section] = view
+        segment['segment'] = {'kop': i == 0, 'midden': i == last_gwe, 'slot': i == len(groups) - 1}
+        segments.append(segment)
+    return segments
+
+
+def _start_bar_svg(section: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    """START bar SVG (solid prepaid amount), same for every section"""
+    return backend.start_bar(
+        amount=section['voorschot'],
+        label=f"€{section['voorschot']:.0f}",
         width=280,
         height=30
     )
-    financial['borg']['svg_start_bar'] = borg_start_svg
 
-    # Generate Borg bar SVG (matches GWE style)
-    # Usage bar is always 280px, showing only the capped usage (no overflow extension)
+
+# ---- Borg ----
+
+def _borg_bar_svg(borg: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    # Usage bar - always 280px, showing only the capped usage (no overflow extension)
     # Overflow is a separate SVG in the extra-section
-    is_overfilled = borg['restschade'] > 0
-    
-    # Usage bar - always 280px, never shows overflow extension
-    borg_svg = generate_bar_svg(
+    return backend.bar(
         voorschot=borg['voorschot'],
         gebruikt_or_totaal=min(borg['voorschot'], borg['gebruikt']),
         is_overfilled=False,  # Always False so the bar stays 280px
@@ -282,127 +398,140 @@ def add_bar_chart_data(onepager_vm: Dict[str, Any]) -> Dict[str, Any]:
         label_extra_or_terug=f"€{borg['terug']:.0f}",
         pot_width=280,
         height=30,
-        show_limit_line=is_overfilled,  # Show red dashed line if overfilled
-        rounded_right=not is_overfilled  # Sharp right edge if overfilled, to match overflow bar
+        show_limit_line=borg['is_overfilled'],  # Show red dashed line if overfilled
+        rounded_right=not borg['is_overfilled']  # Sharp right edge if overfilled, to match overflow bar
     )
-    financial['borg']['svg_bar'] = borg_svg
-    financial['borg']['is_overfilled'] = is_overfilled
 
-    # Generate separate overflow SVG if needed (goes in extra-section)
-    if is_overfilled:
-        overflow_svg = generate_overflow_indicator_svg(
-            amount=borg['restschade'],
-            height=30,
-            rounded_left=False  # Sharp left edge to match GWE style
-        )
-        financial['borg']['overflow_svg'] = overflow_svg
 
-    # Generate human-readable caption
-    # Format matches GWE but with "Extra schade" instead of "Extra te betalen"
-    if is_overfilled:
-        borg_caption = f"Voorschot: €{borg['voorschot']:.0f} · Verbruik: €{borg['gebruikt']:.0f} · Extra schade: €{borg['restschade']:.0f}"
-    else:
-        borg_caption = f"Voorschot: €{borg['voorschot']:.0f} · Verbruik: €{borg['gebruikt']:.0f} · Terug: €{borg['terug']:.0f}"
-    
-    financial['borg']['caption'] = borg_caption
-    
-    # GWE - Bar percentages and SVG
-    gwe = financial['gwe']
-    gwe_gebruikt = gwe['totaal_incl']
-    gwe_bars = Calculator.calculate_bar_percentages(
-        gebruikt=gwe_gebruikt,
-        voorschot=gwe['voorschot']
+def _borg_overflow_svg(borg: Dict[str, Any], backend: BarBackend = get_backend()) -> Optional[str]:
+    if not borg['is_overfilled']:
+        return None
+    return backend.overflow(
+        amount=borg['restschade'],
+        height=30,
+        rounded_left=False  # Sharp left edge to match GWE style
     )
-    financial['gwe']['bars'] = gwe_bars
 
-    # Generate START bar SVG
-    gwe_start_svg = generate_start_bar_svg(
-        amount=gwe['voorschot'],
-        label=f"€{gwe['voorschot']:.0f}",
-        width=280,
-        height=30
+
+def _borg_caption(borg: Dict[str, Any]) -> str:
+    # Format matches GWE but with "Extra schade" instead of "Extra te betalen"
+    if borg['is_overfilled']:
+        return f"Voorschot: €{borg['voorschot']:.0f} · Verbruik: €{borg['gebruikt']:.0f} · Extra schade: €{borg['restschade']:.0f}"
+    return f"Voorschot: €{borg['voorschot']:.0f} · Verbruik: €{borg['gebruikt']:.0f} · Terug: €{borg['terug']:.0f}"
+
+
+BORG_VISUALS = {
+    'svg_start_bar': _start_bar_svg,
+    'svg_bar': _borg_bar_svg,
+    'overflow_svg': _borg_overflow_svg,
+    'caption': _borg_caption,
+}
+
+
+# Members that are SVG markup (the others are captions)
+SVG_MEMBERS = ('svg_start_bar', 'svg_bar', 'overflow_svg')
+
+
+def _visual_members(visuals: Dict[str, Callable], backend: BarBackend) -> Dict[str, Callable]:
+    """Member builders of a section, with the bars drawn by the given backend (see bar_backends.py)"""
+    if backend.name == DEFAULT_BACKEND:
+        return visuals
+    return {key: partial(build, backend=backend) if key in SVG_MEMBERS else build for key, build in visuals.items()}
+
+
+def _add_borg_bars(financial: Dict[str, Any], backend: BarBackend = get_backend()):
+    """Add bar percentages for the borg section; SVG bars and caption are built lazily"""
+    borg = financial['borg']
+    borg['bars'] = Calculator.calculate_bar_percentages(
+        gebruikt=borg['gebruikt'],
+        voorschot=borg['voorschot']
     )
-    financial['gwe']['svg_start_bar'] = gwe_start_svg
+    borg['is_overfilled'] = borg['restschade'] > 0
+    borg.members.update(_visual_members(BORG_VISUALS, backend))
+
+
+# ---- GWE ----
 
-    # Generate VERBLIJF bar SVG (always matches START width)
+def _gwe_bar_svg(gwe: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    # VERBLIJF bar (always matches START width)
     if gwe['is_overfilled']:
         # Overuse scenario - bar fills pot, overflow shows separately
-        gwe_svg = generate_bar_svg(
+        return backend.bar(
             voorschot=gwe['voorschot'],
             gebruikt_or_totaal=gwe['voorschot'],  # Show full bar
             is_overfilled=False,  # Bar itself doesn't overflow
             label_gebruikt=f"€{gwe['voorschot']:.0f}",
-            label_extra_or_terug="",
+            label_extra_or_terug=f"€{gwe['terug']:.0f}",  # €0, not drawn (no return part)
             pot_width=280,
             height=30,
             show_limit_line=True,
             rounded_right=False
         )
-        # Generate overflow indicator
-        gwe_overflow_svg = generate_overflow_indicator_svg(
-            amount=gwe['extra'],
-            width=80,
-            height=30,
-            rounded_left=False
-        )
-        financial['gwe']['overflow_svg'] = gwe_overflow_svg
-    else:
-        # Underuse scenario
-        gwe_svg = generate_bar_svg(
-            voorschot=gwe['voorschot'],
-            gebruikt_or_totaal=gwe['totaal_incl'],
-            is_overfilled=False,
-            label_gebruikt=f"€{gwe['totaal_incl']:.0f}",
-            label_extra_or_terug=f"€{gwe['terug']:.0f}",
-            pot_width=280,
-            height=30
-        )
-        financial['gwe']['overflow_svg'] = ""  # No overflow
-    financial['gwe']['svg_bar'] = gwe_svg
+    # Underuse scenario
+    return backend.bar(
+        voorschot=gwe['voorschot'],
+        gebruikt_or_totaal=gwe['totaal_incl'],
+        is_overfilled=False,
+        label_gebruikt=f"€{gwe['totaal_incl']:.0f}",
+        label_extra_or_terug=f"€{gwe['terug']:.0f}",
+        pot_width=280,
+        height=30
+    )
+
+
+def _gwe_overflow_svg(gwe: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    if not gwe['is_overfilled']:
+        return ""  # No overflow
+    return backend.overflow(
+        amount=gwe['extra'],
+        width=80,
+        height=30,
+        rounded_left=False
+    )
+
 
-    # Generate human-readable caption
+def _gwe_caption(gwe: Dict[str, Any]) -> str:
     if gwe['is_overfilled']:
-        gwe_caption = generate_caption(
+        return generate_caption(
             pot=gwe['voorschot'],
             used=gwe['totaal_incl'],
             refund=0,
             overflow=gwe['extra']
         )
-    else:
-        gwe_caption = generate_caption(
-            pot=gwe['voorschot'],
-            used=gwe['totaal_incl'],
-            refund=gwe['terug'],
-            overflow=0
-        )
-    financial['gwe']['caption'] = gwe_caption
-    
-    # CLEANING - Bar percentages and SVG
-    # NOTE: Cleaning packages are ALWAYS fully used (never refunded)
-    # The bar always shows the full package amount (yellow)
-    # Extra hours appear as overflow indicator
-    cleaning = financial['cleaning']
+    return generate_caption(
+        pot=gwe['voorschot'],
+        used=gwe['totaal_incl'],
+        refund=gwe['terug'],
+        overflow=0
+    )
 
-    # Cleaning is always 100% used (the package is consumed)
-    financial['cleaning']['bars'] = {
-        'gebruikt_pct': 100.0,
-        'terug_pct': 0.0,
-        'extra_pct': 0.0 if (cleaning['extra_bedrag'] == 0 or cleaning['voorschot'] == 0) else (cleaning['extra_bedrag'] / cleaning['voorschot']) * 100,
-        'is_overfilled': cleaning['extra_bedrag'] > 0
-    }
 
-    # Generate START bar SVG
-    cleaning_start_svg = generate_start_bar_svg(
-        amount=cleaning['voorschot'],
-        label=f"€{cleaning['voorschot']:.0f}",
-        width=280,
-        height=30
+GWE_VISUALS = {
+    'svg_start_bar': _start_bar_svg,
+    'svg_bar': _gwe_bar_svg,
+    'overflow_svg': _gwe_overflow_svg,
+    'caption': _gwe_caption,
+}
+
+
+def _add_gwe_bars(financial: Dict[str, Any], backend: BarBackend = get_backend()):
+    """Add bar percentages for the GWE section; SVG bars and caption are built lazily"""
+    gwe = financial['gwe']
+    gwe['bars'] = Calculator.calculate_bar_percentages(
+        gebruikt=gwe['totaal_incl'],
+        voorschot=gwe['voorschot']
     )
-    financial['cleaning']['svg_start_bar'] = cleaning_start_svg
+    gwe.members.update(_visual_members(GWE_VISUALS, backend))
 
-    # Generate VERBLIJF bar SVG - ALWAYS shows full package as used (yellow)
-    # Cleaning package is always consumed, never returned
-    cleaning_svg = generate_bar_svg(
+
+# ---- Cleaning ----
+# NOTE: Cleaning packages are ALWAYS fully used (never refunded)
+# The bar always shows the full package amount (yellow)
+# Extra hours appear as overflow indicator
+
+def _cleaning_bar_svg(cleaning: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    # VERBLIJF bar - ALWAYS shows full package as used (yellow)
+    return backend.bar(
         voorschot=cleaning['voorschot'],
         gebruikt_or_totaal=cleaning['voorschot'],  # Always full package
         is_overfilled=False,  # Bar itself doesn't overflow (shows full yellow)
@@ -413,30 +542,157 @@ def add_bar_chart_data(onepager_vm: Dict[str, Any]) -> Dict[str, Any]:
         show_limit_line=True if cleaning['extra_bedrag'] > 0 else False,
         rounded_right=False if cleaning['extra_bedrag'] > 0 else True
     )
-    financial['cleaning']['svg_bar'] = cleaning_svg
 
-    # Generate overflow indicator if extra hours were needed
+
+def _cleaning_overflow_svg(cleaning: Dict[str, Any], backend: BarBackend = get_backend()) -> str:
+    # Overflow indicator if extra hours were needed
+    if cleaning['extra_bedrag'] <= 0:
+        return ""  # No overflow
+    return backend.overflow(
+        amount=cleaning['extra_bedrag'],
+        width=80,
+        height=30,
+        rounded_left=False
+    )
+
+
+def _cleaning_caption(cleaning: Dict[str, Any]) -> str:
     if cleaning['extra_bedrag'] > 0:
-        cleaning_overflow_svg = generate_overflow_indicator_svg(
-            amount=cleaning['extra_bedrag'],
-            width=80,
-            height=30,
-            rounded_left=False
-        )
-        financial['cleaning']['overflow_svg'] = cleaning_overflow_svg
-        # Caption showing extra hours cost
-        cleaning_caption = f"Pakket: €{cleaning['voorschot']:.0f} · Extra uren: €{cleaning['extra_bedrag']:.0f}"
-    else:
-        financial['cleaning']['overflow_svg'] = ""  # No overflow
-        # Caption showing package was sufficient
-        cleaning_caption = f"Pakket: €{cleaning['voorschot']:.0f} · Geen extra uren"
+        return f"Pakket: €{cleaning['voorschot']:.0f} · Extra uren: €{cleaning['extra_bedrag']:.0f}"
+    return f"Pakket: €{cleaning['voorschot']:.0f} · Geen extra uren"
 
-    financial['cleaning']['caption'] = cleaning_caption
+
+CLEANING_VISUALS = {
+    'svg_start_bar': _start_bar_svg,
+    'svg_bar': _cleaning_bar_svg,
+    'overflow_svg': _cleaning_overflow_svg,
+    'caption': _cleaning_caption,
+}
+
+
+def _add_cleaning_bars(financial: Dict[str, Any], backend: BarBackend = get_backend()):
+    """Add bar percentages for the cleaning section; SVG bars and caption are built lazily"""
+    cleaning = financial['cleaning']
+
+    # Cleaning is always 100% used (the package is consumed)
+    cleaning['bars'] = {
+        'gebruikt_pct': 100.0,
+        'terug_pct': 0.0,
+        'extra_pct': 0.0 if (cleaning['extra_bedrag'] == 0 or cleaning['voorschot'] == 0) else (cleaning['extra_bedrag'] / cleaning['voorschot']) * 100,
+        'is_overfilled': cleaning['extra_bedrag'] > 0
+    }
+    cleaning.members.update(_visual_members(CLEANING_VISUALS, backend))
+
+
+# Section name -> lazy SVG members
+BAR_VISUALS = {
+    'borg': BORG_VISUALS,
+    'gwe': GWE_VISUALS,
+    'cleaning': CLEANING_VISUALS,
+}
+
+# Section name (see recalc_graph.SECTIONS) -> bar builder
+BAR_SECTIONS = {
+    'borg': _add_borg_bars,
+    'gwe': _add_gwe_bars,
+    'cleaning': _add_cleaning_bars,
+}
+
+
+def _set_bar_backend(onepager_vm: Dict[str, Any], backend: BarBackend):
+    """Record a non-default bar backend and its per-document markup in the viewmodel (stored with snapshots)"""
+    if backend.name != DEFAULT_BACKEND:
+        onepager_vm['bar_backend'] = backend.name
+    defs = backend.document_defs()
+    if defs:
+        onepager_vm['bar_defs'] = defs
+
+
+def add_bar_chart_data(onepager_vm: Dict[str, Any], backend: Any = DEFAULT_BACKEND) -> Dict[str, Any]:
+    """
+    Add bar chart percentage data and (lazy) SVG markup for visual rendering
+    
+    Adds calculated percentages and SVG bars for:
+    - Borg bars (used/return)
+    - GWE bars (used/extra)
+    - Cleaning bars
+    
+    SVGs and captions are lazy SectionView members: they are generated
+    when a template (or resolve_visuals) first reads them.
+    
+    Args:
+        onepager_vm: OnePager viewmodel dictionary
+        backend: Bar backend name or instance (see bar_backends.py); a non-default
+            backend is recorded as bar_backend, its document markup as bar_defs
+        
+    Returns:
+        Enhanced viewmodel with bar chart data and SVG markup
+    """
+    backend = get_backend(backend)
+    financial = onepager_vm['financial']
+    for add_bars in BAR_SECTIONS.values():
+        add_bars(financial, backend)
+    _set_bar_backend(onepager_vm, backend)
+    
+    return onepager_vm
+
+
+def attach_visuals(onepager_vm: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach the lazy SVG bars and captions to a onepager viewmodel loaded from JSON
     
+    The stored sections still hold their bar percentages; only the members
+    that add_bar_chart_data() would have set are added (see snapshot_store.py).
+    The stored backend name and document markup are refreshed as well.
+    """
+    financial = onepager_vm['financial']
+    backend = get_backend(onepager_vm.pop('bar_backend', None))
+    onepager_vm.pop('bar_defs', None)
+    _set_bar_backend(onepager_vm, backend)
+    for section, members in BAR_VISUALS.items():
+        financial[section] = SectionView(financial[section], members=_visual_members(members, backend))
     return onepager_vm
 
 
-def build_viewmodels_from_data(data: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, Any]]:
+def resolve_visuals(onepager_vm: Dict[str, Any]) -> Dict[str, Any]:
+    """Build all lazy SVG bars and captions of a onepager viewmodel (e.g. before JSON export)"""
+    for section in onepager_vm['financial'].values():
+        if isinstance(section, SectionView):
+            section.resolve()
+    return onepager_vm
+
+
+# Section name -> (voorschot, gebruikt, extra, terug) of its bars, for generate_section_bars
+BATCH_BAR_INPUTS = {
+    'borg': lambda borg: (borg['voorschot'], min(borg['voorschot'], borg['gebruikt']), borg['restschade'], borg['terug']),
+    'gwe': lambda gwe: (gwe['voorschot'], gwe['totaal_incl'], gwe['extra'], gwe['terug']),
+    'cleaning': lambda cleaning: (cleaning['voorschot'], cleaning['voorschot'], cleaning['extra_bedrag'], None),
+}
+
+
+def resolve_visuals_batch(onepager_vms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Build the SVG bars of many onepager viewmodels at once (see svg_bars.generate_section_bars)
+
+    Gives the same markup as the lazy members, with the geometry and label
+    formatting shared across the batch. Captions stay lazy; viewmodels drawn
+    by a non-SVG backend (css, raster) are left to their lazy members.
+    """
+    vms = [vm for vm in onepager_vms if vm.get('bar_backend', DEFAULT_BACKEND) == 'svg']
+    if not vms:
+        return onepager_vms
+    for section, inputs in BATCH_BAR_INPUTS.items():
+        views = [vm['financial'][section] for vm in vms]
+        voorschot, gebruikt, extra, terug = zip(*(inputs(view) for view in views))
+        bars = generate_section_bars(voorschot, gebruikt, extra, terug)
+        for key, markups in bars.items():
+            for view, markup in zip(views, markups):
+                if markup:  # no overflow: the member itself decides between "" and missing
+                    view[key] = markup
+    return onepager_vms
+
+
+def build_viewmodels_from_data(data: Dict[str, Any], backend: Any = DEFAULT_BACKEND) -> tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Build both OnePager and Detail viewmodels from raw entity data
     
@@ -444,41 +700,87 @@ def build_viewmodels_from_data(data: Dict[str, Any]) -> tuple[Dict[str, Any], Di
     
     Args:
         data: Raw entity data from excel_reader (with calculations applied)
+        backend: Bar backend name or instance (see bar_backends.py)
         
     Returns:
         Tuple of (onepager_viewmodel, detail_viewmodel)
     """
-    # Need to get gwe_voorschot from somewhere - let's look for it in data
-    # or calculate it from named range if available
-    gwe_voorschot = data.get('gwe_voorschot', 0.0)
+    # Calculate settlement (gwe_voorschot is passed in data)
+    settlement = _calculate_settlement(data)
     
-    # Calculate settlement
-    calc = Calculator()
-    settlement = calc.calculate_settlement(
-        borg=data['deposit'],
-        gwe_voorschot=gwe_voorschot,
-        gwe_totalen=data['gwe_totalen'],
-        cleaning=data['cleaning'],
-        damage_totalen=data['damage_totalen']
-    )
+    # One settlement viewmodel, read by both documents
+    base = build_settlement_viewmodel(data, settlement)
     
     # Build OnePager viewmodel
-    onepager_vm = build_onepager_viewmodel(data, settlement)
+    onepager_vm = build_onepager_viewmodel(data, settlement, base)
     
     # Add bar chart data for visual rendering
-    onepager_vm = add_bar_chart_data(onepager_vm)
+    onepager_vm = add_bar_chart_data(onepager_vm, backend)
     
     # Build Detail viewmodel
-    detail_vm = build_detail_viewmodel(data)
-    
+    detail_vm = build_detail_viewmodel(data, base)
+
+    return onepager_vm, detail_vm
+
+
+# Sections shown in the detail template (it has no net total)
+DETAIL_SECTIONS = {'borg', 'gwe', 'cleaning', 'damage'}
+
+
+def refresh_viewmodels(data: Dict[str, Any], settlement: Settlement,
+                       previous: tuple[Dict[str, Any], Dict[str, Any]],
+                       changed_sections: set) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Update viewmodels after an incremental recalculation (see recalc_graph.py)
+
+    Bar SVGs are only regenerated for changed sections; the detail viewmodel
+    is returned unchanged (same object) when none of its sections changed, so
+    the caller can skip re-rendering it.
+
+    Args:
+        data: Entity data with calculations applied (SettlementGraph.apply_to)
+        settlement: Calculated settlement (graph['settlement'])
+        previous: Tuple of (onepager_viewmodel, detail_viewmodel) to update
+        changed_sections: Section names from SettlementGraph.changed_sections()
+
+    Returns:
+        Tuple of (onepager_viewmodel, detail_viewmodel)
+    """
+    previous_onepager, previous_detail = previous
+    if not changed_sections:
+        return previous_onepager, previous_detail
+
+    base = build_settlement_viewmodel(data, settlement)
+    onepager_vm = build_onepager_viewmodel(data, settlement, base)
+    backend = get_backend(previous_onepager.get('bar_backend'))
+    _set_bar_backend(onepager_vm, backend)
+    financial = onepager_vm['financial']
+    for section, add_bars in BAR_SECTIONS.items():
+        if section in changed_sections:
+            add_bars(financial, backend)
+        else:
+            financial[section] = previous_onepager['financial'][section]
+
+    detail_vm = build_detail_viewmodel(data, base) if changed_sections & DETAIL_SECTIONS else previous_detail
+
     return onepager_vm, detail_vm
 
 
 # ==================== JSON SERIALIZATION ====================
 
+def _json_default(value: Any) -> Any:
+    """json.dump fallback for line-item tables and section views"""
+    if isinstance(value, RegelTabel):
+        return value.to_dicts()
+    if isinstance(value, SectionView):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 def save_viewmodels_to_json(onepager_vm: Dict[str, Any], detail_vm: Dict[str, Any],
                             onepager_path: str = "output/onepager.json",
-                            detail_path: str = "output/detail.json"):
+                            detail_path: str = "output/detail.json",
+                            include_visuals: bool = True):
     """
     Save viewmodels to JSON files
     
@@ -487,6 +789,7 @@ def save_viewmodels_to_json(onepager_vm: Dict[str, Any], detail_vm: Dict[str, An
         detail_vm: Detail viewmodel
         onepager_path: Output path for onepager JSON
         detail_path: Output path for detail JSON
+        include_visuals: Also write SVG bars and captions (False: numbers only, no SVG is generated)
     """
     import json
     import os
@@ -495,13 +798,16 @@ def save_viewmodels_to_json(onepager_vm: Dict[str, Any], detail_vm: Dict[str, An
     os.makedirs(os.path.dirname(onepager_path), exist_ok=True)
     os.makedirs(os.path.dirname(detail_path), exist_ok=True)
     
+    if include_visuals:
+        resolve_visuals(onepager_vm)
+    
     # Save onepager
     with open(onepager_path, 'w', encoding='utf-8') as f:
-        json.dump(onepager_vm, f, indent=2, ensure_ascii=False)
+        json.dump(onepager_vm, f, indent=2, ensure_ascii=False, default=_json_default)
     
-    # Save detail
+    # Save detail (line-item tables as lists of objects, as in detail.json)
     with open(detail_path, 'w', encoding='utf-8') as f:
-        json.dump(detail_vm, f, indent=2, ensure_ascii=False)
+        json.dump(detail_vm, f, indent=2, ensure_ascii=False, default=_json_default)
     
     print(f"📝 Saved viewmodels:")
     print(f"   OnePager: {onepager_path}")
@@ -541,18 +847,19 @@ if __name__ == "__main__":
             terug=200,
             restschade=0
         ),
-        'gwe_meterstanden': GWEMeterstanden(
-            stroom=GWEMeterReading(begin=10000, eind=10500, verbruik=500),
-            gas=GWEMeterReading(begin=5000, eind=5100, verbruik=100)
-        ),
-        'gwe_regels': [
+        'gwe_meterstanden': GWEMeterstanden.from_readings({
+            'stroom': GWEMeterReading(begin=10000, eind=10500, verbruik=500),
+            'gas': GWEMeterReading(begin=5000, eind=5100, verbruik=100)
+        }),
+        'gwe_regels': GWERegels.from_regels([
             GWERegel("Elektra verbruik", 500, 0.28, 140),
             GWERegel("Gas verbruik", 100, 1.15, 115)
-        ],
+        ]),
         'gwe_totalen': GWETotalen(totaal_excl=255, btw=53.55, totaal_incl=308.55),
         'gwe_voorschot': 350,
         'cleaning': Cleaning(
             pakket_type="5_uur",
+            pakket_naam="Basis Schoonmaak",
             inbegrepen_uren=5,
             totaal_uren=7.5,
             extra_uren=2.5,
@@ -560,10 +867,10 @@ if __name__ == "__main__":
             extra_bedrag=125,
             voorschot=250
         ),
-        'damage_regels': [
+        'damage_regels': DamageRegels.from_regels([
             DamageRegel("Reparatie deur", 1, 30, 30),
             DamageRegel("Vervangen lamp", 2, 15, 30)
-        ],
+        ]),
         'damage_totalen': DamageTotalen(totaal_excl=60, btw=12.6, totaal_incl=72.6)
     }
     